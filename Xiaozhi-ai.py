@@ -142,4 +142,8 @@ def main():
 
 
 if __name__ == "__main__":
+    # 打包后的可执行文件启动 DSP 工作进程（spawn）时需要
+    import multiprocessing
+
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
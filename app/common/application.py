@@ -1,5 +1,4 @@
 import asyncio
-import json
 import platform
 import signal
 import sys
@@ -11,6 +10,7 @@ from PyQt5.QtCore import QSharedMemory
 from PyQt5.QtNetwork import QLocalServer, QLocalSocket
 from PyQt5.QtCore import QIODevice
 
+from app.common import json_codec
 from app.common.constants import AbortReason, DeviceState, ListeningMode
 from app.mcp.mcp_server import McpServer
 from app.service.protocols.mqtt_protocol import MqttProtocol
@@ -124,6 +124,9 @@ class Application:
         self.protocol = None
         self.display = None
         self.wake_word_detector = None
+        self.barge_in_detector = None
+        # 可选的DSP工作进程（AEC/唤醒词/打断检测移出主进程）
+        self.dsp_worker = None
         # 任务管理
         self.running = False
         self._main_tasks: Set[asyncio.Task] = set()
@@ -162,27 +165,10 @@ class Application:
         self._state_lock = None
         self._abort_lock = None
 
-        # 音频与发送并发限制（避免任务风暴）
-        try:
-            audio_write_cc = int(
-                self.config.get_config("APP.AUDIO_WRITE_CONCURRENCY", 4)
-            )
-        except Exception:
-            audio_write_cc = 4
-        try:
-            send_audio_cc = int(self.config.get_config("APP.SEND_AUDIO_CONCURRENCY", 4))
-        except Exception:
-            send_audio_cc = 4
-        # 保存配置值，在_initialize_async_objects中创建Semaphore
-        self._audio_write_cc = audio_write_cc
-        self._send_audio_cc = send_audio_cc
-        self._audio_write_semaphore = None
-        self._send_audio_semaphore = None
-
-        # 最近一次接收到服务端音频的时间（用于应对TTS起止近邻竞态）
-        self._last_incoming_audio_at: float = 0.0
+        # 上行音频发送器（每个音频通道会话一个常驻发送任务）
+        self._audio_uplink = None
 
-        # 音频静默检测（事件驱动取代固定sleep）
+        # 下行音频尾部静默检测（由播放缓冲状态与最后到达时间判断）
         try:
             tail_silence_ms = int(
                 self.config.get_config("APP.TTS_TAIL_SILENCE_MS", 150)
@@ -199,8 +185,6 @@ class Application:
         self._incoming_audio_tail_timeout_sec: float = max(
             0.1, tail_wait_timeout_ms / 1000.0
         )
-        self._incoming_audio_idle_event = None
-        self._incoming_audio_idle_handle = None
 
         logger.debug("Application实例初始化完成")
 
@@ -311,14 +295,6 @@ class Application:
         self.aborted_event = asyncio.Event()
         self.aborted_event.clear()
 
-        # 初始化信号量
-        self._audio_write_semaphore = asyncio.Semaphore(self._audio_write_cc)
-        self._send_audio_semaphore = asyncio.Semaphore(self._send_audio_cc)
-
-        # 初始化音频静默事件（默认置为已静默，避免无谓等待）
-        self._incoming_audio_idle_event = asyncio.Event()
-        self._incoming_audio_idle_event.set()
-
     async def _run_application_core(self, protocol: str, mode: str):
         """
         应用程序核心运行逻辑.
@@ -388,6 +364,9 @@ class Application:
         # 初始化唤醒词检测
         await self._initialize_wake_word_detector()
 
+        # 初始化打断检测（消费采集总线，仅 SPEAKING 期间运行）
+        await self._initialize_barge_in_detector()
+
         # 设置协议回调
         self._setup_protocol_callbacks()
 
@@ -420,10 +399,15 @@ class Application:
             from app.service.audio_codecs.audio_codec import AudioCodec
 
             self.audio_codec = AudioCodec()
+            await self._start_dsp_worker()
+            if self.dsp_worker is not None:
+                self.audio_codec.attach_dsp_worker(self.dsp_worker)
             await self.audio_codec.initialize()
 
             # 设置实时编码回调 - 关键：确保麦克风数据实时发送
             self.audio_codec.set_encoded_audio_callback(self._on_encoded_audio)
+            # 上行语音门限检测到说话结束时，AUTO_STOP 模式可提前结束监听
+            self.audio_codec.set_end_of_speech_callback(self._on_local_end_of_speech)
 
             logger.info("音频编解码器初始化成功")
 
@@ -432,90 +416,107 @@ class Application:
             # 确保初始化失败时audio_codec为None
             self.audio_codec = None
 
+    async def _start_dsp_worker(self):
+        """
+        按配置启动DSP工作进程，失败时音频处理留在主进程.
+        """
+        from app.service.audio_processing.dsp_worker import DSPWorker
+
+        worker = DSPWorker()
+        if not worker.enabled:
+            return
+        try:
+            if await worker.start():
+                self.dsp_worker = worker
+                return
+        except Exception as e:
+            logger.error(f"启动DSP工作进程失败: {e}", exc_info=True)
+        logger.warning("DSP工作进程不可用，音频处理在主进程中进行")
+
     def _on_encoded_audio(self, encoded_data: bytes):
         """处理编码后的音频数据回调.
 
-        注意：这个回调在音频驱动线程中被调用，需要线程安全地调度到主事件循环。
+        注意：这个回调在编码线程中被调用，只放入上行发送器的有界通道，
+        由事件循环中的常驻发送任务按序发送。
         关键逻辑：只在LISTENING状态或SPEAKING+REALTIME模式下发送音频数据
         """
         try:
             # 1. LISTENING状态：总是发送（包括实时模式下TTS播放期间）
             # 2. SPEAKING状态：只有在REALTIME模式下才发送（向后兼容）
-            should_send = self._should_send_microphone_audio()
-
-            if (
-                should_send
-                and self.protocol
-                and self.protocol.is_audio_channel_opened()
-            ):
-
-                # 线程安全地调度到主事件循环
-                if self._main_loop and not self._main_loop.is_closed():
-                    self._main_loop.call_soon_threadsafe(
-                        self._schedule_audio_send, encoded_data
-                    )
+            uplink = self._audio_uplink
+            if uplink is not None and self._should_send_microphone_audio():
+                uplink.offer(encoded_data)
 
         except Exception as e:
             logger.error(f"处理编码音频数据回调失败: {e}")
 
-    def _schedule_audio_send(self, encoded_data: bytes):
+    def _on_local_end_of_speech(self):
         """
-        在主事件循环中调度音频发送任务.
+        本地说话结束回调（编码线程中调用），切回主事件循环处理.
         """
-        try:
-            if not self.running or not self.protocol:
-                return
-            # 再次检查状态（可能在调度期间状态已改变）
-            # 核心逻辑：LISTENING状态或SPEAKING+REALTIME模式下发送音频
-            should_send = self._should_send_microphone_audio()
+        if self._main_loop and not self._main_loop.is_closed():
+            self._main_loop.call_soon_threadsafe(self._handle_local_end_of_speech)
 
-            if (
-                should_send
-                and self.protocol
-                and self.protocol.is_audio_channel_opened()
-            ):
-                # 使用call_soon_threadsafe避免qasync任务重入
-                if self._main_loop and not self._main_loop.is_closed():
-                    self._main_loop.call_soon_threadsafe(
-                        self._schedule_audio_send_task, encoded_data
-                    )
+    def _handle_local_end_of_speech(self):
+        """
+        AUTO_STOP 模式下检测到说话结束，立即停止监听，无需等待服务端VAD.
+        """
+        if not self.running:
+            return
+        if (
+            self.device_state == DeviceState.LISTENING
+            and self.listening_mode == ListeningMode.AUTO_STOP
+        ):
+            logger.info("本地检测到说话结束，停止监听")
+            self.schedule_command_nowait(self._stop_listening_impl)
 
-        except Exception as e:
-            logger.error(f"调度音频发送失败: {e}")
+    def _can_send_uplink_audio(self) -> bool:
+        """
+        发送任务取出一批帧时再次检查状态（入队后状态可能已改变）.
+        """
+        return (
+            self.running
+            and self.protocol is not None
+            and self.protocol.is_audio_channel_opened()
+            and self._should_send_microphone_audio()
+        )
 
-    def _schedule_audio_send_task(self, encoded_data: bytes):
+    async def _start_audio_uplink(self):
         """
-        在主事件循环中创建音频发送任务.
+        音频通道打开时为本次会话启动上行发送器.
         """
-        try:
-            if not self.running or not self.protocol:
-                return
-            
-            # 并发限制，避免任务风暴
-            async def _send():
-                async with self._send_audio_semaphore:
-                    await self.protocol.send_audio(encoded_data)
+        from app.service.protocols.audio_uplink import AudioUplinkSender
 
-            self._create_background_task(_send(), "发送音频数据")
-        except Exception as e:
-            logger.error(f"创建音频发送任务失败: {e}", exc_info=True)
+        await self._stop_audio_uplink()
 
-    def _schedule_audio_write_task(self, data: bytes):
+        options = self.config.get_config("APP.AUDIO_UPLINK", {}) or {}
+        uplink = AudioUplinkSender(
+            self.protocol.send_audio,
+            self._main_loop,
+            max_frames=options.get("MAX_QUEUE_FRAMES", 50),
+            batch_frames=options.get("BATCH_FRAMES", 10),
+            drop_policy=options.get("DROP_POLICY", AudioUplinkSender.DROP_OLDEST),
+            should_send=self._can_send_uplink_audio,
+        )
+        uplink.start()
+        self._audio_uplink = uplink
+
+    async def _stop_audio_uplink(self):
         """
-        在主事件循环中创建音频写入任务.
+        停止当前会话的上行发送器并记录统计.
         """
-        try:
-            if not self.running or not self.audio_codec:
-                return
-            
-            # 音频数据处理需要实时性，限制并发，避免任务风暴
-            async def _write():
-                async with self._audio_write_semaphore:
-                    await self.audio_codec.write_audio(data)
-
-            self._create_background_task(_write(), "写入音频数据")
-        except Exception as e:
-            logger.error(f"创建音频写入任务失败: {e}", exc_info=True)
+        uplink = self._audio_uplink
+        if uplink is None:
+            return
+        self._audio_uplink = None
+        await uplink.stop()
+        stats = uplink.get_stats()
+        logger.info(
+            f"上行音频发送器已停止 - 已发送: {stats['frames_sent']}, "
+            f"丢弃: {stats['frames_dropped']}, "
+            f"最大积压: {stats['max_queue_depth']}帧, "
+            f"平均发送延迟: {stats['avg_send_latency_ms']}ms"
+        )
 
     def _should_send_microphone_audio(self) -> bool:
         """
@@ -889,7 +890,7 @@ class Application:
             await self.protocol.send_abort_speaking(reason)
             await self._set_device_state(DeviceState.IDLE)
             restart = (
-                reason == AbortReason.WAKE_WORD_DETECTED
+                reason in (AbortReason.WAKE_WORD_DETECTED, AbortReason.BARGE_IN)
                 and self.keep_listening
                 and self.protocol.is_audio_channel_opened()
             )
@@ -968,6 +969,13 @@ class Application:
             elif state == DeviceState.SPEAKING:
                 display_update = ("说话中...", True)
 
+        # 上行语音门限仅在 LISTENING 状态生效
+        if self.audio_codec:
+            self.audio_codec.set_speech_gate_active(state == DeviceState.LISTENING)
+        # 打断检测仅在 SPEAKING 状态运行
+        if self.barge_in_detector:
+            self.barge_in_detector.set_active(state == DeviceState.SPEAKING)
+
         # 锁外执行I/O与耗时操作
         if perform_idle:
             await self._handle_idle_state()
@@ -1040,9 +1048,11 @@ class Application:
         if self.protocol:
             await self.protocol.close_audio_channel()
 
-    def _on_incoming_audio(self, data):
-        """
-        接收音频数据回调.
+    def _on_incoming_audio(self, data, sequence=None):
+        """接收音频数据回调.
+
+        在协议的接收回调中同步调用，只读取状态并写入抖动缓冲（线程安全）。
+        sequence 为传输层序列号（MQTT/UDP），WebSocket 为 None。
         """
         # 在实时模式下，TTS播放时设备状态可能保持LISTENING，也需要播放音频
         should_play_audio = self.device_state == DeviceState.SPEAKING or (
@@ -1057,47 +1067,8 @@ class Application:
                     lambda: self._set_device_state_impl(DeviceState.SPEAKING)
                 )
 
-            try:
-                # 记录最近一次收到服务端音频的时间
-                self._last_incoming_audio_at = time.monotonic()
-
-                # 标记“非静默”，并重置定时器：在静默期后置位事件
-                try:
-                    if self._incoming_audio_idle_event:
-                        self._incoming_audio_idle_event.clear()
-                    # 取消旧的静默计时器
-                    if self._incoming_audio_idle_handle:
-                        self._incoming_audio_idle_handle.cancel()
-                        self._incoming_audio_idle_handle = None
-                    # 安排新的静默计时任务（tail_silence_ms 后置位）
-
-                    def _mark_idle():
-                        if self._incoming_audio_idle_event:
-                            self._incoming_audio_idle_event.set()
-
-                    if self._main_loop and not self._main_loop.is_closed():
-                        self._incoming_audio_idle_handle = self._main_loop.call_later(
-                            self._incoming_audio_silence_sec,
-                            _mark_idle,
-                        )
-                except Exception:
-                    pass
-
-                # 若当前处于IDLE，说明出现了“停止后紧接着开始”的起止竞态，先切到SPEAKING
-                if self.device_state == DeviceState.IDLE:
-                    self.schedule_command_nowait(
-                        lambda: self._set_device_state_impl(DeviceState.SPEAKING)
-                    )
-
-                # 使用call_soon_threadsafe避免qasync任务重入
-                if self._main_loop and not self._main_loop.is_closed():
-                    self._main_loop.call_soon_threadsafe(
-                        self._schedule_audio_write_task, data
-                    )
-            except RuntimeError as e:
-                logger.error(f"无法创建音频写入任务: {e}")
-            except Exception as e:
-                logger.error(f"创建音频写入任务失败: {e}", exc_info=True)
+            # 直接写入抖动缓冲，由播放回调解码，不经事件循环、不创建任务
+            self.audio_codec.push_incoming_audio(data, sequence)
 
     def _on_incoming_json(self, json_data):
         """
@@ -1114,7 +1085,7 @@ class Application:
                 return
 
             if isinstance(json_data, str):
-                data = json.loads(json_data)
+                data = json_codec.loads(json_data)
             else:
                 data = json_data
             msg_type = data.get("type", "")
@@ -1194,20 +1165,16 @@ class Application:
             else:
                 logger.debug("TTS音频播放完成")
 
-        # 仅在非打断情况下，等待“静默事件”
-        if not self.aborted_event.is_set():
+        # 仅在非打断情况下，等待下行音频静默（TTS停止后可能仍有尾包到达）
+        if self.audio_codec and not self.aborted_event.is_set():
             try:
-                if self._incoming_audio_idle_event:
-                    # 最长等待一个超时时间，避免异常情况下卡住
-                    try:
-                        await asyncio.wait_for(
-                            self._incoming_audio_idle_event.wait(),
-                            timeout=self._incoming_audio_tail_timeout_sec,
-                        )
-                    except asyncio.TimeoutError:
-                        pass
-            except Exception:
-                pass
+                # 最长等待一个超时时间，避免异常情况下卡住
+                await self.audio_codec.wait_for_playback_idle(
+                    self._incoming_audio_silence_sec,
+                    self._incoming_audio_tail_timeout_sec,
+                )
+            except Exception as e:
+                logger.warning(f"等待下行音频静默失败: {e}")
 
         # 状态转换逻辑优化
         if self.device_state == DeviceState.SPEAKING:
@@ -1247,6 +1214,7 @@ class Application:
         """
         logger.info("音频通道已打开")
         try:
+            await self._start_audio_uplink()
             if self.audio_codec:
                 await self.audio_codec.start_streams()
 
@@ -1265,6 +1233,7 @@ class Application:
         音频通道关闭回调.
         """
         logger.info("音频通道已关闭")
+        await self._stop_audio_uplink()
         await self._set_device_state(DeviceState.IDLE)
         self.keep_listening = False
 
@@ -1273,17 +1242,33 @@ class Application:
         初始化唤醒词检测器.
         """
         try:
-            from app.service.audio_processing.wake_word_detect import WakeWordDetector
+            if self.dsp_worker is not None:
+                from app.service.audio_processing.dsp_worker import (
+                    RemoteWakeWordDetector,
+                )
 
-            self.wake_word_detector = WakeWordDetector()
+                self.wake_word_detector = RemoteWakeWordDetector(self.dsp_worker)
+            else:
+                from app.service.audio_processing.wake_word_detect import (
+                    WakeWordDetector,
+                )
+
+                self.wake_word_detector = WakeWordDetector()
 
             # 设置回调
             self.wake_word_detector.on_detected(self._on_wake_word_detected)
             self.wake_word_detector.on_error = self._handle_wake_word_error
 
-            await self.wake_word_detector.start(self.audio_codec)
+            if not self.wake_word_detector.enabled:
+                return
 
-            logger.info("唤醒词检测器初始化成功")
+            # 模型在后台线程加载与预热，就绪后再启动检测，不阻塞其余组件初始化
+            self.wake_word_detector.load_model()
+            self._create_background_task(
+                self._start_wake_word_detector(self.wake_word_detector),
+                "唤醒词检测器启动",
+            )
+            logger.info("唤醒词检测器初始化中，模型后台加载")
 
         except RuntimeError as e:
             logger.info(f"跳过唤醒词检测器初始化: {e}")
@@ -1292,6 +1277,19 @@ class Application:
             logger.error(f"初始化唤醒词检测器失败: {e}")
             self.wake_word_detector = None
 
+    async def _start_wake_word_detector(self, detector):
+        """
+        等待唤醒词模型就绪后启动检测.
+        """
+        started = time.perf_counter()
+        if not await detector.start(self.audio_codec):
+            logger.warning("唤醒词检测器启动失败，唤醒词功能不可用")
+            return
+        logger.info(
+            f"唤醒词检测器初始化成功 - 等待就绪: "
+            f"{(time.perf_counter() - started) * 1000:.0f}ms"
+        )
+
     async def _on_wake_word_detected(self, wake_word, full_text):
         """
         唤醒词检测回调.
@@ -1333,6 +1331,46 @@ class Application:
             logger.error(f"连接和启动监听失败: {e}")
             await self._set_device_state(DeviceState.IDLE)
 
+    async def _initialize_barge_in_detector(self):
+        """
+        初始化打断检测器.
+        """
+        try:
+            if self.dsp_worker is not None:
+                from app.service.audio_processing.dsp_worker import (
+                    RemoteBargeInDetector,
+                )
+
+                detector = RemoteBargeInDetector(self.dsp_worker)
+            else:
+                from app.service.audio_processing.vad_detector import VADDetector
+
+                detector = VADDetector()
+            detector.on_detected(self._on_barge_in)
+            if await detector.start(self.audio_codec):
+                self.barge_in_detector = detector
+        except Exception as e:
+            logger.error(f"初始化打断检测器失败: {e}")
+            self.barge_in_detector = None
+
+    def _on_barge_in(self, latency_ms: float):
+        """
+        打断检测回调（检测线程中调用），切回主事件循环处理.
+        """
+        if self._main_loop and not self._main_loop.is_closed():
+            self._main_loop.call_soon_threadsafe(self._handle_barge_in, latency_ms)
+
+    def _handle_barge_in(self, latency_ms: float):
+        """
+        播放期间检测到用户说话，中止播放（keep_listening 时随后恢复监听）.
+        """
+        if not self.running or self.device_state != DeviceState.SPEAKING:
+            return
+        logger.info(f"用户打断播放（触发延迟 {latency_ms:.0f}ms）")
+        self.schedule_command_nowait(
+            lambda: self.abort_speaking(AbortReason.BARGE_IN)
+        )
+
     def _handle_wake_word_error(self, error):
         """
         处理唤醒词检测器错误.
@@ -1444,6 +1482,9 @@ class Application:
             await self._safe_close_resource(
                 self.wake_word_detector, "唤醒词检测器", "stop"
             )
+            await self._safe_close_resource(
+                self.barge_in_detector, "打断检测器", "stop"
+            )
 
             # 3. 取消所有长期任务
             if self._main_tasks:
@@ -1481,6 +1522,7 @@ class Application:
                     logger.info("协议连接已关闭")
                 except Exception as e:
                     logger.error(f"关闭协议连接失败: {e}")
+            await self._stop_audio_uplink()
 
             # 6. 关闭音频设备（先停流后彻底关闭，缓解C扩展退出竞态）
             if self.audio_codec:
@@ -1490,6 +1532,8 @@ class Application:
                     pass
             # 尽早释放音频资源，避免事件循环关闭后再 awaiting 内部 sleep
             await self._safe_close_resource(self.audio_codec, "音频设备")
+            # 编码线程停止后再关闭DSP工作进程并释放共享内存
+            await self._safe_close_resource(self.dsp_worker, "DSP工作进程", "stop")
 
             # 7. 关闭MCP服务器
             await self._safe_close_resource(self.mcp_server, "MCP服务器")
@@ -1508,20 +1552,10 @@ class Application:
             except Exception as e:
                 logger.error(f"清空队列失败: {e}")
 
-            # 9. 取消尾静默定时器并置静默事件，避免等待
-            try:
-                if self._incoming_audio_idle_handle:
-                    self._incoming_audio_idle_handle.cancel()
-                    self._incoming_audio_idle_handle = None
-                if self._incoming_audio_idle_event:
-                    self._incoming_audio_idle_event.set()
-            except Exception:
-                pass
-
-            # 10. 最后停止UI显示
+            # 9. 最后停止UI显示
             await self._safe_close_resource(self.display, "显示界面")
 
-            # 11. 清理单例资源
+            # 10. 清理单例资源
             self._cleanup_singleton_resources()
 
             logger.info("应用程序关闭完成")
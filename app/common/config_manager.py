@@ -37,6 +37,15 @@ class ConfigManager:
             "KEYWORDS_SCORE": 1.8,
             "KEYWORDS_THRESHOLD": 0.2,
             "NUM_TRAILING_BLANKS": 1,
+            "PRE_GATE": {
+                "ENABLED": True,
+                "MARGIN_DB": 9.0,
+                "MIN_LEVEL_DBFS": -60.0,
+                "LOOKBACK_MS": 500,
+                "HANGOVER_MS": 1000,
+                "USE_VAD": False,
+                "VAD_AGGRESSIVENESS": 2,
+            },
         },
         "CAMERA": {
             "camera_index": 0,
@@ -65,6 +74,75 @@ class ConfigManager:
             "FRAME_DELAY": 3,
             "FILTER_LENGTH_RATIO": 0.4,
             "ENABLE_PREPROCESS": True,
+            # WebRTC APM 初始回声延迟（毫秒），启用延迟估计时运行中自动校正
+            "STREAM_DELAY_MS": 40,
+            "DELAY_ESTIMATION": True,
+            # AEC后端：auto（macOS用webrtc，其余用system）/ system / webrtc / pbfdaf
+            # pbfdaf 为纯 NumPy 软件AEC，参考信号取自本进程播放输出，适用于裸 ALSA
+            "BACKEND": "auto",
+            "PBFDAF": {
+                "FILTER_LENGTH_MS": 250,
+                "STEP_SIZE": 1.0,
+                "DOUBLE_TALK_RATIO": 8.0,
+                # 单个10ms块的处理耗时预算（毫秒），超出计入 over_budget_blocks
+                "CPU_BUDGET_MS": 1.0,
+            },
+        },
+        "AUDIO_OPTIONS": {
+            # 音频后端：sounddevice（系统声卡）/ file（WAV输入输出）/ null（静音输入、丢弃输出）
+            # 也可用环境变量 XIAOZHI_AUDIO_BACKEND / XIAOZHI_AUDIO_INPUT_FILE /
+            # XIAOZHI_AUDIO_OUTPUT_FILE / XIAOZHI_AUDIO_SPEED 覆盖
+            "BACKEND": {
+                "TYPE": "sounddevice",
+                "INPUT_FILE": "",
+                "OUTPUT_FILE": "",
+                "SPEED": 1.0,  # 文件/空设备节拍倍速，<=0 表示输入不等待、输出跟随输入进度
+                "LOOP": False,
+                "INPUT_SAMPLE_RATE": 16000,
+                "OUTPUT_SAMPLE_RATE": 24000,
+            },
+            # 设备监控：缓存设备能力，检测热插拔后自动切换音频流
+            "DEVICE_MONITOR": {
+                "ENABLED": True,
+                "INTERVAL": 2.0,  # 检测间隔（秒）
+                "RESCAN_INTERVAL": 10.0,  # 回退期间重扫间隔（无法感知插拔的平台）
+                "STALL_TIMEOUT": 2.0,  # 回调停摆多久视为流中断（秒）
+                "PREFER_NATIVE_RATES": False,  # 可选：探测所选设备，支持16k/24k时直接使用，省去重采样
+            },
+            # Opus编码档位：default / low_power / metered / lossy_network 或自定义档位名
+            "ENCODER_PROFILE": "default",
+            # 自定义档位，如 {"my_profile": {"BASE": "metered", "BITRATE": 10000}}
+            "ENCODER_PROFILES": {},
+            # 上行语音门限：LISTENING 时静音段不上传，本地检测说话结束
+            "SPEECH_GATE": {
+                "ENABLED": False,
+                "AGGRESSIVENESS": 2,
+                "PRE_ROLL_MS": 300,
+                "HANGOVER_MS": 400,
+                "END_OF_SPEECH_MS": 800,
+                "MIN_SPEECH_MS": 200,
+            },
+            # 播放期间的用户打断检测（需配合AEC或耳机，否则播放声音会误触发）
+            "BARGE_IN": {
+                "ENABLED": False,
+                "AGGRESSIVENESS": 3,
+                "TRIGGER_MS": 120,
+                "MAX_GAP_MS": 30,
+                "NOISE_MARGIN_DB": 12.0,
+                "MIN_LEVEL_DBFS": -55.0,
+            },
+            "DSP_PROCESS": {
+                "ENABLED": False,
+                "RING_SLOTS": 32,
+                "RESPONSE_TIMEOUT_MS": 15,
+                "START_TIMEOUT_S": 10.0,
+            },
+            "JITTER_BUFFER": {
+                "MIN_DEPTH": 1,
+                "START_DEPTH": 2,
+                "MAX_DEPTH": 10,
+                "MAX_CONCEAL": 2,  # 单个丢包空洞最多连续补偿的帧数，超出后跳到下一个已到达的包
+            },
         },
         "AUDIO_DEVICES": {
             "input_device_id": None,
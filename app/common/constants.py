@@ -22,6 +22,7 @@ class AbortReason:
 
     NONE = "none"
     WAKE_WORD_DETECTED = "wake_word_detected"
+    BARGE_IN = "barge_in"  # 播放期间用户说话，发送普通中止消息
     USER_INTERRUPTION = "user_interruption"
 
 
@@ -0,0 +1,108 @@
+"""JSON 编解码.
+
+按可用性选择后端：orjson > msgspec > 标准库 json，接口统一为 dumps()/loads()。
+协议层的固定消息用 MessageTemplate 预序列化，发送时只替换会话ID等少量字段；
+dumps_raw() 生成的 RawJSON（如 MCP 负载、IoT 状态）可原样嵌入，无需先解码再编码。
+"""
+
+import json
+import re
+from typing import Any, Dict, List, Tuple, Union
+
+JSONDecodeError = json.JSONDecodeError
+
+try:
+    import orjson
+
+    BACKEND = "orjson"
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+    def dumps(obj: Any) -> str:
+        return orjson.dumps(obj, option=_ORJSON_OPTIONS).decode("utf-8")
+
+    def loads(data: Union[str, bytes]) -> Any:
+        # orjson.JSONDecodeError 是 json.JSONDecodeError 的子类
+        return orjson.loads(data)
+
+except ImportError:
+    try:
+        import msgspec
+
+        BACKEND = "msgspec"
+        _msgspec_encoder = msgspec.json.Encoder()
+        _msgspec_decoder = msgspec.json.Decoder()
+
+        def dumps(obj: Any) -> str:
+            return _msgspec_encoder.encode(obj).decode("utf-8")
+
+        def loads(data: Union[str, bytes]) -> Any:
+            try:
+                return _msgspec_decoder.decode(data)
+            except msgspec.DecodeError as e:
+                # 统一为标准库异常类型，调用方无需区分后端
+                raise JSONDecodeError(str(e), str(data), 0) from None
+
+    except ImportError:
+        BACKEND = "json"
+        _json_encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+        def dumps(obj: Any) -> str:
+            return _json_encoder.encode(obj)
+
+        def loads(data: Union[str, bytes]) -> Any:
+            return json.loads(data)
+
+
+class RawJSON(str):
+    """
+    由 dumps_raw() 生成、保证合法的 JSON 文本，协议层可原样嵌入消息模板.
+    """
+
+    __slots__ = ()
+
+
+def dumps_raw(obj: Any) -> RawJSON:
+    return RawJSON(dumps(obj))
+
+
+class MessageTemplate:
+    """预序列化消息模板.
+
+    构造时把消息整体序列化一次，字段值为 "{{name}}" 占位（须为整个 JSON 值），
+    render() 只拼接各占位处的值，静态部分不再重复编码。
+
+    示例::
+
+        LISTEN_STOP = MessageTemplate(
+            {"session_id": "{{session_id}}", "type": "listen", "state": "stop"}
+        )
+        LISTEN_STOP.render(session_id="abc")
+    """
+
+    _PLACEHOLDER = re.compile(r'"\{\{(\w+)\}\}"')
+
+    def __init__(self, message: Dict[str, Any]):
+        text = json.dumps(message, ensure_ascii=False, separators=(",", ":"))
+        pieces = self._PLACEHOLDER.split(text)
+        # split 结果：静态片段与字段名交替出现
+        self._parts: List[str] = pieces[0::2]
+        self.fields: Tuple[str, ...] = tuple(pieces[1::2])
+
+    def render(self, **values: Any) -> str:
+        """
+        按字段值渲染消息，值由当前后端序列化.
+        """
+        return self.render_raw(
+            **{name: dumps(value) for name, value in values.items()}
+        )
+
+    def render_raw(self, **fragments: str) -> str:
+        """
+        按已序列化的 JSON 片段渲染消息，片段原样嵌入.
+        """
+        parts = self._parts
+        chunks = [parts[0]]
+        for index, name in enumerate(self.fields):
+            chunks.append(fragments[name])
+            chunks.append(parts[index + 1])
+        return "".join(chunks)
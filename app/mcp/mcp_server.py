@@ -4,11 +4,12 @@ Reference: https://modelcontextprotocol.io/specification/2024-11-05
 """
 
 import asyncio
-import json
+import logging
 from dataclasses import dataclass, field
 from enum import Enum
 from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
+from app.common import json_codec
 from app.common.system import SystemConstants
 from app.common.logging_config import get_logger
 
@@ -169,9 +170,9 @@ class McpTool:
             },
         }
 
-    async def call(self, arguments: Dict[str, Any]) -> str:
+    async def call(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
         """
-        调用工具.
+        调用工具，返回 MCP 结果对象（由响应统一序列化一次）.
         """
         try:
             # 解析参数
@@ -191,15 +192,11 @@ class McpTool:
             else:
                 text = str(result)
 
-            return json.dumps(
-                {"content": [{"type": "text", "text": text}], "isError": False}
-            )
+            return {"content": [{"type": "text", "text": text}], "isError": False}
 
         except Exception as e:
             logger.error(f"Error calling tool {self.name}: {e}", exc_info=True)
-            return json.dumps(
-                {"content": [{"type": "text", "text": str(e)}], "isError": True}
-            )
+            return {"content": [{"type": "text", "text": str(e)}], "isError": True}
 
 
 class McpServer:
@@ -292,13 +289,12 @@ class McpServer:
         """
         try:
             if isinstance(message, str):
-                data = json.loads(message)
+                data = json_codec.loads(message)
             else:
                 data = message
 
-            logger.info(
-                f"[MCP] 解析消息: {json.dumps(data, ensure_ascii=False, indent=2)}"
-            )
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"[MCP] 解析消息: {json_codec.dumps(data)}")
 
             # 检查JSONRPC版本
             if data.get("jsonrpc") != "2.0":
@@ -382,7 +378,7 @@ class McpServer:
 
             # 检查大小
             tool_json = tool.to_json()
-            tool_size = len(json.dumps(tool_json))
+            tool_size = len(json_codec.dumps(tool_json))
 
             if total_size + tool_size + 100 > max_payload_size:
                 next_cursor = tool.name
@@ -430,7 +426,7 @@ class McpServer:
         try:
             result = await tool.call(arguments)
             logger.info(f"[MCP] 工具 {tool_name} 执行成功，结果: {result}")
-            await self._reply_result(id, json.loads(result))
+            await self._reply_result(id, result)
         except Exception as e:
             logger.error(f"[MCP] 工具 {tool_name} 执行失败: {e}", exc_info=True)
             await self._reply_error(id, str(e))
@@ -445,13 +441,11 @@ class McpServer:
         """
         发送成功响应.
         """
-        payload = {"jsonrpc": "2.0", "id": id, "result": result}
-
-        result_len = len(json.dumps(result))
-        logger.info(f"[MCP] 发送成功响应: ID={id}, 结果长度={result_len}")
+        message = json_codec.dumps_raw({"jsonrpc": "2.0", "id": id, "result": result})
+        logger.info(f"[MCP] 发送成功响应: ID={id}, 响应长度={len(message)}")
 
         if self._send_callback:
-            await self._send_callback(json.dumps(payload))
+            await self._send_callback(message)
         else:
             logger.error("[MCP] 发送回调未设置!")
 
@@ -464,4 +458,4 @@ class McpServer:
         logger.error(f"[MCP] 发送错误响应: ID={id}, 错误={message}")
 
         if self._send_callback:
-            await self._send_callback(json.dumps(payload))
+            await self._send_callback(json_codec.dumps_raw(payload))
@@ -274,9 +274,7 @@ class TimerTask:
             # 执行MCP工具
             result = await tool.call(arguments)
 
-            # 解析结果
-            result_data = json.loads(result)
-            is_success = not result_data.get("isError", False)
+            is_success = not result.get("isError", False)
 
             if is_success:
                 logger.info(
@@ -284,7 +282,7 @@ class TimerTask:
                 )
                 await self._notify_execution_result(True, f"已执行 {tool_name}")
             else:
-                error_text = result_data.get("content", [{}])[0].get("text", "未知错误")
+                error_text = result.get("content", [{}])[0].get("text", "未知错误")
                 logger.error(f"倒计时 {self.timer_id} 执行MCP工具失败: {error_text}")
                 await self._notify_execution_result(False, error_text)
 
@@ -1,10 +1,15 @@
+import ctypes
 import platform
-from collections import deque
 from typing import Any, Dict, Optional
 
 import numpy as np
 import sounddevice as sd
+import soxr
 
+from app.service.audio_codecs.delay_estimator import EchoDelayEstimator
+from app.service.audio_codecs.pbfdaf_aec import PBFDAFEchoCanceller
+from app.service.audio_codecs.ring_buffer import AudioRingBuffer
+from app.common.config_manager import ConfigManager
 from app.common.constants import AudioConfig
 from app.common.logging_config import get_logger
 
@@ -15,9 +20,27 @@ class AECProcessor:
     """
     音频回声消除处理器
     专门用于处理参考信号（扬声器输出）和麦克风输入的AEC
+
+    后端由 AEC_OPTIONS.BACKEND 选择：
+    - auto: macOS 使用 webrtc，其他平台使用 system
+    - system: 依赖系统级回声消除（Windows 音频增强 / PulseAudio），不做处理
+    - webrtc: WebRTC APM + BlackHole 参考信号（仅macOS）
+    - pbfdaf: 纯 NumPy 分块频域自适应滤波，参考信号取自本进程播放回调写出的PCM，
+      不需要回环设备（适用于裸 ALSA 等无系统AEC的环境）
     """
+
+    BACKENDS = ("auto", "system", "webrtc", "pbfdaf")
     
-    def __init__(self):
+    def __init__(
+        self,
+        backend: Optional[str] = None,
+        options: Optional[Dict[str, Any]] = None,
+    ):
+        """
+        Args:
+            backend: 覆盖 AEC_OPTIONS.BACKEND（离线评测等场景）
+            options: 覆盖 AEC_OPTIONS 中的同名配置项
+        """
         # 平台信息
         self._platform = platform.system().lower()
         self._is_macos = self._platform == 'darwin'
@@ -34,25 +57,97 @@ class AECProcessor:
         self.reference_stream = None
         self.reference_device_id = None
         self.reference_sample_rate = None
+        self._reference_resampler = None  # 参考信号 -> 16kHz（soxr流式）
+
+        # 回声路径延迟估计：初始值来自配置，运行中按GCC-PHAT估计持续更新
+        aec_config = dict(
+            ConfigManager.get_instance().get_config("AEC_OPTIONS", {}) or {}
+        )
+        aec_config.update(options or {})
+        if backend is not None:
+            aec_config["BACKEND"] = backend
+        self._initial_delay_ms = int(aec_config.get("STREAM_DELAY_MS", 40))
+        self._delay_estimation = bool(aec_config.get("DELAY_ESTIMATION", True))
+        self._delay_estimator: Optional[EchoDelayEstimator] = None
+
+        self._backend = self._resolve_backend(aec_config.get("BACKEND", "auto"))
+        self._pbfdaf_config = aec_config.get("PBFDAF", {}) or {}
+
+        # 软件AEC（pbfdaf）：播放回调写入的原始PCM（输出流采样率），编码线程取出重采样
+        self._software_aec: Optional[PBFDAFEchoCanceller] = None
+        self._render_buffer: Optional[AudioRingBuffer] = None
+        self._render_sample_rate = None
+        self._render_resampler = None
+        self._render_resampler_rate = None
+        self._software_output = None
+        self._reference_frame = None
+        self._reference_underruns = 0
+        self._reference_trimmed = 0
         
         # 缓冲区
-        self._reference_buffer = deque()
         self._webrtc_frame_size = 160  # WebRTC标准：16kHz, 10ms = 160 samples
+        # 参考信号环形缓冲，保持约200ms的数据，溢出时自动丢弃最旧样本
+        self._reference_buffer = AudioRingBuffer(self._webrtc_frame_size * 20)
         self._system_frame_size = AudioConfig.INPUT_FRAME_SIZE  # 系统配置的帧大小
+
+        # APM 预分配缓冲（macOS，初始化APM时创建）：采集/参考按10ms分段，直接传指针
+        self._capture_frames = None
+        self._reference_frames = None
+        self._render_scratch = None
+        self._capture_config_ref = None
+        self._render_config_ref = None
         
         # 状态标志
         self._is_initialized = False
         self._is_closing = False
         
+    def _resolve_backend(self, backend) -> str:
+        backend = str(backend or "auto").lower()
+        if backend not in self.BACKENDS:
+            logger.warning(f"未知的AEC后端: {backend}，使用 auto")
+            backend = "auto"
+        if backend == "auto":
+            return "webrtc" if self._is_macos else "system"
+        if backend == "webrtc" and not self._is_macos:
+            logger.warning("WebRTC AEC 后端仅支持macOS，使用系统级回声消除")
+            return "system"
+        return backend
+
+    @property
+    def backend(self) -> str:
+        return self._backend
+
+    @property
+    def needs_processing(self) -> bool:
+        """
+        采集帧是否需要经过 process_audio（系统级AEC时无需处理）.
+        """
+        return self._backend in ("webrtc", "pbfdaf")
+
+    @property
+    def uses_render_reference(self) -> bool:
+        """
+        是否需要播放回调通过 push_render 提供参考信号.
+        """
+        return self._software_aec is not None
+
     async def initialize(self):
         """初始化AEC处理器"""
         try:
-            if self._is_windows or self._is_linux:
+            if self._backend == "pbfdaf":
+                self._initialize_software_aec()
+                self._is_initialized = True
+                logger.info(
+                    f"软件AEC（PBFDAF）已启用，滤波器长度 "
+                    f"{self._software_aec.filter_length_ms}ms"
+                )
+                return
+            if self._backend == "system":
                 # Windows 和 Linux 平台使用系统级AEC，无需额外处理
                 logger.info(f"{self._platform.capitalize()} 平台使用系统级回声消除，AEC处理器已启用")
                 self._is_initialized = True
                 return
-            elif self._is_macos:
+            elif self._backend == "webrtc":
                 # macOS 平台使用 WebRTC + BlackHole
                 await self._initialize_apm()
                 await self._initialize_reference_capture()
@@ -69,6 +164,116 @@ class AECProcessor:
             await self.close()
             raise
     
+    def _initialize_software_aec(self):
+        """初始化软件AEC（PBFDAF），参考信号由播放回调提供"""
+        config = self._pbfdaf_config
+        sample_rate = AudioConfig.INPUT_SAMPLE_RATE
+        self._software_aec = PBFDAFEchoCanceller(
+            sample_rate=sample_rate,
+            block_size=self._webrtc_frame_size,
+            filter_length_ms=int(config.get("FILTER_LENGTH_MS", 250)),
+            step_size=float(config.get("STEP_SIZE", 1.0)),
+            double_talk_ratio=float(config.get("DOUBLE_TALK_RATIO", 8.0)),
+            cpu_budget_ms=float(config.get("CPU_BUDGET_MS", 1.0)),
+        )
+
+        # 播放PCM按输出流采样率缓存（最高48kHz，约500ms）
+        self._render_buffer = AudioRingBuffer(48000 // 2)
+        # 参考信号只保留“本帧 + 一个输出块”的余量，使参考尽量新：
+        # 回声相对参考的延迟 ≈ 输出延迟 + 输入延迟 + 编码队列，落在滤波器长度内
+        self._reference_slack = sample_rate * 60 // 1000
+        self._allocate_software_buffers(max(self._system_frame_size, sample_rate * 60 // 1000))
+
+        if self._delay_estimation:
+            self._delay_estimator = EchoDelayEstimator(sample_rate, initial_delay_ms=0)
+
+    def _allocate_software_buffers(self, frame_size: int):
+        self._reference_frame = np.zeros(frame_size, dtype=np.int16)
+        self._software_output = np.zeros(frame_size, dtype=np.int16)
+
+    def push_render(self, samples: np.ndarray, sample_rate: int):
+        """记录播放回调写给设备的PCM作为参考信号（输出回调线程调用，仅做拷贝）.
+
+        Args:
+            samples: 本次写入设备的样本（含补零的静音，保持时间轴连续）
+            sample_rate: 输出流采样率
+        """
+        buffer = self._render_buffer
+        if buffer is None or self._is_closing:
+            return
+        self._render_sample_rate = sample_rate
+        buffer.write(samples)
+
+    def _drain_render(self):
+        """将播放回调积累的PCM重采样到16kHz并写入参考缓冲（编码线程）"""
+        rate = self._render_sample_rate
+        available = len(self._render_buffer)
+        if rate is None or available == 0:
+            return
+
+        if rate != self._render_resampler_rate:
+            # 输出设备切换：重建重采样器并丢弃旧采样率的参考
+            self._render_resampler = (
+                soxr.ResampleStream(
+                    rate,
+                    AudioConfig.INPUT_SAMPLE_RATE,
+                    AudioConfig.CHANNELS,
+                    dtype="int16",
+                    quality="QQ",
+                )
+                if rate != AudioConfig.INPUT_SAMPLE_RATE
+                else None
+            )
+            self._render_resampler_rate = rate
+            self._reference_buffer.clear()
+            if self._software_aec is not None:
+                self._software_aec.reset()
+
+        samples = self._render_buffer.read(available)
+        if self._render_resampler is not None:
+            samples = self._render_resampler.resample_chunk(samples, last=False)
+        self._reference_buffer.write(samples)
+
+    def _process_software_aec(self, capture_audio: np.ndarray) -> np.ndarray:
+        """软件AEC处理一帧（编码线程），返回内部输出缓冲视图"""
+        count = len(capture_audio)
+        if count > len(self._reference_frame):
+            self._allocate_software_buffers(count)
+
+        self._drain_render()
+
+        buffer = self._reference_buffer
+        excess = len(buffer) - count - self._reference_slack
+        if excess > 0:
+            # 输入/输出时钟漂移或启动时积压：丢弃最旧部分
+            buffer.read(excess)
+            self._reference_trimmed += excess
+        elif len(buffer) < count:
+            self._reference_underruns += 1
+
+        reference = buffer.read_or_silence(count, out=self._reference_frame)
+        output = self._software_output[:count]
+
+        estimator = self._delay_estimator
+        if estimator is not None:
+            estimator.push(capture_audio, reference)
+
+        self._software_aec.process(capture_audio, reference, output)
+
+        if estimator is not None:
+            estimator.push_output(output)
+            delay_ms = estimator.take_delay_update()
+            if (
+                delay_ms is not None
+                and delay_ms >= self._software_aec.filter_length_ms - 20
+            ):
+                logger.warning(
+                    f"回声延迟 {delay_ms}ms 接近软件AEC滤波器长度 "
+                    f"{self._software_aec.filter_length_ms}ms，"
+                    f"请增大 AEC_OPTIONS.PBFDAF.FILTER_LENGTH_MS"
+                )
+        return output
+
     async def _initialize_apm(self):
         """初始化WebRTC音频处理模块（仅macOS）"""
         if not self._is_macos:
@@ -108,9 +313,20 @@ class AECProcessor:
             
             self.capture_config = self.apm.create_stream_config(sample_rate, channels)
             self.render_config = self.apm.create_stream_config(sample_rate, channels)
+            self._capture_config_ref = ctypes.c_void_p(self.capture_config)
+            self._render_config_ref = ctypes.c_void_p(self.render_config)
+
+            # 按最大帧长（至少60ms）预分配处理缓冲
+            self._allocate_frame_buffers(
+                max(6, self._system_frame_size // self._webrtc_frame_size)
+            )
             
-            # 设置流延迟
-            self.apm.set_stream_delay_ms(40)  # 50ms延迟
+            # 设置初始流延迟，启用延迟估计时随后自动校正
+            self.apm.set_stream_delay_ms(self._initial_delay_ms)
+            if self._delay_estimation:
+                self._delay_estimator = EchoDelayEstimator(
+                    sample_rate, initial_delay_ms=self._initial_delay_ms
+                )
             
             logger.info("WebRTC APM初始化完成")
             
@@ -136,6 +352,15 @@ class AECProcessor:
             # 创建参考信号输入流（固定使用10ms帧，匹配WebRTC标准）
             webrtc_frame_duration = 0.01  # 10ms，WebRTC标准帧长度
             reference_frame_size = int(self.reference_sample_rate * webrtc_frame_duration)
+
+            if self.reference_sample_rate != AudioConfig.INPUT_SAMPLE_RATE:
+                self._reference_resampler = soxr.ResampleStream(
+                    self.reference_sample_rate,
+                    AudioConfig.INPUT_SAMPLE_RATE,
+                    AudioConfig.CHANNELS,
+                    dtype="int16",
+                    quality="QQ",
+                )
             
             self.reference_stream = sd.InputStream(
                 device=self.reference_device_id,
@@ -198,26 +423,15 @@ class AECProcessor:
             return
         
         try:
-            audio_data = indata.copy().flatten()
+            audio_data = indata.reshape(-1)
             
-            # 重采样到16kHz（如果需要）
-            if self.reference_sample_rate != AudioConfig.INPUT_SAMPLE_RATE:
-                # 简单的降采样处理（实际应用中应使用更好的重采样器）
-                ratio = AudioConfig.INPUT_SAMPLE_RATE / self.reference_sample_rate
-                target_length = int(len(audio_data) * ratio)
-                audio_data = np.interp(
-                    np.linspace(0, len(audio_data) - 1, target_length),
-                    np.arange(len(audio_data)),
-                    audio_data
-                ).astype(np.int16)
+            # 重采样到16kHz（流式soxr，保持块间相位连续）
+            resampler = self._reference_resampler
+            if resampler is not None:
+                audio_data = resampler.resample_chunk(audio_data, last=False)
             
-            # 添加到参考缓冲区
-            self._reference_buffer.extend(audio_data)
-            
-            # 保持缓冲区大小合理
-            max_buffer_size = self._webrtc_frame_size * 20  # 保持约200ms的数据
-            while len(self._reference_buffer) > max_buffer_size:
-                self._reference_buffer.popleft()
+            # 添加到参考缓冲区（超出200ms时环形覆盖最旧数据）
+            self._reference_buffer.write(audio_data)
                 
         except Exception as e:
             logger.error(f"参考信号回调错误: {e}")
@@ -240,12 +454,12 @@ class AECProcessor:
         if not self._is_initialized:
             return capture_audio
         
-        # Windows 和 Linux 平台直接返回原始音频（系统级处理）
-        if self._is_windows or self._is_linux:
+        # 系统级AEC直接返回原始音频
+        if self._backend == "system":
             return capture_audio
         
-        # macOS 平台使用 WebRTC AEC 处理
-        if not self._is_macos or self.apm is None:
+        # macOS 平台使用 WebRTC AEC 处理，其余为软件AEC
+        if self._software_aec is None and self.apm is None:
             return capture_audio
         
         try:
@@ -253,99 +467,74 @@ class AECProcessor:
             if len(capture_audio) % self._webrtc_frame_size != 0:
                 logger.warning(f"音频帧大小不是WebRTC帧的整数倍: {len(capture_audio)}, WebRTC帧: {self._webrtc_frame_size}")
                 return capture_audio
-            
-            # 计算需要分割的块数
+
+            if self._software_aec is not None:
+                return self._process_software_aec(capture_audio)
+
+            # 10ms/20ms/40ms/60ms帧统一按10ms分段原地处理
             num_chunks = len(capture_audio) // self._webrtc_frame_size
-            
-            if num_chunks == 1:
-                # 10ms帧，直接处理
-                return self._process_single_aec_frame(capture_audio)
-            else:
-                # 20ms/40ms/60ms帧，分割处理
-                return self._process_chunked_aec_frames(capture_audio, num_chunks)
-            
+            return self._process_aec_frames(capture_audio, num_chunks)
+
         except Exception as e:
             logger.error(f"AEC处理失败: {e}")
             return capture_audio
-    
-    def _process_single_aec_frame(self, capture_audio: np.ndarray) -> np.ndarray:
-        """处理单个10ms WebRTC帧（仅macOS）"""
-        if not self._is_macos:
-            return capture_audio
-            
-        try:
-            # 仅在macOS导入ctypes
-            import ctypes
-            
-            # 获取参考信号
-            reference_audio = self._get_reference_frame(self._webrtc_frame_size)
-            
-            # 创建ctypes缓冲区
-            capture_buffer = (ctypes.c_short * self._webrtc_frame_size)(*capture_audio)
-            reference_buffer = (ctypes.c_short * self._webrtc_frame_size)(*reference_audio)
-            
-            processed_capture = (ctypes.c_short * self._webrtc_frame_size)()
-            processed_reference = (ctypes.c_short * self._webrtc_frame_size)()
-            
-            # 首先处理参考信号（render stream）
-            render_result = self.apm.process_reverse_stream(
-                reference_buffer, self.render_config, self.render_config, processed_reference
-            )
-            
-            if render_result != 0:
-                logger.warning(f"参考信号处理失败，错误码: {render_result}")
-            
-            # 然后处理采集信号（capture stream）
-            capture_result = self.apm.process_stream(
-                capture_buffer, self.capture_config, self.capture_config, processed_capture
-            )
-            
-            if capture_result != 0:
-                logger.warning(f"采集信号处理失败，错误码: {capture_result}")
-                return capture_audio
-            
-            # 转换回numpy数组
-            return np.array(processed_capture, dtype=np.int16)
-            
-        except Exception as e:
-            logger.error(f"AEC帧处理失败: {e}")
+
+    def _allocate_frame_buffers(self, max_chunks: int):
+        """预分配APM采集/参考缓冲（仅macOS）"""
+        from libs.webrtc_apm import ApmFrameBuffer
+
+        self._capture_frames = ApmFrameBuffer(self._webrtc_frame_size, max_chunks)
+        self._reference_frames = ApmFrameBuffer(self._webrtc_frame_size, max_chunks)
+        self._render_scratch = ApmFrameBuffer(self._webrtc_frame_size, 1)
+
+    def _process_aec_frames(self, capture_audio: np.ndarray, num_chunks: int) -> np.ndarray:
+        """原地处理 num_chunks 个10ms帧（仅macOS）
+
+        采集与参考信号拷入预分配缓冲后按段直接传指针给APM，每段一次参考+一次采集调用，
+        不构造 ctypes 数组。返回的数组为内部缓冲视图，在下一次处理前有效。
+        """
+        if num_chunks > self._capture_frames.max_chunks:
+            # 超出预分配长度的帧（罕见），扩容后继续
+            self._allocate_frame_buffers(num_chunks)
+
+        capture = self._capture_frames.views[num_chunks]
+        reference = self._reference_frames.views[num_chunks]
+        np.copyto(capture, capture_audio, casting="unsafe")
+        self._reference_buffer.read_or_silence(len(reference), out=reference)
+
+        estimator = self._delay_estimator
+        if estimator is not None:
+            estimator.push(capture, reference)
+
+        result = self.apm.process_frames(
+            self._capture_frames,
+            self._reference_frames,
+            num_chunks,
+            self._capture_config_ref,
+            self._render_config_ref,
+            self._render_scratch,
+        )
+        if result != 0:
+            logger.warning(f"采集信号处理失败，错误码: {result}")
             return capture_audio
-    
-    def _process_chunked_aec_frames(self, capture_audio: np.ndarray, num_chunks: int) -> np.ndarray:
-        """分割处理大帧（20ms/40ms/60ms等）"""
-        processed_chunks = []
-        
-        for i in range(num_chunks):
-            # 提取当前10ms块
-            start_idx = i * self._webrtc_frame_size
-            end_idx = (i + 1) * self._webrtc_frame_size
-            chunk = capture_audio[start_idx:end_idx]
-            
-            # 处理这个10ms块
-            processed_chunk = self._process_single_aec_frame(chunk)
-            processed_chunks.append(processed_chunk)
-        
-        # 将所有处理后的块重新组合
-        return np.concatenate(processed_chunks)
-    
-    def _get_reference_frame(self, frame_size: int) -> np.ndarray:
-        """获取指定大小的参考信号帧"""
-        # 如果没有参考信号或缓冲区不足，返回静音
-        if len(self._reference_buffer) < frame_size:
-            return np.zeros(frame_size, dtype=np.int16)
-        
-        # 从缓冲区提取一帧
-        frame_data = []
-        for _ in range(frame_size):
-            frame_data.append(self._reference_buffer.popleft())
-        
-        return np.array(frame_data, dtype=np.int16)
-    
+
+        if estimator is not None:
+            estimator.push_output(capture)
+            delay_ms = estimator.take_delay_update()
+            if delay_ms is not None:
+                self.apm.set_stream_delay_ms(delay_ms)
+
+        return capture
+
     def is_reference_available(self) -> bool:
         """检查参考信号是否可用"""
-        if self._is_windows or self._is_linux:
-            # Windows 和 Linux 使用系统级AEC，总是可用
+        if self._backend == "system":
+            # 系统级AEC，总是可用
             return self._is_initialized
+
+        if self._backend == "pbfdaf":
+            # 软件AEC：播放回调已开始提供参考信号
+            return self._is_initialized and self._render_sample_rate is not None
         
         # macOS 需要检查参考信号流
         return (self.reference_stream is not None and 
@@ -358,9 +547,36 @@ class AECProcessor:
             'initialized': self._is_initialized,
             'platform': self._platform,
             'reference_available': self.is_reference_available(),
+            'backend': self._backend,
         }
         
-        if self._is_windows:
+        if self._backend == "pbfdaf":
+            status.update({
+                'aec_type': 'pbfdaf',
+                'description': '软件分块频域自适应滤波（播放回调参考信号）',
+                'render_sample_rate': self._render_sample_rate,
+                'reference_buffer_size': len(self._reference_buffer),
+                'reference_underruns': self._reference_underruns,
+                'reference_trimmed': self._reference_trimmed,
+            })
+            if self._software_aec is not None:
+                status.update(self._software_aec.get_stats())
+            if self._delay_estimator is not None:
+                status.update(self._delay_estimator.get_status())
+        elif self._backend == "webrtc":
+            status.update({
+                'aec_type': 'webrtc_blackhole',
+                'description': 'WebRTC + BlackHole 参考信号',
+                'reference_device_id': self.reference_device_id,
+                'reference_buffer_size': len(self._reference_buffer),
+                'webrtc_apm_active': self.apm is not None,
+                'delay_estimation': self._delay_estimator is not None,
+            })
+            if self._delay_estimator is not None:
+                status.update(self._delay_estimator.get_status())
+            else:
+                status['delay_ms'] = self._initial_delay_ms
+        elif self._is_windows:
             status.update({
                 'aec_type': 'system_level',
                 'description': 'Windows 系统底层回声消除'
@@ -370,18 +586,10 @@ class AECProcessor:
                 'aec_type': 'system_level',
                 'description': 'Linux 系统级回声消除（PulseAudio）'
             })
-        elif self._is_macos:
-            status.update({
-                'aec_type': 'webrtc_blackhole',
-                'description': 'WebRTC + BlackHole 参考信号',
-                'reference_device_id': self.reference_device_id,
-                'reference_buffer_size': len(self._reference_buffer),
-                'webrtc_apm_active': self.apm is not None
-            })
         else:
             status.update({
-                'aec_type': 'unsupported',
-                'description': f'平台 {self._platform} 暂不支持AEC'
+                'aec_type': 'system_level',
+                'description': f'{self._platform} 系统级回声消除'
             })
         
         return status
@@ -406,6 +614,7 @@ class AECProcessor:
                         logger.warning(f"关闭参考信号流失败: {e}")
                     finally:
                         self.reference_stream = None
+                        self._reference_resampler = None
                 
                 # 清理WebRTC APM
                 if self.apm:
@@ -421,6 +630,11 @@ class AECProcessor:
                         self.render_config = None
                         self.apm = None
             
+            # 软件AEC：停止接收播放参考
+            self._software_aec = None
+            self._render_buffer = None
+            self._render_resampler = None
+
             # 清理缓冲区
             self._reference_buffer.clear()
             
@@ -0,0 +1,475 @@
+import os
+import threading
+import time
+import wave
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+import sounddevice as sd
+
+from app.common.constants import AudioConfig
+from app.common.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# 环境变量优先于配置文件，便于CI/压测机无需改配置即可切换
+ENV_BACKEND = "XIAOZHI_AUDIO_BACKEND"
+ENV_INPUT_FILE = "XIAOZHI_AUDIO_INPUT_FILE"
+ENV_OUTPUT_FILE = "XIAOZHI_AUDIO_OUTPUT_FILE"
+ENV_SPEED = "XIAOZHI_AUDIO_SPEED"
+
+
+class AudioBackend(ABC):
+    """
+    音频后端接口：负责设备查询与音频流创建.
+
+    AudioCodec 只通过后端打开输入/输出流，重采样、AEC、编解码路径与后端无关。
+    流对象需提供 start()/stop()/close()/active/latency，回调签名与 sounddevice 一致。
+    """
+
+    name = "base"
+    # 是否使用系统音频设备（决定是否执行设备选择）
+    uses_system_devices = False
+
+    def prepare(self):
+        """
+        打开流之前的全局准备.
+        """
+
+    @abstractmethod
+    def query_device(self, device_id, kind: str) -> Dict[str, Any]:
+        """查询设备信息.
+
+        Args:
+            device_id: 设备ID，None 表示默认设备
+            kind: "input" 或 "output"
+
+        Returns:
+            至少包含 name、default_samplerate 的设备信息
+        """
+
+    @abstractmethod
+    def input_stream(self, **kwargs):
+        """
+        创建输入流（参数与 sd.InputStream 一致）.
+        """
+
+    @abstractmethod
+    def output_stream(self, **kwargs):
+        """
+        创建输出流（参数与 sd.OutputStream 一致）.
+        """
+
+    def close(self):
+        """
+        释放后端资源（文件句柄等）.
+        """
+
+
+class SoundDeviceBackend(AudioBackend):
+    """
+    系统声卡后端（PortAudio / sounddevice）.
+    """
+
+    name = "sounddevice"
+    uses_system_devices = True
+
+    def prepare(self):
+        sd.default.samplerate = None
+        sd.default.channels = AudioConfig.CHANNELS
+        sd.default.dtype = np.int16
+
+    def query_device(self, device_id, kind: str) -> Dict[str, Any]:
+        if device_id is None:
+            device_id = sd.default.device[0 if kind == "input" else 1]
+        return dict(sd.query_devices(device_id))
+
+    def input_stream(self, **kwargs):
+        return sd.InputStream(**kwargs)
+
+    def output_stream(self, **kwargs):
+        return sd.OutputStream(**kwargs)
+
+
+class _TimeInfo:
+    """
+    模拟 PortAudio 回调时间信息.
+    """
+
+    __slots__ = ("currentTime", "inputBufferAdcTime", "outputBufferDacTime")
+
+    def __init__(self, current_time: float, latency: float):
+        self.currentTime = current_time
+        self.inputBufferAdcTime = current_time - latency
+        self.outputBufferDacTime = current_time + latency
+
+
+class StreamClock:
+    """
+    尽可能快模式（speed<=0）下输入、输出流共享的时钟.
+
+    输入流每消费一块推进时钟，输出流按输入进度产出，不超前于输入；
+    输入源读完后时钟结束，输出流随之停止，输出文件时长与输入一致。
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._position = 0.0
+        self._finished = False
+
+    @property
+    def position(self) -> float:
+        return self._position
+
+    @property
+    def finished(self) -> bool:
+        return self._finished
+
+    def advance(self, seconds: float):
+        with self._cond:
+            self._position += seconds
+            self._cond.notify_all()
+
+    def finish(self):
+        with self._cond:
+            self._finished = True
+            self._cond.notify_all()
+
+    def wait_until(self, position: float, running: Callable[[], bool]) -> bool:
+        """
+        等待输入进度达到 position 秒，输入已结束或流已停止时返回False.
+        """
+        with self._cond:
+            while self._position < position:
+                if self._finished or not running():
+                    return False
+                # 定时醒来检查停止标志
+                self._cond.wait(0.1)
+            return True
+
+
+class VirtualStream:
+    """
+    虚拟音频流：独立线程按块时长（除以倍速）节拍调用回调.
+
+    speed 为 1.0 时按实时节奏运行，大于1时加速，小于等于0时不等待（尽可能快）：
+    此时输入流不等待，输出流由 clock 按输入进度驱动，未提供 clock 时按实时节奏运行。
+    """
+
+    def __init__(
+        self,
+        kind: str,
+        samplerate: int,
+        channels: int,
+        blocksize: int,
+        callback: Callable,
+        finished_callback: Optional[Callable[[], None]] = None,
+        speed: float = 1.0,
+        source: Optional[Callable[[int], Optional[np.ndarray]]] = None,
+        sink: Optional[Callable[[np.ndarray], None]] = None,
+        clock: Optional[StreamClock] = None,
+        **_ignored,
+    ):
+        self.kind = kind
+        self.samplerate = int(samplerate)
+        self.channels = int(channels)
+        self.blocksize = int(blocksize)
+        self.speed = float(speed)
+        # 虚拟设备延迟固定为一个块
+        self.latency = self.blocksize / self.samplerate
+
+        self._callback = callback
+        self._finished_callback = finished_callback
+        self._source = source
+        self._sink = sink
+        self._clock = clock if self.speed <= 0 else None
+
+        self._buffer = np.zeros((self.blocksize, self.channels), dtype=np.int16)
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self._closed = False
+
+    @property
+    def active(self) -> bool:
+        return bool(self._thread and self._thread.is_alive())
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def start(self):
+        if self._closed:
+            raise RuntimeError("虚拟音频流已关闭")
+        if self.active:
+            return
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._run, name=f"Virtual{self.kind.capitalize()}", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        thread = self._thread
+        if thread and thread.is_alive() and thread is not threading.current_thread():
+            thread.join(timeout=1.0)
+        self._thread = None
+
+    def close(self):
+        self.stop()
+        self._closed = True
+
+    def _run(self):
+        block_duration = self.blocksize / self.samplerate
+        clock = self._clock
+        if self.speed > 0:
+            interval = block_duration / self.speed
+        elif self.kind == "output" and clock is None:
+            # 输出流没有输入进度可跟随时按实时节奏，避免空转并无限写入静音
+            interval = block_duration
+        else:
+            interval = 0.0
+        next_at = time.monotonic()
+        # 输出流从当前输入进度开始跟随（重建流时不补齐之前的时长）
+        produced = clock.position if clock is not None else 0.0
+
+        try:
+            while self._running:
+                if self.kind == "input":
+                    if not self._fill_input():
+                        if clock is not None:
+                            clock.finish()
+                        break
+                    self._callback(self._buffer, self.blocksize, self._time_info(), None)
+                    if clock is not None:
+                        clock.advance(block_duration)
+                else:
+                    if clock is not None:
+                        produced += block_duration
+                        if not clock.wait_until(produced, lambda: self._running):
+                            break
+                    self._callback(self._buffer, self.blocksize, self._time_info(), None)
+                    if self._sink is not None:
+                        self._sink(self._buffer)
+
+                if interval > 0:
+                    next_at += interval
+                    delay = next_at - time.monotonic()
+                    if delay > 0:
+                        time.sleep(delay)
+                    else:
+                        # 落后时不追赶，避免突发回调
+                        next_at = time.monotonic()
+        except Exception as e:
+            logger.error(f"虚拟{self.kind}流错误: {e}", exc_info=True)
+        finally:
+            self._running = False
+            if self._finished_callback:
+                try:
+                    self._finished_callback()
+                except Exception as e:
+                    logger.warning(f"虚拟流结束回调失败: {e}")
+
+    def _fill_input(self) -> bool:
+        if self._source is None:
+            self._buffer.fill(0)
+            return True
+
+        block = self._source(self.blocksize)
+        if block is None:
+            return False
+        count = len(block)
+        self._buffer[:count, 0] = block
+        self._buffer[count:] = 0
+        return True
+
+    def _time_info(self) -> _TimeInfo:
+        return _TimeInfo(time.monotonic(), self.latency)
+
+
+class WavSource:
+    """
+    WAV 麦克风输入源：读取16位PCM，多声道取第一声道.
+    """
+
+    def __init__(self, path: str, loop: bool = False):
+        self.path = str(path)
+        self.loop = loop
+        with wave.open(self.path, "rb") as wav:
+            if wav.getsampwidth() != 2:
+                raise ValueError(f"仅支持16位PCM WAV: {self.path}")
+            self.samplerate = wav.getframerate()
+            channels = wav.getnchannels()
+            data = np.frombuffer(wav.readframes(wav.getnframes()), dtype=np.int16)
+        # 一次性载入内存，读取时只做切片，避免回调线程中的文件I/O
+        self._samples = data.reshape(-1, channels)[:, 0].copy()
+        self._position = 0
+        self.finished = threading.Event()
+
+    @property
+    def duration(self) -> float:
+        return len(self._samples) / self.samplerate
+
+    def read(self, count: int) -> Optional[np.ndarray]:
+        """
+        读取下一块样本，文件结束（且不循环）时返回None.
+        """
+        if self._position >= len(self._samples):
+            if not self.loop or len(self._samples) == 0:
+                self.finished.set()
+                return None
+            self._position = 0
+
+        block = self._samples[self._position : self._position + count]
+        self._position += len(block)
+        return block
+
+
+class WavSink:
+    """
+    WAV 播放输出：将输出流写入的样本保存为单声道16位PCM.
+    """
+
+    def __init__(self, path: str, samplerate: int):
+        self.path = str(path)
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._wav = wave.open(self.path, "wb")
+        self._wav.setnchannels(1)
+        self._wav.setsampwidth(2)
+        self._wav.setframerate(int(samplerate))
+        self._lock = threading.Lock()
+        self.frames_written = 0
+
+    def write(self, block: np.ndarray):
+        with self._lock:
+            if self._wav is None:
+                return
+            self._wav.writeframes(block[:, 0].tobytes())
+            self.frames_written += len(block)
+
+    def close(self):
+        with self._lock:
+            if self._wav is not None:
+                self._wav.close()
+                self._wav = None
+
+
+class FileAudioBackend(AudioBackend):
+    """
+    文件虚拟设备：麦克风读取 WAV（实时或倍速节拍），播放写入 WAV.
+
+    输入设备采样率取 WAV 文件采样率，因此重采样路径与真实设备一致地参与运行。
+    未指定输入文件时输入静音，未指定输出文件时丢弃播放数据。
+    """
+
+    name = "file"
+
+    def __init__(
+        self,
+        input_file: Optional[str] = None,
+        output_file: Optional[str] = None,
+        speed: float = 1.0,
+        loop: bool = False,
+        input_sample_rate: int = AudioConfig.INPUT_SAMPLE_RATE,
+        output_sample_rate: int = AudioConfig.OUTPUT_SAMPLE_RATE,
+    ):
+        self.speed = float(speed)
+        self.source = WavSource(input_file, loop) if input_file else None
+        self.input_sample_rate = (
+            self.source.samplerate if self.source else int(input_sample_rate)
+        )
+        self.output_sample_rate = int(output_sample_rate)
+        self.output_file = output_file
+        self.sink: Optional[WavSink] = None
+        # 尽可能快模式下输出跟随输入进度
+        self.clock = StreamClock() if self.speed <= 0 else None
+
+    def query_device(self, device_id, kind: str) -> Dict[str, Any]:
+        if kind == "input":
+            name = self.source.path if self.source else "silence"
+            return {"name": name, "default_samplerate": self.input_sample_rate}
+        return {
+            "name": self.output_file or "null",
+            "default_samplerate": self.output_sample_rate,
+        }
+
+    def input_stream(self, **kwargs):
+        source = self.source.read if self.source else None
+        return VirtualStream(
+            "input", speed=self.speed, source=source, clock=self.clock, **kwargs
+        )
+
+    def output_stream(self, **kwargs):
+        if self.output_file and self.sink is None:
+            self.sink = WavSink(self.output_file, kwargs["samplerate"])
+        sink = self.sink.write if self.sink else None
+        return VirtualStream(
+            "output", speed=self.speed, sink=sink, clock=self.clock, **kwargs
+        )
+
+    def wait_input_finished(self, timeout: Optional[float] = None) -> bool:
+        """
+        等待输入文件播放完毕（压测/基准使用），无输入文件时立即返回False.
+        """
+        if self.source is None:
+            return False
+        return self.source.finished.wait(timeout)
+
+    def close(self):
+        if self.sink is not None:
+            self.sink.close()
+            logger.info(
+                f"播放输出已保存: {self.sink.path} ({self.sink.frames_written} 样本)"
+            )
+            self.sink = None
+
+
+class NullAudioBackend(FileAudioBackend):
+    """
+    空设备：输入静音、丢弃播放数据，实时节拍运行.
+    """
+
+    name = "null"
+
+    def __init__(self, speed: float = 1.0, **kwargs):
+        super().__init__(input_file=None, output_file=None, speed=speed, **kwargs)
+
+
+def create_audio_backend(config) -> AudioBackend:
+    """
+    根据环境变量或 AUDIO_OPTIONS.BACKEND 配置创建音频后端.
+    """
+    backend_config = config.get_config("AUDIO_OPTIONS.BACKEND", {}) or {}
+    backend_type = (
+        os.getenv(ENV_BACKEND) or backend_config.get("TYPE") or "sounddevice"
+    ).lower()
+    speed = float(os.getenv(ENV_SPEED) or backend_config.get("SPEED", 1.0))
+    options = {
+        "speed": speed,
+        "input_sample_rate": backend_config.get(
+            "INPUT_SAMPLE_RATE", AudioConfig.INPUT_SAMPLE_RATE
+        ),
+        "output_sample_rate": backend_config.get(
+            "OUTPUT_SAMPLE_RATE", AudioConfig.OUTPUT_SAMPLE_RATE
+        ),
+    }
+
+    if backend_type == "file":
+        backend = FileAudioBackend(
+            input_file=os.getenv(ENV_INPUT_FILE) or backend_config.get("INPUT_FILE"),
+            output_file=os.getenv(ENV_OUTPUT_FILE)
+            or backend_config.get("OUTPUT_FILE"),
+            loop=bool(backend_config.get("LOOP", False)),
+            **options,
+        )
+    elif backend_type == "null":
+        backend = NullAudioBackend(**options)
+    else:
+        if backend_type != "sounddevice":
+            logger.warning(f"未知的音频后端: {backend_type}，使用 sounddevice")
+        return SoundDeviceBackend()
+
+    logger.info(f"使用虚拟音频后端: {backend.name} (倍速: {speed})")
+    return backend
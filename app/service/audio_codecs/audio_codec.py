@@ -1,8 +1,7 @@
 import asyncio
 import gc
 import time
-from collections import deque
-from typing import Optional
+from typing import Optional, Tuple, Union
 
 import numpy as np
 import opuslib
@@ -10,9 +9,22 @@ import sounddevice as sd
 import soxr
 
 from app.service.audio_codecs.aec_processor import AECProcessor
+from app.service.audio_codecs.audio_backend import AudioBackend, create_audio_backend
+from app.service.audio_codecs.capture_bus import CaptureBus, CaptureSubscription
+from app.service.audio_codecs.device_registry import AudioDeviceRegistry
+from app.service.audio_codecs.encoder_profile import (
+    OpusEncoderProfile,
+    load_profile_from_config,
+    resolve_profile,
+)
+from app.service.audio_codecs.encoder_worker import AudioEncoderWorker
+from app.service.audio_codecs.jitter_buffer import JitterBuffer
+from app.service.audio_codecs.ring_buffer import AudioRingBuffer
+from app.service.audio_codecs.speech_gate import SpeechGate
 from app.common.constants import AudioConfig
 from app.common.config_manager import ConfigManager
 from app.common.logging_config import get_logger
+from app.common.path_manager import get_user_cache_dir
 
 logger = get_logger(__name__)
 
@@ -29,6 +41,9 @@ class AudioCodec:
         # 获取配置管理器
         self.config = ConfigManager.get_instance()
 
+        # 音频后端：系统声卡，或文件/空设备（无头运行、可复现的压测）
+        self.backend: AudioBackend = create_audio_backend(self.config)
+
         # Opus编解码器：录音16kHz编码，播放24kHz解码
         self.opus_encoder = None
         self.opus_decoder = None
@@ -43,9 +58,9 @@ class AudioCodec:
         self.input_resampler = None  # 设备采样率 -> 16kHz
         self.output_resampler = None  # 24kHz -> 设备采样率(播放用)
 
-        # 重采样缓冲区
-        self._resample_input_buffer = deque()
-        self._resample_output_buffer = deque()
+        # 重采样缓冲区（定长数组环形缓冲，在创建重采样器时按帧长分配）
+        self._resample_input_buffer: Optional[AudioRingBuffer] = None
+        self._resample_output_buffer: Optional[AudioRingBuffer] = None
 
         self._device_input_frame_size = None
         self._is_closing = False
@@ -54,34 +69,106 @@ class AudioCodec:
         self.input_stream = None  # 录音流
         self.output_stream = None  # 播放流
 
-        # 队列：唤醒词检测和播放缓冲
-        self._wakeword_buffer = asyncio.Queue(maxsize=100)
-        self._output_buffer = asyncio.Queue(maxsize=500)
-
-        # 实时编码回调（直接发送，不走队列）
+        # 采集扇出总线：16kHz帧供唤醒词检测、打断检测、录音等订阅者消费
+        self.capture_bus = CaptureBus(AudioConfig.INPUT_FRAME_SIZE)
+
+        # 播放缓冲：抖动缓冲存放Opus包，播放回调按需解码（含PLC/FEC）到PCM环形缓冲
+        jitter_config = self.config.get_config("AUDIO_OPTIONS.JITTER_BUFFER", {}) or {}
+        self._jitter_buffer = JitterBuffer(
+            AudioConfig.FRAME_DURATION,
+            min_depth=jitter_config.get("MIN_DEPTH", 1),
+            start_depth=jitter_config.get("START_DEPTH", 2),
+            max_depth=jitter_config.get("MAX_DEPTH", 10),
+            max_conceal=jitter_config.get("MAX_CONCEAL", 2),
+        )
+        self._output_buffer = AudioRingBuffer(AudioConfig.OUTPUT_FRAME_SIZE * 4)
+        self._decode_errors = 0
+        # 输出缓冲末尾的丢包补偿样本数（播放回调线程），不计入有效播放
+        self._concealed_tail = 0
+
+        # 播放排空信号：播放回调确认最后一个样本经设备延迟后播出，再通知事件循环
+        self._main_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._playback_drained = asyncio.Event()
+        self._playback_drained.set()
+        self._playback_generation = 0  # 清空队列/恢复播放时递增，丢弃过期的排空通知
+        self._playback_active = False  # 播放回调线程：是否有未确认排空的输出
+        self._playback_end_at = 0.0  # 最后一个有效样本预计播出的 monotonic 时间
+        self._drain_timer: Optional[asyncio.TimerHandle] = None
+
+        # 下行接收计数（仅接收线程写入），排空通知据此判断期间是否有新包到达
+        self._incoming_packets = 0
+        self._last_incoming_at = 0.0
+        self._resume_scheduled = False
+
+        # 实时编码回调（在编码线程中调用）
         self._encoded_audio_callback = None
 
+        # 录音编码线程：回调只拷贝样本，重采样/AEC/编码在该线程完成
+        self._encoder_worker: Optional[AudioEncoderWorker] = None
+
+        # Opus编码档位（码率/复杂度/DTX/FEC/包长），可运行时切换
+        self._encoder_profile = load_profile_from_config(self.config)
+
+        # 上行语音门限：LISTENING 时只上传语音段（默认关闭）
+        self._speech_gate: Optional[SpeechGate] = None
+        gate_config = self.config.get_config("AUDIO_OPTIONS.SPEECH_GATE", {}) or {}
+        if gate_config.get("ENABLED", False):
+            self._speech_gate = SpeechGate(
+                aggressiveness=gate_config.get("AGGRESSIVENESS", 2),
+                pre_roll_ms=gate_config.get("PRE_ROLL_MS", 300),
+                hangover_ms=gate_config.get("HANGOVER_MS", 400),
+                end_of_speech_ms=gate_config.get("END_OF_SPEECH_MS", 800),
+                min_speech_ms=gate_config.get("MIN_SPEECH_MS", 200),
+            )
+
         # AEC处理器
         self.aec_processor = AECProcessor()
         self._aec_enabled = False
 
+        # DSP 工作进程（可选）：接管AEC，采集帧经共享内存环往返处理
+        self._dsp_worker = None
+
+        # 设备注册表：缓存设备能力，后台检测热插拔并自动切换流（仅系统声卡后端）
+        monitor_config = (
+            self.config.get_config("AUDIO_OPTIONS.DEVICE_MONITOR", {}) or {}
+        )
+        self._device_monitor_enabled = bool(monitor_config.get("ENABLED", True))
+        self._device_monitor_interval = float(monitor_config.get("INTERVAL", 2.0))
+        self._device_rescan_interval = float(monitor_config.get("RESCAN_INTERVAL", 10.0))
+        self._stream_stall_timeout = float(monitor_config.get("STALL_TIMEOUT", 2.0))
+        self._prefer_native_rates = bool(monitor_config.get("PREFER_NATIVE_RATES", False))
+        self._device_registry: Optional[AudioDeviceRegistry] = None
+        self._device_monitor_task: Optional[asyncio.Task] = None
+        self._input_device_key: Optional[str] = None  # 首选设备的稳定键（名称|主机API）
+        self._output_device_key: Optional[str] = None
+        self._input_fallback = False  # 首选设备缺失，正在使用系统默认设备
+        self._output_fallback = False
+        self._streams_expected = False  # 音频流应处于运行状态（区分主动停止与中断）
+        self._input_heartbeat = 0.0  # 最近一次回调的 monotonic 时间
+        self._output_heartbeat = 0.0
+
     async def initialize(self):
         """
         初始化音频设备.
         """
         try:
-            # 显示并选择音频设备
-            await self._select_audio_devices()
+            self._main_loop = asyncio.get_running_loop()
 
-            input_device_info = sd.query_devices(
-                self.mic_device_id or sd.default.device[0]
-            )
-            output_device_info = sd.query_devices(
-                self.speaker_device_id or sd.default.device[1]
+            # 显示并选择音频设备（虚拟后端无需选择）
+            if self.backend.uses_system_devices:
+                self._device_registry = AudioDeviceRegistry(
+                    get_user_cache_dir() / "audio_devices.json",
+                    streams_open=self._has_open_streams,
+                )
+                await asyncio.to_thread(self._device_registry.refresh)
+                await self._select_audio_devices()
+                self._remember_device_keys()
+
+            self.device_input_sample_rate = self._pick_sample_rate(
+                self.mic_device_id, "input", AudioConfig.INPUT_SAMPLE_RATE
             )
-            self.device_input_sample_rate = int(input_device_info["default_samplerate"])
-            self.device_output_sample_rate = int(
-                output_device_info["default_samplerate"]
+            self.device_output_sample_rate = self._pick_sample_rate(
+                self.speaker_device_id, "output", AudioConfig.OUTPUT_SAMPLE_RATE
             )
             frame_duration_sec = AudioConfig.FRAME_DURATION / 1000
             self._device_input_frame_size = int(
@@ -92,27 +179,36 @@ class AudioCodec:
                 f"输入采样率: {self.device_input_sample_rate}Hz, 输出: {self.device_output_sample_rate}Hz"
             )
             await self._create_resamplers()
-            sd.default.samplerate = None
-            sd.default.channels = AudioConfig.CHANNELS
-            sd.default.dtype = np.int16
+
+            # 编码线程需在音频流启动前就绪
+            self._start_encoder_worker()
+
+            self.backend.prepare()
             await self._create_streams()
-            self.opus_encoder = opuslib.Encoder(
-                AudioConfig.INPUT_SAMPLE_RATE,
-                AudioConfig.CHANNELS,
-                opuslib.APPLICATION_AUDIO,
-            )
+            self.opus_encoder = self._create_opus_encoder(self._encoder_profile)
+            self._encoder_worker.set_encoder(self.opus_encoder, self._encoder_profile)
+            logger.info(f"Opus编码档位: {self._encoder_profile.to_dict()}")
             self.opus_decoder = opuslib.Decoder(
                 AudioConfig.OUTPUT_SAMPLE_RATE, AudioConfig.CHANNELS
             )
 
-            # 初始化AEC处理器
-            try:
-                await self.aec_processor.initialize()
-                self._aec_enabled = True
-                logger.info("AEC处理器启用")
-            except Exception as e:
-                logger.warning(f"AEC处理器初始化失败，将使用原始音频: {e}")
-                self._aec_enabled = False
+            # 初始化AEC处理器（DSP 工作进程接管时在子进程中初始化）
+            if self._dsp_worker is not None:
+                self._aec_enabled = self._dsp_worker.aec_enabled
+                logger.info(f"AEC由DSP工作进程处理: {self._dsp_worker.aec_backend}")
+            else:
+                try:
+                    await self.aec_processor.initialize()
+                    self._aec_enabled = True
+                    logger.info("AEC处理器启用")
+                except Exception as e:
+                    logger.warning(f"AEC处理器初始化失败，将使用原始音频: {e}")
+                    self._aec_enabled = False
+
+            if self._device_registry is not None and self._device_monitor_enabled:
+                self._device_monitor_task = asyncio.create_task(
+                    self._device_monitor_loop()
+                )
 
             logger.info("音频初始化完成")
         except Exception as e:
@@ -120,11 +216,82 @@ class AudioCodec:
             await self.close()
             raise
 
+    def _start_encoder_worker(self):
+        """
+        按当前设备块长创建并启动录音编码线程.
+        """
+        worker = AudioEncoderWorker(
+            self._device_input_frame_size,
+            AudioConfig.INPUT_FRAME_SIZE,
+            self._preprocess_input,
+        )
+        worker.set_callback(self._encoded_audio_callback)
+        worker.set_speech_gate(self._speech_gate)
+        if self.opus_encoder is not None:
+            worker.set_encoder(self.opus_encoder, self._encoder_profile)
+        worker.start()
+        self._encoder_worker = worker
+
+    def _pick_sample_rate(self, device_id, kind: str, preferred: int) -> int:
+        """选择设备采样率：设备原生支持编解码采样率时直接使用，省去重采样.
+
+        Args:
+            device_id: 设备ID，None 表示默认设备
+            kind: "input" 或 "output"
+            preferred: 编解码采样率（输入16kHz/输出24kHz）
+        """
+        registry = self._device_registry
+        if registry is not None and self._prefer_native_rates:
+            info = (
+                registry.by_index(device_id)
+                if device_id is not None
+                else registry.default_device(kind)
+            )
+            if info is not None and preferred in registry.supported_rates(info, kind):
+                return preferred
+
+        device_info = self.backend.query_device(device_id, kind)
+        return int(device_info["default_samplerate"])
+
+    def _remember_device_keys(self):
+        """
+        记录所选设备的稳定键，设备索引因热插拔变化后据此重新定位.
+        """
+        registry = self._device_registry
+        input_info = registry.by_index(self.mic_device_id) or registry.default_device(
+            "input"
+        )
+        output_info = registry.by_index(
+            self.speaker_device_id
+        ) or registry.default_device("output")
+        self._input_device_key = input_info.key if input_info else None
+        self._output_device_key = output_info.key if output_info else None
+
+    def _create_opus_encoder(self, profile: OpusEncoderProfile):
+        """
+        创建按档位配置的Opus编码器.
+        """
+        encoder = opuslib.Encoder(
+            AudioConfig.INPUT_SAMPLE_RATE,
+            AudioConfig.CHANNELS,
+            opuslib.APPLICATION_AUDIO,
+        )
+        profile.apply(encoder)
+        return encoder
+
     async def _create_resamplers(self):
         """
         创建重采样器 输入：设备采样率 -> 16kHz（用于编码） 输出：24kHz -> 设备采样率（播放用）
         """
-        # 输入重采样器：设备采样率 -> 16kHz（用于编码）
+        self._create_input_resampler()
+        self._create_output_resampler()
+
+    def _create_input_resampler(self):
+        """
+        输入重采样器：设备采样率 -> 16kHz（用于编码），采样率一致时不创建.
+        """
+        self.input_resampler = None
+        self._resample_input_buffer = None
         if self.device_input_sample_rate != AudioConfig.INPUT_SAMPLE_RATE:
             self.input_resampler = soxr.ResampleStream(
                 self.device_input_sample_rate,
@@ -133,9 +300,18 @@ class AudioCodec:
                 dtype="int16",
                 quality="QQ",
             )
+            # 预留4帧余量，吸收soxr输出长度的抖动
+            self._resample_input_buffer = AudioRingBuffer(
+                AudioConfig.INPUT_FRAME_SIZE * 4
+            )
             logger.info(f"输入重采样: {self.device_input_sample_rate}Hz -> 16kHz")
 
-        # 输出重采样器：24kHz -> 设备采样率
+    def _create_output_resampler(self):
+        """
+        输出重采样器：24kHz -> 设备采样率，采样率一致时不创建.
+        """
+        self.output_resampler = None
+        self._resample_output_buffer = None
         if self.device_output_sample_rate != AudioConfig.OUTPUT_SAMPLE_RATE:
             self.output_resampler = soxr.ResampleStream(
                 AudioConfig.OUTPUT_SAMPLE_RATE,
@@ -144,6 +320,10 @@ class AudioCodec:
                 dtype="int16",
                 quality="QQ",
             )
+            device_output_frame_size = int(
+                self.device_output_sample_rate * (AudioConfig.FRAME_DURATION / 1000)
+            )
+            self._resample_output_buffer = AudioRingBuffer(device_output_frame_size * 4)
             logger.info(
                 f"输出重采样: {AudioConfig.OUTPUT_SAMPLE_RATE}Hz -> {self.device_output_sample_rate}Hz"
             )
@@ -160,7 +340,7 @@ class AudioCodec:
             input_device_id = audio_config.get("input_device_id")
             output_device_id = audio_config.get("output_device_id")
             
-            devices = sd.query_devices()
+            devices = self._device_registry.query_devices()
             
             # 验证配置中的输入设备是否有效
             if input_device_id is not None:
@@ -239,7 +419,7 @@ class AudioCodec:
         保存默认音频设备配置到配置文件.
         """
         try:
-            devices = sd.query_devices()
+            devices = self._device_registry.query_devices()
             audio_config = {}
             
             # 保存输入设备配置
@@ -279,7 +459,7 @@ class AudioCodec:
         """
         try:
             # 麦克风输入流，使用指定设备
-            self.input_stream = sd.InputStream(
+            self.input_stream = self.backend.input_stream(
                 device=self.mic_device_id,  # 指定麦克风设备ID
                 samplerate=self.device_input_sample_rate,
                 channels=AudioConfig.CHANNELS,
@@ -302,7 +482,7 @@ class AudioCodec:
                     self.device_output_sample_rate * (AudioConfig.FRAME_DURATION / 1000)
                 )
 
-            self.output_stream = sd.OutputStream(
+            self.output_stream = self.backend.output_stream(
                 device=self.speaker_device_id,  # 指定扬声器设备ID
                 samplerate=output_sample_rate,
                 channels=AudioConfig.CHANNELS,
@@ -313,8 +493,10 @@ class AudioCodec:
                 latency="low",
             )
 
+            self._input_heartbeat = self._output_heartbeat = time.monotonic()
             self.input_stream.start()
             self.output_stream.start()
+            self._streams_expected = True
 
             logger.info("音频流已启动")
 
@@ -324,53 +506,50 @@ class AudioCodec:
 
     def _input_callback(self, indata, frames, time_info, status):
         """
-        录音回调，硬件驱动调用 处理流程：原始音频 -> 重采样16kHz -> 编码发送 + 唤醒词检测.
+        录音回调，硬件驱动调用 仅把样本拷贝进编码线程队列，其余处理移出实时回调.
         """
+        self._input_heartbeat = time.monotonic()
         if status and "overflow" not in str(status).lower():
             logger.warning(f"输入流状态: {status}")
 
-        if self._is_closing:
+        if self._is_closing or self._encoder_worker is None:
             return
 
-        try:
-            audio_data = indata.copy().flatten()
-
-            # 重采样到16kHz（如果设备不是16kHz）
-            if self.input_resampler is not None:
-                audio_data = self._process_input_resampling(audio_data)
-                if audio_data is None:
-                    return
-
-            # 应用AEC处理（仅 macOS 需要）
-            if (self._aec_enabled and len(audio_data) == AudioConfig.INPUT_FRAME_SIZE and self.aec_processor._is_macos):
+        self._encoder_worker.submit(indata)
 
-                try:
-                    audio_data = self.aec_processor.process_audio(audio_data)
-                except Exception as e:
-                    logger.warning(f"AEC处理失败，使用原始音频: {e}")
-
-            # 实时编码并发送（不走队列，减少延迟）
-            if (
-                self._encoded_audio_callback
-                and len(audio_data) == AudioConfig.INPUT_FRAME_SIZE
-            ):
-                try:
-                    pcm_data = audio_data.astype(np.int16).tobytes()
-                    encoded_data = self.opus_encoder.encode(
-                        pcm_data, AudioConfig.INPUT_FRAME_SIZE
-                    )
-
-                    if encoded_data:
-                        self._encoded_audio_callback(encoded_data)
+    def _preprocess_input(self, audio_data: np.ndarray) -> Optional[np.ndarray]:
+        """
+        编码线程调用 处理流程：原始音频 -> 重采样16kHz -> AEC -> 发布到采集总线.
+        """
+        # 重采样到16kHz（如果设备不是16kHz）
+        if self.input_resampler is not None:
+            audio_data = self._process_input_resampling(audio_data)
+            if audio_data is None:
+                return None
 
-                except Exception as e:
-                    logger.warning(f"实时录音编码失败: {e}")
+        if len(audio_data) != AudioConfig.INPUT_FRAME_SIZE:
+            return None
 
-            # 同时提供给唤醒词检测（走队列）
-            self._put_audio_data_safe(self._wakeword_buffer, audio_data.copy())
+        dsp_worker = self._dsp_worker
+        if dsp_worker is not None:
+            # AEC在工作进程中完成，超时或进程不可用时使用原始音频
+            if self._aec_enabled and dsp_worker.aec_needs_processing:
+                processed = dsp_worker.process_capture(audio_data)
+                if processed is not None:
+                    audio_data = processed
+            else:
+                # 仍需把帧送入工作进程供唤醒词/打断检测使用，不等待结果
+                dsp_worker.submit_capture(audio_data)
+        # 应用AEC处理（系统级AEC时跳过）
+        elif self._aec_enabled and self.aec_processor.needs_processing:
+            try:
+                audio_data = self.aec_processor.process_audio(audio_data)
+            except Exception as e:
+                logger.warning(f"AEC处理失败，使用原始音频: {e}")
 
-        except Exception as e:
-            logger.error(f"输入回调错误: {e}")
+        # 发布到采集总线（单次拷贝，各订阅者零拷贝读取）
+        self.capture_bus.publish(audio_data)
+        return audio_data
 
     def _process_input_resampling(self, audio_data):
         """
@@ -379,39 +558,20 @@ class AudioCodec:
         try:
             resampled_data = self.input_resampler.resample_chunk(audio_data, last=False)
             if len(resampled_data) > 0:
-                self._resample_input_buffer.extend(resampled_data.astype(np.int16))
-
-            expected_frame_size = AudioConfig.INPUT_FRAME_SIZE
-            if len(self._resample_input_buffer) < expected_frame_size:
-                return None
-
-            frame_data = []
-            for _ in range(expected_frame_size):
-                frame_data.append(self._resample_input_buffer.popleft())
+                self._resample_input_buffer.write(resampled_data)
 
-            return np.array(frame_data, dtype=np.int16)
+            # 数据不足一帧时返回None；返回值为缓冲区暂存视图，下游需在本次回调内使用
+            return self._resample_input_buffer.read(AudioConfig.INPUT_FRAME_SIZE)
 
         except Exception as e:
             logger.error(f"输入重采样失败: {e}")
             return None
 
-    def _put_audio_data_safe(self, queue, audio_data):
-        """
-        安全入队，队列满时丢弃最旧数据.
-        """
-        try:
-            queue.put_nowait(audio_data)
-        except asyncio.QueueFull:
-            try:
-                queue.get_nowait()
-                queue.put_nowait(audio_data)
-            except asyncio.QueueEmpty:
-                queue.put_nowait(audio_data)
-
     def _output_callback(self, outdata: np.ndarray, frames: int, time_info, status):
         """
-        播放回调，硬件驱动调用 从播放队列取数据输出到扬声器.
+        播放回调，硬件驱动调用 从抖动缓冲取包解码后输出到扬声器.
         """
+        self._output_heartbeat = time.monotonic()
         if status:
             if "underflow" not in str(status).lower():
                 logger.warning(f"输出流状态: {status}")
@@ -419,74 +579,262 @@ class AudioCodec:
         try:
             if self.output_resampler is not None:
                 # 需要重采样：24kHz -> 设备采样率
-                self._output_callback_with_resample(outdata, frames)
+                self._output_callback_with_resample(outdata, frames, time_info)
+                output_rate = self.device_output_sample_rate
             else:
                 # 直接播放：24kHz
-                self._output_callback_direct(outdata, frames)
+                self._output_callback_direct(outdata, frames, time_info)
+                output_rate = AudioConfig.OUTPUT_SAMPLE_RATE
+
+            # 软件AEC：实际写给设备的PCM即参考信号
+            if self._aec_enabled:
+                dsp_worker = self._dsp_worker
+                aec = self.aec_processor
+                if dsp_worker is not None:
+                    if dsp_worker.aec_uses_render_reference:
+                        dsp_worker.push_render(outdata, output_rate)
+                elif aec is not None and aec.uses_render_reference:
+                    aec.push_render(outdata, output_rate)
 
         except Exception as e:
             logger.error(f"输出回调错误: {e}")
             outdata.fill(0)
 
-    def _output_callback_direct(self, outdata: np.ndarray, frames: int):
-        """
-        直接播放24kHz数据（设备支持24kHz时）
+    def _decode_next_frame(self) -> Tuple[Optional[np.ndarray], bool]:
+        """从抖动缓冲取出下一帧并解码.
+
+        Returns:
+            (PCM数据, 是否为丢包补偿帧)；缓冲中时PCM为None
         """
-        try:
-            # 从播放队列获取音频数据
-            audio_data = self._output_buffer.get_nowait()
+        decoder = self.opus_decoder
+        if decoder is None:
+            return None, False
 
-            if len(audio_data) >= frames:
-                output_frames = audio_data[:frames]
-                outdata[:] = output_frames.reshape(-1, AudioConfig.CHANNELS)
+        action, packet = self._jitter_buffer.pop()
+        if action == JitterBuffer.WAIT:
+            return None, False
+
+        frame_size = AudioConfig.OUTPUT_FRAME_SIZE
+        concealed = action == JitterBuffer.PLC
+        try:
+            if action == JitterBuffer.PACKET:
+                pcm_data = decoder.decode(packet, frame_size)
+            elif action == JitterBuffer.FEC:
+                # 用下一包携带的带内FEC恢复丢失帧
+                pcm_data = decoder.decode(packet, frame_size, decode_fec=True)
             else:
-                outdata[: len(audio_data)] = audio_data.reshape(
-                    -1, AudioConfig.CHANNELS
-                )
-                outdata[len(audio_data) :] = 0
+                # 空包触发Opus丢包补偿
+                pcm_data = decoder.decode(b"", frame_size)
+        except opuslib.OpusError as e:
+            # 坏包不再直接丢弃，改用丢包补偿填充
+            self._decode_errors += 1
+            logger.debug(f"Opus解码失败，使用丢包补偿: {e}")
+            concealed = True
+            try:
+                pcm_data = decoder.decode(b"", frame_size)
+            except opuslib.OpusError:
+                return None, False
+
+        return np.frombuffer(pcm_data, dtype=np.int16), concealed
+
+    def _write_decoded(
+        self, buffer: AudioRingBuffer, samples: np.ndarray, concealed: bool
+    ):
+        """
+        写入解码输出，记录缓冲末尾连续的补偿样本数.
+        """
+        if concealed:
+            self._concealed_tail = min(self._concealed_tail, len(buffer)) + len(
+                samples
+            )
+        else:
+            self._concealed_tail = 0
+        buffer.write(samples)
+
+    def _read_rendered(
+        self, buffer: AudioRingBuffer, count: int
+    ) -> Tuple[np.ndarray, int]:
+        """读取 count 个样本交给设备.
 
-        except asyncio.QueueEmpty:
+        Returns:
+            (样本数据, 其中有效样本数)，末尾的补偿样本不计入有效样本
+        """
+        tail = min(self._concealed_tail, len(buffer))
+        data = buffer.read(count)
+        concealed = max(0, tail - len(buffer))
+        self._concealed_tail = tail - concealed
+        return data, count - concealed
+
+    def _output_callback_direct(self, outdata: np.ndarray, frames: int, time_info):
+        """
+        直接播放24kHz数据（设备支持24kHz时）
+        """
+        while len(self._output_buffer) < frames:
+            audio_data, concealed = self._decode_next_frame()
+            if audio_data is None:
+                break
+            self._write_decoded(self._output_buffer, audio_data, concealed)
+
+        available = min(len(self._output_buffer), frames)
+        rendered = 0
+        if available == 0:
             # 无数据时输出静音
             outdata.fill(0)
+        else:
+            audio_data, rendered = self._read_rendered(self._output_buffer, available)
+            outdata[:available] = audio_data.reshape(-1, AudioConfig.CHANNELS)
+            outdata[available:] = 0
+
+        self._track_rendered(rendered, AudioConfig.OUTPUT_SAMPLE_RATE, time_info)
 
-    def _output_callback_with_resample(self, outdata: np.ndarray, frames: int):
+    def _output_callback_with_resample(
+        self, outdata: np.ndarray, frames: int, time_info
+    ):
         """
         重采样播放（24kHz -> 设备采样率）
         """
         try:
-            # 持续处理24kHz数据进行重采样
+            # 持续解码24kHz数据进行重采样
             while len(self._resample_output_buffer) < frames:
-                try:
-                    audio_data = self._output_buffer.get_nowait()
-
-                    # 24kHz -> 设备采样率重采样
-                    resampled_data = self.output_resampler.resample_chunk(
-                        audio_data, last=False
-                    )
-                    if len(resampled_data) > 0:
-                        self._resample_output_buffer.extend(
-                            resampled_data.astype(np.int16)
-                        )
-
-                except asyncio.QueueEmpty:
+                audio_data, concealed = self._decode_next_frame()
+                if audio_data is None:
                     break
 
-            # 从重采样缓冲区取数据
-            if len(self._resample_output_buffer) >= frames:
-                frame_data = []
-                for _ in range(frames):
-                    frame_data.append(self._resample_output_buffer.popleft())
+                # 24kHz -> 设备采样率重采样
+                resampled_data = self.output_resampler.resample_chunk(
+                    audio_data, last=False
+                )
+                if len(resampled_data) > 0:
+                    self._write_decoded(
+                        self._resample_output_buffer, resampled_data, concealed
+                    )
 
-                output_array = np.array(frame_data, dtype=np.int16)
-                outdata[:] = output_array.reshape(-1, AudioConfig.CHANNELS)
-            else:
-                # 数据不足时输出静音
+            # 从重采样缓冲区直接读入设备缓冲区（数据不足时补静音，尾部不残留）
+            available = min(len(self._resample_output_buffer), frames)
+            rendered = 0
+            if available == 0:
                 outdata.fill(0)
+            else:
+                output_array, rendered = self._read_rendered(
+                    self._resample_output_buffer, available
+                )
+                outdata[:available] = output_array.reshape(-1, AudioConfig.CHANNELS)
+                outdata[available:] = 0
+
+            self._track_rendered(rendered, self.device_output_sample_rate, time_info)
 
         except Exception as e:
             logger.warning(f"重采样输出失败: {e}")
             outdata.fill(0)
 
+    def _track_rendered(self, rendered: int, sample_rate: int, time_info):
+        """跟踪已交给设备的有效样本，播放数据全部耗尽时通知事件循环.
+
+        Args:
+            rendered: 本次回调写入的有效样本数（不含补零与末尾的丢包补偿样本）
+            sample_rate: 输出流采样率
+            time_info: PortAudio 回调时间信息，用于估算设备输出延迟
+        """
+        # 先读取代次与接收计数再检查缓冲，保证并发写入的新包不会被误报排空
+        generation = self._playback_generation
+        incoming = self._incoming_packets
+
+        if rendered > 0:
+            self._playback_active = True
+            self._playback_end_at = (
+                time.monotonic()
+                + self._output_delay(time_info)
+                + rendered / sample_rate
+            )
+
+        if not self._playback_active or self._is_playback_pending():
+            return
+
+        self._playback_active = False
+        loop = self._main_loop
+        if loop is not None and not loop.is_closed():
+            try:
+                loop.call_soon_threadsafe(
+                    self._on_playback_drained,
+                    generation,
+                    incoming,
+                    self._playback_end_at,
+                )
+            except RuntimeError:
+                pass
+
+    def _output_delay(self, time_info) -> float:
+        """
+        本次回调缓冲到实际播出的延迟（秒），主机不提供时间戳时退回流的标称延迟.
+        """
+        try:
+            dac_time = time_info.outputBufferDacTime
+            current_time = time_info.currentTime
+            if dac_time > 0 and current_time > 0 and dac_time >= current_time:
+                return dac_time - current_time
+        except AttributeError:
+            pass
+
+        stream = self.output_stream
+        try:
+            return float(stream.latency) if stream is not None else 0.0
+        except Exception:
+            return 0.0
+
+    def _on_playback_drained(self, generation: int, incoming: int, end_at: float):
+        """
+        事件循环线程：在最后一个样本播出时刻置位排空事件.
+        """
+        if not self._is_drain_current(generation, incoming):
+            return
+
+        if self._drain_timer is not None:
+            self._drain_timer.cancel()
+            self._drain_timer = None
+
+        delay = end_at - time.monotonic()
+        if delay > 0:
+            self._drain_timer = self._main_loop.call_later(
+                delay, self._set_playback_drained, generation, incoming
+            )
+        else:
+            self._set_playback_drained(generation, incoming)
+
+    def _set_playback_drained(self, generation: int, incoming: int):
+        self._drain_timer = None
+        if self._is_drain_current(generation, incoming):
+            self._playback_drained.set()
+
+    def _is_drain_current(self, generation: int, incoming: int) -> bool:
+        """
+        排空通知发出后既未清空队列也未收到新包.
+        """
+        return (
+            generation == self._playback_generation
+            and incoming == self._incoming_packets
+        )
+
+    def _resume_playback(self):
+        """
+        事件循环线程：排空后收到新包，恢复为播放中.
+        """
+        self._resume_scheduled = False
+        if self._playback_drained.is_set() and self._is_playback_pending():
+            self._reset_playback_drain(drained=False)
+
+    def _reset_playback_drain(self, drained: bool):
+        """
+        事件循环线程：新数据写入（未排空）或清空队列（立即排空）时重置排空状态.
+        """
+        self._playback_generation += 1
+        if self._drain_timer is not None:
+            self._drain_timer.cancel()
+            self._drain_timer = None
+        if drained:
+            self._playback_drained.set()
+        elif self._playback_drained.is_set():
+            self._playback_drained.clear()
+
     def _input_finished_callback(self):
         """
         输入流结束.
@@ -518,7 +866,7 @@ class AudioCodec:
                     self.input_stream.stop()
                     self.input_stream.close()
 
-                self.input_stream = sd.InputStream(
+                self.input_stream = self.backend.input_stream(
                     samplerate=self.device_input_sample_rate,
                     channels=AudioConfig.CHANNELS,
                     dtype=np.int16,
@@ -548,7 +896,7 @@ class AudioCodec:
                         * (AudioConfig.FRAME_DURATION / 1000)
                     )
 
-                self.output_stream = sd.OutputStream(
+                self.output_stream = self.backend.output_stream(
                     device=self.speaker_device_id,  # 指定扬声器设备ID
                     samplerate=output_sample_rate,
                     channels=AudioConfig.CHANNELS,
@@ -569,40 +917,268 @@ class AudioCodec:
             else:
                 raise
 
-    async def get_raw_audio_for_detection(self) -> Optional[bytes]:
+    def _stream_lost(self) -> bool:
+        """
+        音频流应运行却已停止或回调停摆（设备被拔出时的常见表现）.
+        """
+        now = time.monotonic()
+        for stream, heartbeat in (
+            (self.input_stream, self._input_heartbeat),
+            (self.output_stream, self._output_heartbeat),
+        ):
+            if stream is None or not stream.active:
+                return True
+            if now - heartbeat > self._stream_stall_timeout:
+                return True
+        return False
+
+    async def _device_monitor_loop(self):
         """
-        获取唤醒词音频数据.
+        设备监控：检测流中断、系统设备列表变化以及首选设备恢复，自动切换音频流.
         """
+        registry = self._device_registry
+        last_fingerprint = await asyncio.to_thread(registry.fingerprint)
+        last_rescan = time.monotonic()
+
         try:
-            if self._wakeword_buffer.empty():
-                return None
+            while not self._is_closing:
+                await asyncio.sleep(self._device_monitor_interval)
+
+                reason = None
+                fingerprint = await asyncio.to_thread(registry.fingerprint)
+                if self._streams_expected and self._stream_lost():
+                    reason = "音频流中断"
+                elif fingerprint is not None and fingerprint != last_fingerprint:
+                    reason = "系统设备列表变化"
+                elif (
+                    fingerprint is None
+                    and (self._input_fallback or self._output_fallback)
+                    and time.monotonic() - last_rescan >= self._device_rescan_interval
+                ):
+                    # 平台无法廉价感知插拔时，回退期间定期重扫等待首选设备恢复
+                    reason = "等待首选设备恢复"
 
-            audio_data = self._wakeword_buffer.get_nowait()
+                if reason is None:
+                    continue
 
-            if hasattr(audio_data, "tobytes"):
-                return audio_data.tobytes()
-            elif hasattr(audio_data, "astype"):
-                return audio_data.astype("int16").tobytes()
-            else:
-                return audio_data
+                last_fingerprint = fingerprint
+                last_rescan = time.monotonic()
+                try:
+                    await self._switch_devices(reason)
+                except Exception as e:
+                    logger.error(f"音频设备切换失败: {e}", exc_info=True)
+        except asyncio.CancelledError:
+            logger.debug("音频设备监控任务被取消")
+
+    def _close_streams(self):
+        for name in ("input_stream", "output_stream"):
+            stream = getattr(self, name)
+            if stream is None:
+                continue
+            try:
+                stream.stop()
+                stream.close()
+            except Exception as e:
+                logger.debug(f"关闭音频流失败: {e}")
+            setattr(self, name, None)
 
-        except asyncio.QueueEmpty:
-            return None
-        except Exception as e:
-            logger.error(f"获取唤醒词音频数据失败: {e}")
-            return None
+    def _has_open_streams(self) -> bool:
+        """
+        是否仍有打开的 PortAudio 流（决定设备重扫能否重新初始化 PortAudio）.
+        """
+        if self.input_stream is not None or self.output_stream is not None:
+            return True
+        aec = self.aec_processor
+        return aec is not None and aec.reference_stream is not None
+
+    async def _switch_devices(self, reason: str):
+        """设备变化后重新扫描并切换音频流.
+
+        首选设备存在时切回首选设备，否则回退到系统默认设备；只重建采样率发生变化的
+        重采样器，输入块长变化时才重建编码线程。
+        """
+        logger.warning(f"检测到音频设备变化（{reason}），重新扫描设备")
+        was_expected = self._streams_expected
+        self._streams_expected = False
+
+        # 重新初始化 PortAudio 会使已打开的流失效，需先关闭（含macOS参考信号流）
+        self._close_streams()
+        rebuild_aec = (
+            self._dsp_worker is None
+            and self.aec_processor is not None
+            and self.aec_processor.reference_stream is not None
+        )
+        if rebuild_aec:
+            await self.aec_processor.close()
+        await asyncio.to_thread(self._device_registry.refresh, True)
+
+        registry = self._device_registry
+        input_info, self._input_fallback = registry.resolve(
+            self._input_device_key, "input"
+        )
+        output_info, self._output_fallback = registry.resolve(
+            self._output_device_key, "output"
+        )
+        self.mic_device_id = input_info.index if input_info else None
+        self.speaker_device_id = output_info.index if output_info else None
+
+        input_rate = self._pick_sample_rate(
+            self.mic_device_id, "input", AudioConfig.INPUT_SAMPLE_RATE
+        )
+        if input_rate != self.device_input_sample_rate:
+            # 块长随采样率变化：停止编码线程后重建重采样器与队列
+            if self._encoder_worker is not None:
+                self._encoder_worker.stop()
+            self.device_input_sample_rate = input_rate
+            self._device_input_frame_size = int(
+                input_rate * (AudioConfig.FRAME_DURATION / 1000)
+            )
+            self._create_input_resampler()
+            self._start_encoder_worker()
+        elif self._resample_input_buffer is not None:
+            self._resample_input_buffer.clear()
+
+        output_rate = self._pick_sample_rate(
+            self.speaker_device_id, "output", AudioConfig.OUTPUT_SAMPLE_RATE
+        )
+        if output_rate != self.device_output_sample_rate:
+            self.device_output_sample_rate = output_rate
+            self._create_output_resampler()
+        elif self._resample_output_buffer is not None:
+            self._resample_output_buffer.clear()
+
+        self._streams_expected = was_expected
+        await self._create_streams()
+        if not was_expected:
+            await self.stop_streams()
+
+        # 重扫前已关闭 macOS 参考信号流，重建AEC处理器
+        if self._dsp_worker is not None:
+            self._dsp_worker.send_command("reset_aec")
+        elif rebuild_aec:
+            self.aec_processor = AECProcessor()
+            try:
+                await self.aec_processor.initialize()
+            except Exception as e:
+                logger.warning(f"设备切换后重建AEC失败: {e}")
+                self._aec_enabled = False
+
+        logger.info(
+            f"音频设备已切换: 输入[{self.mic_device_id}] "
+            f"{input_info.name if input_info else '默认'}"
+            f"{'（回退）' if self._input_fallback else ''} {input_rate}Hz, "
+            f"输出[{self.speaker_device_id}] "
+            f"{output_info.name if output_info else '默认'}"
+            f"{'（回退）' if self._output_fallback else ''} {output_rate}Hz"
+        )
+
+    def get_device_status(self) -> dict:
+        """
+        获取当前设备、回退状态及设备注册表统计.
+        """
+        status = {
+            "backend": self.backend.name,
+            "input_device_id": self.mic_device_id,
+            "output_device_id": self.speaker_device_id,
+            "input_sample_rate": self.device_input_sample_rate,
+            "output_sample_rate": self.device_output_sample_rate,
+            "input_fallback": self._input_fallback,
+            "output_fallback": self._output_fallback,
+        }
+        if self._device_registry is not None:
+            status["registry"] = self._device_registry.get_stats()
+        return status
+
+    def attach_dsp_worker(self, worker):
+        """
+        接入已启动的DSP工作进程（需在 initialize() 之前调用）.
+        """
+        self._dsp_worker = worker
+
+    def subscribe_capture(
+        self, name: str, loop: Optional[asyncio.AbstractEventLoop] = None
+    ) -> CaptureSubscription:
+        """订阅16kHz采集帧.
+
+        Args:
+            name: 订阅者名称（用于统计）
+            loop: 需要在事件循环中 await 新帧时传入
+
+        Returns:
+            订阅句柄，用完后调用 close() 取消订阅
+        """
+        return self.capture_bus.subscribe(name, loop)
+
+    def get_capture_stats(self) -> dict:
+        """
+        获取采集总线与编码线程统计信息.
+        """
+        stats = self.capture_bus.get_stats()
+        if self._encoder_worker is not None:
+            stats["encoder"] = self._encoder_worker.get_stats()
+        return stats
 
     def set_encoded_audio_callback(self, callback):
         """
         设置编码回调.
         """
         self._encoded_audio_callback = callback
+        if self._encoder_worker is not None:
+            self._encoder_worker.set_callback(callback)
 
         if callback:
             logger.info("启用实时编码")
         else:
             logger.info("禁用编码回调")
 
+    def get_encoder_profile(self) -> OpusEncoderProfile:
+        """
+        获取当前Opus编码档位.
+        """
+        return self._encoder_profile
+
+    def set_encoder_profile(
+        self, profile: Union[str, OpusEncoderProfile]
+    ) -> OpusEncoderProfile:
+        """切换Opus编码档位，无需重开音频流.
+
+        新档位在编码线程的下一个帧边界生效（新建编码器，不残留旧档位参数）。
+
+        Args:
+            profile: 档位名称（内置或 AUDIO_OPTIONS.ENCODER_PROFILES 中定义）或档位对象
+
+        Returns:
+            生效的档位；名称未知或参数非法时抛出 ValueError
+        """
+        if isinstance(profile, str):
+            profile = resolve_profile(profile, self.config)
+        profile.validate()
+
+        if self._encoder_worker is not None and self.opus_encoder is not None:
+            self.opus_encoder = self._create_opus_encoder(profile)
+            self._encoder_worker.set_encoder(self.opus_encoder, profile)
+
+        self._encoder_profile = profile
+        logger.info(f"切换Opus编码档位: {profile.to_dict()}")
+        return profile
+
+    def has_speech_gate(self) -> bool:
+        return self._speech_gate is not None
+
+    def set_speech_gate_active(self, active: bool):
+        """
+        激活/关闭上行语音门限（进入/离开 LISTENING 时调用）.
+        """
+        if self._speech_gate is not None:
+            self._speech_gate.set_active(active)
+
+    def set_end_of_speech_callback(self, callback):
+        """
+        设置本地说话结束回调（在编码线程中调用，需自行切回事件循环）.
+        """
+        if self._speech_gate is not None:
+            self._speech_gate.set_end_of_speech_callback(callback)
+
     def is_aec_enabled(self) -> bool:
         """
         检查AEC是否启用.
@@ -613,6 +1189,12 @@ class AudioCodec:
         """
         获取AEC状态信息.
         """
+        if self._dsp_worker is not None:
+            return {
+                "enabled": self._aec_enabled,
+                "process": "dsp_worker",
+                **self._dsp_worker.get_remote_stats("aec"),
+            }
         if not self._aec_enabled or not self.aec_processor:
             return {"enabled": False, "reason": "AEC未启用或初始化失败"}
         
@@ -634,6 +1216,12 @@ class AudioCodec:
         Returns:
             实际的AEC状态
         """
+        if self._dsp_worker is not None:
+            self._aec_enabled = enabled and self._dsp_worker.aec_enabled
+            self._dsp_worker.send_command("aec_enabled", enabled=self._aec_enabled)
+            logger.info(f"AEC状态: {'启用' if self._aec_enabled else '禁用'}")
+            return self._aec_enabled
+
         if not self.aec_processor:
             logger.warning("AEC处理器未初始化，无法切换状态")
             return False
@@ -646,47 +1234,105 @@ class AudioCodec:
         logger.info(f"AEC状态: {'启用' if self._aec_enabled else '禁用'}")
         return self._aec_enabled
 
-    async def write_audio(self, opus_data: bytes):
-        """
-        解码音频并播放 网络接收的Opus数据 -> 解码24kHz -> 播放队列.
+    def push_incoming_audio(
+        self, opus_data: bytes, sequence: Optional[int] = None
+    ) -> bool:
+        """网络接收的Opus数据 -> 抖动缓冲，由播放回调按播放节奏解码.
+
+        可在协议接收线程中直接调用（抖动缓冲自带锁），不创建任务；
+        仅在播放已排空后收到第一个包时切回事件循环一次，清除排空状态。
         """
         try:
-            # Opus解码为24kHz PCM数据
-            pcm_data = self.opus_decoder.decode(
-                opus_data, AudioConfig.OUTPUT_FRAME_SIZE
-            )
+            if not self._jitter_buffer.put(opus_data, sequence):
+                return False
+        except Exception as e:
+            logger.warning(f"音频写入失败，丢弃此帧: {e}")
+            return False
 
-            audio_array = np.frombuffer(pcm_data, dtype=np.int16)
+        # 先入缓冲再递增计数，播放回调不会基于旧计数误报排空
+        self._incoming_packets += 1
+        self._last_incoming_at = time.monotonic()
 
-            expected_length = AudioConfig.OUTPUT_FRAME_SIZE * AudioConfig.CHANNELS
-            if len(audio_array) != expected_length:
-                logger.warning(
-                    f"解码音频长度异常: {len(audio_array)}, 期望: {expected_length}"
-                )
-                return
+        if self._playback_drained.is_set() and not self._resume_scheduled:
+            loop = self._main_loop
+            if loop is not None and not loop.is_closed():
+                self._resume_scheduled = True
+                try:
+                    loop.call_soon_threadsafe(self._resume_playback)
+                except RuntimeError:
+                    self._resume_scheduled = False
+        return True
 
-            # 放入播放队列
-            self._put_audio_data_safe(self._output_buffer, audio_array)
+    async def write_audio(self, opus_data: bytes, sequence: Optional[int] = None):
+        """
+        协程形式的写入接口，等同于 push_incoming_audio.
+        """
+        self.push_incoming_audio(opus_data, sequence)
 
-        except opuslib.OpusError as e:
-            logger.warning(f"Opus解码失败，丢弃此帧: {e}")
-        except Exception as e:
-            logger.warning(f"音频写入失败，丢弃此帧: {e}")
+    @property
+    def last_incoming_at(self) -> float:
+        """
+        最近一次收到下行音频包的 monotonic 时间.
+        """
+        return self._last_incoming_at
+
+    def get_playback_stats(self) -> dict:
+        """
+        获取播放抖动缓冲统计（欠载/迟到/补偿计数及目标深度）.
+        """
+        stats = self._jitter_buffer.get_stats()
+        stats["decode_errors"] = self._decode_errors
+        stats["buffered_samples"] = len(self._output_buffer)
+        return stats
+
+    def _is_playback_pending(self) -> bool:
+        """
+        是否还有待播放的有效音频（输出缓冲末尾的补偿样本不算）.
+        """
+        if not self._jitter_buffer.is_empty():
+            return True
+        buffered = len(self._output_buffer)
+        if self._resample_output_buffer is not None:
+            buffered += len(self._resample_output_buffer)
+        return buffered > self._concealed_tail
 
     async def wait_for_audio_complete(self, timeout=10.0):
         """
-        等待播放完成.
+        等待播放完成：由播放回调在最后一个样本经设备延迟播出后通知，无需轮询.
         """
-        start = time.time()
+        if self._playback_drained.is_set():
+            return
 
-        while not self._output_buffer.empty() and time.time() - start < timeout:
-            await asyncio.sleep(0.05)
+        try:
+            await asyncio.wait_for(self._playback_drained.wait(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(
+                f"音频播放超时，剩余抖动缓冲: {self._jitter_buffer.depth} 包"
+            )
 
-        await asyncio.sleep(0.3)
+    async def wait_for_playback_idle(self, silence_sec: float, timeout: float):
+        """等待下行音频静默：播放已排空，且最近 silence_sec 内没有新包到达.
 
-        if not self._output_buffer.empty():
-            output_remaining = self._output_buffer.qsize()
-            logger.warning(f"音频播放超时，剩余队列 - 输出: {output_remaining} 帧")
+        由播放缓冲自身的状态与最后到达时间判断，不需要每包重置计时器。
+        最长等待 timeout 秒。
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return
+
+            quiet_for = time.monotonic() - self._last_incoming_at
+            if quiet_for < silence_sec:
+                await asyncio.sleep(min(silence_sec - quiet_for, remaining))
+            elif not self._playback_drained.is_set():
+                try:
+                    await asyncio.wait_for(self._playback_drained.wait(), remaining)
+                except asyncio.TimeoutError:
+                    return
+            else:
+                return
 
     async def clear_audio_queue(self):
         """
@@ -694,26 +1340,24 @@ class AudioCodec:
         """
         cleared_count = 0
 
-        queues_to_clear = [
-            self._wakeword_buffer,
-            self._output_buffer,
-        ]
+        if self._encoder_worker is not None:
+            cleared_count += self._encoder_worker.clear()
+        cleared_count += self.capture_bus.reset()
+        if self._dsp_worker is not None:
+            self._dsp_worker.send_command("reset_capture")
+        cleared_count += self._jitter_buffer.clear()
+        cleared_count += self._output_buffer.clear()
 
-        for queue in queues_to_clear:
-            while not queue.empty():
-                try:
-                    queue.get_nowait()
-                    cleared_count += 1
-                except asyncio.QueueEmpty:
-                    break
+        if self._resample_input_buffer is not None:
+            cleared_count += self._resample_input_buffer.clear()
 
-        if self._resample_input_buffer:
-            cleared_count += len(self._resample_input_buffer)
-            self._resample_input_buffer.clear()
+        if self._resample_output_buffer is not None:
+            cleared_count += self._resample_output_buffer.clear()
+        self._concealed_tail = 0
 
-        if self._resample_output_buffer:
-            cleared_count += len(self._resample_output_buffer)
-            self._resample_output_buffer.clear()
+        # 播放数据已全部丢弃，等待者立即返回
+        self._playback_active = False
+        self._reset_playback_drain(drained=True)
 
         if cleared_count > 0:
             logger.info(f"清空音频队列，丢弃 {cleared_count} 帧音频数据")
@@ -741,6 +1385,8 @@ class AudioCodec:
                     logger.warning(f"启动输出流时出错: {e}")
                     await self.reinitialize_stream(is_input=False)
 
+            self._input_heartbeat = self._output_heartbeat = time.monotonic()
+            self._streams_expected = True
             logger.info("音频流已启动")
         except Exception as e:
             logger.error(f"启动音频流失败: {e}")
@@ -749,6 +1395,7 @@ class AudioCodec:
         """
         停止音频流.
         """
+        self._streams_expected = False
         try:
             if self.input_stream and self.input_stream.active:
                 self.input_stream.stop()
@@ -781,8 +1428,17 @@ class AudioCodec:
             return
 
         self._is_closing = True
+        self._streams_expected = False
         logger.info("开始关闭音频编解码器...")
 
+        if self._device_monitor_task and not self._device_monitor_task.done():
+            self._device_monitor_task.cancel()
+            try:
+                await self._device_monitor_task
+            except asyncio.CancelledError:
+                pass
+        self._device_monitor_task = None
+
         try:
             await self.clear_audio_queue()
 
@@ -804,13 +1460,27 @@ class AudioCodec:
                 finally:
                     self.output_stream = None
 
+            # 释放后端资源（如写入完成的WAV文件）
+            try:
+                self.backend.close()
+            except Exception as e:
+                logger.warning(f"关闭音频后端失败: {e}")
+
+            # 流已停止，再停编码线程（其使用重采样器和编码器）
+            if self._encoder_worker is not None:
+                self._encoder_worker.stop()
+                self._encoder_worker = None
+
             await self._cleanup_resampler(self.input_resampler, "输入")
             await self._cleanup_resampler(self.output_resampler, "输出")
             self.input_resampler = None
             self.output_resampler = None
 
-            self._resample_input_buffer.clear()
-            self._resample_output_buffer.clear()
+            self._resample_input_buffer = None
+            self._resample_output_buffer = None
+
+            # 唤醒并移除所有采集订阅者
+            self.capture_bus.close()
 
             # 关闭AEC处理器
             if self.aec_processor:
@@ -0,0 +1,274 @@
+import asyncio
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from app.common.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class CaptureSubscription:
+    """
+    采集总线的订阅者，持有独立的读游标、唤醒信号和丢帧计数.
+
+    read() 返回总线槽位的只读视图（零拷贝）。视图在生产者追上该槽位之前有效，
+    及时消费的订阅者至少有 slots - 1 帧的宽限；需要跨越更长时间持有时请 copy。
+    """
+
+    def __init__(
+        self,
+        bus: "CaptureBus",
+        name: str,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+    ):
+        self.name = name
+        self._bus = bus
+        self._read_seq = bus.write_seq
+        self._closed = False
+
+        # 最近一次 read() 所读帧的发布时间（time.monotonic）
+        self.last_timestamp = 0.0
+
+        # 统计
+        self.dropped = 0
+        self.frames_read = 0
+
+        # 线程侧唤醒（工作线程阻塞等待）
+        self._thread_event = threading.Event()
+        self._thread_waiting = False
+
+        # 协程侧唤醒（事件循环中 await）
+        self._loop = loop
+        self._async_event = asyncio.Event() if loop is not None else None
+        self._async_waiting = False
+
+    @property
+    def pending(self) -> int:
+        """
+        尚未读取的帧数（不超过总线可保留的帧数）.
+        """
+        return min(self._bus.write_seq - self._read_seq, self._bus.max_lag)
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def read(self) -> Optional[np.ndarray]:
+        """
+        读取下一帧，无数据时返回None；落后过多时跳过最旧帧并计入丢帧.
+        """
+        bus = self._bus
+        lag = bus.write_seq - self._read_seq
+        if lag <= 0:
+            return None
+
+        if lag > bus.max_lag:
+            skipped = lag - bus.max_lag
+            self.dropped += skipped
+            self._read_seq += skipped
+
+        frame = bus.slot_view(self._read_seq)
+        self.last_timestamp = bus.slot_timestamp(self._read_seq)
+        self._read_seq += 1
+        self.frames_read += 1
+        return frame
+
+    def skip_pending(self) -> int:
+        """
+        丢弃所有未读帧（暂停/清空时使用），返回跳过的帧数.
+        """
+        skipped = self.pending
+        self._read_seq = self._bus.write_seq
+        return skipped
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        在工作线程中阻塞等待新帧，返回是否有数据可读.
+        """
+        if self.pending:
+            return True
+
+        self._thread_event.clear()
+        self._thread_waiting = True
+        try:
+            # 置位等待标志后再检查一次，避免与生产者之间的唤醒丢失
+            if self.pending:
+                return True
+            self._thread_event.wait(timeout)
+            return self.pending > 0
+        finally:
+            self._thread_waiting = False
+
+    async def wait_async(self, timeout: Optional[float] = None) -> bool:
+        """
+        在事件循环中等待新帧，返回是否有数据可读.
+        """
+        if self._async_event is None:
+            raise RuntimeError(f"订阅者 {self.name} 未绑定事件循环，无法异步等待")
+
+        if self.pending:
+            return True
+
+        self._async_event.clear()
+        self._async_waiting = True
+        try:
+            if self.pending:
+                return True
+            if timeout is None:
+                await self._async_event.wait()
+            else:
+                try:
+                    await asyncio.wait_for(self._async_event.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+            return self.pending > 0
+        finally:
+            self._async_waiting = False
+
+    def wakeup(self):
+        """
+        唤醒所有等待者（关闭时使用）.
+        """
+        self._thread_event.set()
+        if self._async_event is not None and self._loop and not self._loop.is_closed():
+            try:
+                self._loop.call_soon_threadsafe(self._async_event.set)
+            except RuntimeError:
+                pass
+
+    def close(self):
+        """
+        取消订阅并唤醒等待者.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._bus.unsubscribe(self)
+        self.wakeup()
+
+    def _notify(self):
+        """
+        生产者线程调用：仅在订阅者确实处于等待状态时发出唤醒.
+        """
+        if self._thread_waiting:
+            self._thread_waiting = False
+            self._thread_event.set()
+
+        if self._async_waiting:
+            self._async_waiting = False
+            loop = self._loop
+            if loop is not None and not loop.is_closed():
+                try:
+                    loop.call_soon_threadsafe(self._async_event.set)
+                except RuntimeError:
+                    # 事件循环已关闭
+                    pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "pending": self.pending,
+            "frames_read": self.frames_read,
+            "dropped": self.dropped,
+        }
+
+
+class CaptureBus:
+    """
+    采集扇出总线：单生产者（音频采集线程）写入16kHz定长帧，多个订阅者各自消费.
+
+    生产者只做一次槽位拷贝并推进写序号，不持锁；订阅者通过各自的读游标读取槽位
+    视图，互不影响。锁仅用于订阅关系变更（写时复制的订阅者元组）。
+    """
+
+    def __init__(self, frame_size: int, slots: int = 50, dtype=np.int16):
+        if slots < 2:
+            raise ValueError(f"采集总线槽位数至少为2: {slots}")
+
+        self.frame_size = int(frame_size)
+        self.slots = int(slots)
+        # 保留一个槽位给生产者写入，避免订阅者读取正在被覆盖的帧
+        self.max_lag = self.slots - 1
+
+        self._frames = np.zeros((self.slots, self.frame_size), dtype=dtype)
+        # 预先创建只读槽位视图，读取时不产生新对象
+        self._slot_views = []
+        for i in range(self.slots):
+            view = self._frames[i]
+            view.flags.writeable = False
+            self._slot_views.append(view)
+        # 每个槽位的发布时间，供订阅者统计处理延迟
+        self._timestamps = np.zeros(self.slots, dtype=np.float64)
+
+        self.write_seq = 0
+        self.rejected_frames = 0
+
+        self._subscribers: Tuple[CaptureSubscription, ...] = ()
+        self._subscribers_lock = threading.Lock()
+
+    def publish(self, frame: np.ndarray) -> bool:
+        """
+        发布一帧（在采集线程调用），帧长不符时拒绝.
+        """
+        if len(frame) != self.frame_size:
+            self.rejected_frames += 1
+            return False
+
+        slot = self.write_seq % self.slots
+        self._frames[slot] = frame
+        self._timestamps[slot] = time.monotonic()
+        self.write_seq += 1
+
+        for subscriber in self._subscribers:
+            subscriber._notify()
+        return True
+
+    def slot_view(self, seq: int) -> np.ndarray:
+        return self._slot_views[seq % self.slots]
+
+    def slot_timestamp(self, seq: int) -> float:
+        return float(self._timestamps[seq % self.slots])
+
+    def subscribe(
+        self, name: str, loop: Optional[asyncio.AbstractEventLoop] = None
+    ) -> CaptureSubscription:
+        """
+        新增订阅者，从当前写位置开始读取.
+        """
+        subscription = CaptureSubscription(self, name, loop)
+        with self._subscribers_lock:
+            self._subscribers = self._subscribers + (subscription,)
+        logger.debug(f"采集总线新增订阅者: {name}")
+        return subscription
+
+    def unsubscribe(self, subscription: CaptureSubscription):
+        with self._subscribers_lock:
+            self._subscribers = tuple(
+                s for s in self._subscribers if s is not subscription
+            )
+        logger.debug(f"采集总线移除订阅者: {subscription.name}")
+
+    def reset(self) -> int:
+        """
+        所有订阅者跳过未读帧，返回跳过的帧总数.
+        """
+        return sum(s.skip_pending() for s in self._subscribers)
+
+    def close(self):
+        """
+        关闭总线，唤醒并移除所有订阅者.
+        """
+        for subscription in self._subscribers:
+            subscription.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "frame_size": self.frame_size,
+            "slots": self.slots,
+            "frames_published": self.write_seq,
+            "rejected_frames": self.rejected_frames,
+            "subscribers": [s.get_stats() for s in self._subscribers],
+        }
@@ -0,0 +1,194 @@
+import math
+from collections import deque
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from app.common.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class EchoDelayEstimator:
+    """
+    回声路径延迟估计（GCC-PHAT）与 ERLE 统计.
+
+    采集与参考信号按处理时的配对关系写入预分配的滑动窗口，每隔 update_interval_ms
+    对窗口做一次相位变换广义互相关：采集窗口与向前多取 max_delay_ms 的参考窗口
+    做 FFT 互相关，峰值位置即回声相对参考信号的延迟。只在参考信号足够响（扬声器
+    在播放）且峰值显著时采纳，取最近若干次估计的中位数，变化超过阈值才更新。
+
+    ERLE 为远端活跃期间 APM 处理前后采集信号能量比（dB），指数平滑。
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        window_ms: int = 1000,
+        max_delay_ms: int = 500,
+        update_interval_ms: int = 1000,
+        min_confidence: float = 6.0,
+        smoothing: int = 5,
+        change_threshold_ms: int = 4,
+        reference_active_dbfs: float = -50.0,
+        initial_delay_ms: int = 40,
+    ):
+        self.sample_rate = sample_rate
+        self.window = sample_rate * window_ms // 1000
+        self.max_lag = sample_rate * max_delay_ms // 1000
+        self.update_interval = sample_rate * update_interval_ms // 1000
+        self.min_confidence = min_confidence
+        self.change_threshold_ms = change_threshold_ms
+
+        # 参考窗口需覆盖 window + max_lag，FFT长度取2的幂避免循环相关混叠
+        self._history = self.window + self.max_lag
+        self._fft_size = 1 << math.ceil(math.log2(self._history + self.window))
+
+        # 双倍长度的线性缓冲：写入追加，满时整体左移一次，读取始终为连续切片
+        self._capture = np.zeros(self._history * 2, dtype=np.float32)
+        self._reference = np.zeros(self._history * 2, dtype=np.float32)
+        self._write_pos = 0
+        self._filled = 0
+        self._since_update = 0
+
+        # FFT 输入暂存（零填充）
+        self._capture_pad = np.zeros(self._fft_size, dtype=np.float32)
+        self._reference_pad = np.zeros(self._fft_size, dtype=np.float32)
+
+        # 远端活跃能量阈值（每样本均方，int16满幅为1.0）
+        self._reference_active_power = (10 ** (reference_active_dbfs / 10)) * (32768.0**2)
+        self._active_samples = 0
+
+        self._estimates: deque = deque(maxlen=max(1, smoothing))
+        self.delay_ms = int(initial_delay_ms)
+        self.confidence = 0.0
+        self._pending_delay: Optional[int] = None
+        self.estimate_count = 0
+        self.update_count = 0
+
+        # ERLE
+        self._scratch = np.zeros(0, dtype=np.float32)
+        self._input_power = 0.0
+        self._reference_frame_active = False
+        self._erle_input = 0.0
+        self._erle_output = 0.0
+        self.erle_db: Optional[float] = None
+
+    def _as_float(self, frame: np.ndarray) -> np.ndarray:
+        count = len(frame)
+        if len(self._scratch) < count:
+            self._scratch = np.zeros(count, dtype=np.float32)
+        scratch = self._scratch[:count]
+        np.copyto(scratch, frame, casting="unsafe")
+        return scratch
+
+    def push(self, capture: np.ndarray, reference: np.ndarray):
+        """写入一帧配对的采集（APM处理前）与参考信号.
+
+        Args:
+            capture: 采集信号（int16）
+            reference: 同一时刻送入APM的参考信号（int16，长度与采集一致）
+        """
+        count = len(capture)
+        if count == 0 or count > self._history:
+            return
+
+        if self._write_pos + count > len(self._capture):
+            keep = self._history - count
+            start = self._write_pos - keep
+            self._capture[:keep] = self._capture[start : self._write_pos]
+            self._reference[:keep] = self._reference[start : self._write_pos]
+            self._write_pos = keep
+
+        end = self._write_pos + count
+        capture_slot = self._capture[self._write_pos : end]
+        reference_slot = self._reference[self._write_pos : end]
+        np.copyto(capture_slot, capture, casting="unsafe")
+        np.copyto(reference_slot, reference, casting="unsafe")
+        self._write_pos = end
+        self._filled = min(self._filled + count, self._history)
+        self._since_update += count
+
+        reference_power = float(np.dot(reference_slot, reference_slot)) / count
+        self._reference_frame_active = reference_power >= self._reference_active_power
+        if self._reference_frame_active:
+            self._active_samples += count
+            self._input_power = float(np.dot(capture_slot, capture_slot))
+
+        if self._filled >= self._history and self._since_update >= self.update_interval:
+            self._since_update = 0
+            # 窗口内远端活跃不足一半时，互相关峰值不可靠
+            if self._active_samples * 2 >= self.window:
+                self._estimate()
+            self._active_samples = 0
+
+    def push_output(self, processed: np.ndarray):
+        """
+        写入APM处理后的采集信号，远端活跃期间累计ERLE.
+        """
+        if not self._reference_frame_active:
+            return
+        processed = self._as_float(processed)
+        output_power = float(np.dot(processed, processed))
+
+        # 指数平滑的能量累计，约2秒时间常数（20ms帧）
+        alpha = 0.01
+        self._erle_input += alpha * (self._input_power - self._erle_input)
+        self._erle_output += alpha * (output_power - self._erle_output)
+        if self._erle_input > 0:
+            self.erle_db = 10 * math.log10(self._erle_input / (self._erle_output + 1.0))
+
+    def _estimate(self):
+        end = self._write_pos
+        capture = self._capture[end - self.window : end]
+        reference = self._reference[end - self._history : end]
+
+        self._capture_pad[: self.window] = capture
+        self._reference_pad[: self._history] = reference
+
+        capture_spec = np.fft.rfft(self._capture_pad)
+        reference_spec = np.fft.rfft(self._reference_pad)
+        cross = reference_spec * np.conj(capture_spec)
+        cross /= np.abs(cross) + 1e-9
+        correlation = np.fft.irfft(cross, self._fft_size)
+
+        # corr[k] = Σ r[n + k]·c[n]；采集窗口起点对应参考窗口的 max_lag 处，
+        # 峰值偏移 k 即延迟 max_lag - k
+        candidates = np.abs(correlation[: self.max_lag + 1])
+        offset = int(np.argmax(candidates))
+        peak = float(candidates[offset])
+        mean = float(np.mean(np.abs(correlation))) + 1e-12
+        self.confidence = peak / mean
+        self.estimate_count += 1
+
+        if self.confidence < self.min_confidence:
+            return
+
+        lag_samples = self.max_lag - offset
+        self._estimates.append(lag_samples * 1000 / self.sample_rate)
+        delay_ms = int(round(float(np.median(self._estimates))))
+        if abs(delay_ms - self.delay_ms) >= self.change_threshold_ms:
+            logger.info(
+                f"回声延迟估计更新: {self.delay_ms}ms -> {delay_ms}ms "
+                f"(置信度 {self.confidence:.1f})"
+            )
+            self.delay_ms = delay_ms
+            self._pending_delay = delay_ms
+            self.update_count += 1
+
+    def take_delay_update(self) -> Optional[int]:
+        """
+        取出待应用的新延迟（毫秒），无变化时返回None.
+        """
+        delay = self._pending_delay
+        self._pending_delay = None
+        return delay
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "delay_ms": self.delay_ms,
+            "delay_confidence": round(self.confidence, 2),
+            "delay_estimates": self.estimate_count,
+            "delay_updates": self.update_count,
+            "erle_db": round(self.erle_db, 1) if self.erle_db is not None else None,
+        }
@@ -0,0 +1,314 @@
+import json
+import sys
+import threading
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import sounddevice as sd
+
+from app.common.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# 探测的候选采样率：16k/24k 可直通编解码，44.1k/48k 为常见硬件采样率
+PROBE_SAMPLE_RATES = (16000, 24000, 44100, 48000)
+
+CACHE_VERSION = 1
+
+
+@dataclass
+class AudioDeviceInfo:
+    """
+    音频设备能力信息，以“设备名|主机API”作为稳定键（设备索引会随热插拔变化）.
+    """
+
+    key: str
+    name: str
+    hostapi: str
+    index: int = -1
+    max_input_channels: int = 0
+    max_output_channels: int = 0
+    default_samplerate: int = 0
+    default_low_input_latency: float = 0.0
+    default_low_output_latency: float = 0.0
+    # 支持的候选采样率，None 表示尚未探测
+    input_rates: Optional[List[int]] = None
+    output_rates: Optional[List[int]] = None
+
+    def same_hardware(self, other: "AudioDeviceInfo") -> bool:
+        """
+        通道数和默认采样率一致时沿用缓存的探测结果.
+        """
+        return (
+            self.max_input_channels == other.max_input_channels
+            and self.max_output_channels == other.max_output_channels
+            and self.default_samplerate == other.default_samplerate
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def make_device_key(name: str, hostapi: str) -> str:
+    return f"{name}|{hostapi}"
+
+
+class AudioDeviceRegistry:
+    """
+    音频设备注册表：缓存设备能力探测结果，并检测设备热插拔.
+
+    - refresh() 读取 PortAudio 设备列表，沿用硬件参数未变的设备的缓存探测结果，
+      不做探测
+    - supported_rates() 首次查询某设备时才探测采样率（仅 PREFER_NATIVE_RATES 启用时
+      需要），结果持久化到缓存文件，下次启动直接复用
+    - refresh(rescan=True) 重新初始化 PortAudio 以发现新插入的设备，
+      仅在 streams_open() 确认没有打开的流时执行，否则跳过重新初始化
+    - fingerprint() 提供廉价的系统设备变化指纹（Linux 读取 /proc/asound/cards），
+      其他平台返回None，由调用方通过流中断检测设备移除
+    """
+
+    def __init__(
+        self,
+        cache_file: Optional[Path] = None,
+        probe_rates: Tuple[int, ...] = PROBE_SAMPLE_RATES,
+        streams_open: Optional[Callable[[], bool]] = None,
+    ):
+        """
+        Args:
+            cache_file: 设备能力缓存文件
+            probe_rates: 探测的候选采样率
+            streams_open: 返回当前是否仍有打开的音频流；未提供时不做重新初始化
+        """
+        self.cache_file = Path(cache_file) if cache_file else None
+        self.probe_rates = tuple(probe_rates)
+        self._streams_open = streams_open
+
+        self._lock = threading.Lock()
+        self._cached: Dict[str, AudioDeviceInfo] = {}
+        self._live: Dict[str, AudioDeviceInfo] = {}
+        self._by_index: Dict[int, AudioDeviceInfo] = {}
+
+        self.probe_count = 0
+        self.rescan_count = 0
+        self.rescan_skipped = 0
+
+        self._load_cache()
+
+    def _load_cache(self):
+        if not self.cache_file or not self.cache_file.exists():
+            return
+        try:
+            data = json.loads(self.cache_file.read_text(encoding="utf-8"))
+            if data.get("version") != CACHE_VERSION:
+                return
+            for item in data.get("devices", []):
+                info = AudioDeviceInfo(**item)
+                self._cached[info.key] = info
+            logger.debug(f"已加载音频设备缓存: {len(self._cached)} 个设备")
+        except Exception as e:
+            logger.warning(f"读取音频设备缓存失败，将重新探测: {e}")
+            self._cached = {}
+
+    def _save_cache(self):
+        if not self.cache_file:
+            return
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            data = {
+                "version": CACHE_VERSION,
+                "devices": [info.to_dict() for info in self._cached.values()],
+            }
+            self.cache_file.write_text(
+                json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8"
+            )
+        except Exception as e:
+            logger.warning(f"保存音频设备缓存失败: {e}")
+
+    def _probe_rates(self, index: int, channels: int, is_input: bool) -> List[int]:
+        if channels <= 0:
+            return []
+        check = sd.check_input_settings if is_input else sd.check_output_settings
+        rates = []
+        for rate in self.probe_rates:
+            try:
+                check(device=index, channels=1, dtype=np.int16, samplerate=rate)
+                rates.append(rate)
+            except Exception:
+                pass
+        return rates
+
+    def _reinitialize_portaudio(self) -> bool:
+        """重新初始化 PortAudio，使其重新枚举设备.
+
+        sounddevice 没有公开的重新枚举接口，这里调用其私有的 _terminate()/_initialize()，
+        升级 sounddevice 时需复核。Pa_Terminate 会使所有已打开的流失效，
+        因此只在 streams_open() 确认没有打开的流时执行，否则跳过并沿用当前设备列表。
+
+        Returns:
+            是否执行了重新初始化
+        """
+        if self._streams_open is None or self._streams_open():
+            self.rescan_skipped += 1
+            logger.warning("仍有音频流打开（或无法确认），跳过 PortAudio 重新初始化")
+            return False
+
+        terminate = getattr(sd, "_terminate", None)
+        initialize = getattr(sd, "_initialize", None)
+        if terminate is None or initialize is None:
+            self.rescan_skipped += 1
+            logger.warning("当前 sounddevice 版本不支持重新初始化，跳过设备重新扫描")
+            return False
+
+        terminate()
+        initialize()
+        self.rescan_count += 1
+        return True
+
+    def refresh(self, rescan: bool = False) -> Tuple[List[str], List[str]]:
+        """刷新设备列表.
+
+        Args:
+            rescan: 是否重新初始化 PortAudio（发现热插拔设备，有流打开时跳过）
+
+        Returns:
+            (新增设备键列表, 移除设备键列表)
+        """
+        with self._lock:
+            if rescan:
+                self._reinitialize_portaudio()
+
+            hostapis = sd.query_hostapis()
+            live: Dict[str, AudioDeviceInfo] = {}
+            by_index: Dict[int, AudioDeviceInfo] = {}
+
+            for index, device in enumerate(sd.query_devices()):
+                hostapi = hostapis[device["hostapi"]]["name"]
+                info = AudioDeviceInfo(
+                    key=make_device_key(device["name"], hostapi),
+                    name=device["name"],
+                    hostapi=hostapi,
+                    index=index,
+                    max_input_channels=int(device["max_input_channels"]),
+                    max_output_channels=int(device["max_output_channels"]),
+                    default_samplerate=int(device["default_samplerate"]),
+                    default_low_input_latency=float(device["default_low_input_latency"]),
+                    default_low_output_latency=float(
+                        device["default_low_output_latency"]
+                    ),
+                )
+
+                cached = self._cached.get(info.key)
+                if cached is not None and cached.same_hardware(info):
+                    info.input_rates = cached.input_rates
+                    info.output_rates = cached.output_rates
+
+                live[info.key] = info
+                by_index[index] = info
+
+            added = [key for key in live if key not in self._live]
+            removed = [key for key in self._live if key not in live]
+            self._live = live
+            self._by_index = by_index
+
+        if self.rescan_count and (added or removed):
+            logger.info(f"音频设备变化: 新增 {added}，移除 {removed}")
+        return added, removed
+
+    def supported_rates(self, info: AudioDeviceInfo, kind: str) -> List[int]:
+        """设备支持的候选采样率，首次查询时探测并写入缓存.
+
+        Args:
+            info: refresh() 得到的设备信息
+            kind: "input" 或 "output"
+        """
+        is_input = kind == "input"
+        attr = "input_rates" if is_input else "output_rates"
+        with self._lock:
+            rates = getattr(info, attr)
+            if rates is not None:
+                return rates
+
+            channels = info.max_input_channels if is_input else info.max_output_channels
+            rates = self._probe_rates(info.index, channels, is_input)
+            setattr(info, attr, rates)
+            self.probe_count += 1
+
+            cached = self._cached.get(info.key)
+            if cached is not None and cached.same_hardware(info):
+                setattr(cached, attr, rates)
+            else:
+                self._cached[info.key] = info
+            self._save_cache()
+            return rates
+
+    def query_devices(self) -> List[Dict[str, Any]]:
+        """
+        按索引排列的设备列表（与 sd.query_devices() 字段兼容）.
+        """
+        return [
+            {
+                "name": info.name,
+                "index": info.index,
+                "hostapi_name": info.hostapi,
+                "max_input_channels": info.max_input_channels,
+                "max_output_channels": info.max_output_channels,
+                "default_samplerate": info.default_samplerate,
+                "default_low_input_latency": info.default_low_input_latency,
+                "default_low_output_latency": info.default_low_output_latency,
+            }
+            for _, info in sorted(self._by_index.items())
+        ]
+
+    def get(self, key: Optional[str]) -> Optional[AudioDeviceInfo]:
+        if key is None:
+            return None
+        return self._live.get(key)
+
+    def by_index(self, index: Optional[int]) -> Optional[AudioDeviceInfo]:
+        if index is None:
+            return None
+        return self._by_index.get(index)
+
+    def default_device(self, kind: str) -> Optional[AudioDeviceInfo]:
+        try:
+            index = sd.default.device[0 if kind == "input" else 1]
+        except Exception:
+            return None
+        if index is None or index < 0:
+            return None
+        return self._by_index.get(index)
+
+    def resolve(self, key: Optional[str], kind: str) -> Tuple[Optional[AudioDeviceInfo], bool]:
+        """按设备键查找当前索引，设备不存在时回退到系统默认设备.
+
+        Returns:
+            (设备信息, 是否为回退设备)
+        """
+        info = self.get(key)
+        channels_attr = "max_input_channels" if kind == "input" else "max_output_channels"
+        if info is not None and getattr(info, channels_attr) > 0:
+            return info, False
+        return self.default_device(kind), key is not None
+
+    @staticmethod
+    def fingerprint() -> Optional[str]:
+        """
+        系统声卡列表指纹，平台不支持时返回None.
+        """
+        if sys.platform.startswith("linux"):
+            try:
+                return Path("/proc/asound/cards").read_text()
+            except OSError:
+                return None
+        return None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "devices": len(self._live),
+            "cached": len(self._cached),
+            "probe_count": self.probe_count,
+            "rescan_count": self.rescan_count,
+            "rescan_skipped": self.rescan_skipped,
+        }
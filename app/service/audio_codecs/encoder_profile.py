@@ -0,0 +1,178 @@
+from dataclasses import dataclass, replace
+from typing import Any, Dict, Optional
+
+import opuslib
+import opuslib.api.ctl
+import opuslib.api.encoder
+
+from app.common.constants import AudioConfig
+from app.common.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Opus 支持的包时长（毫秒）
+SUPPORTED_PACKET_DURATIONS = (10, 20, 40, 60)
+
+
+@dataclass(frozen=True)
+class OpusEncoderProfile:
+    """
+    Opus 编码参数档位.
+
+    字段为 None 时保持 libopus 默认值（切换档位时会新建编码器，不会残留上一档位的
+    参数），packet_duration_ms 为 None 时使用 AudioConfig.FRAME_DURATION。
+    hello 消息中的 audio_params.frame_duration 在会话内不会重新协商，因此包时长
+    只能等于 AudioConfig.FRAME_DURATION，其他值会被拒绝（配置中的会被忽略）。
+    """
+
+    name: str
+    bitrate: Optional[int] = None  # bps
+    complexity: Optional[int] = None  # 0-10
+    dtx: Optional[bool] = None
+    inband_fec: Optional[bool] = None
+    packet_loss_perc: Optional[int] = None  # 0-100
+    packet_duration_ms: Optional[int] = None
+
+    def validate(self) -> "OpusEncoderProfile":
+        """
+        校验参数范围，非法时抛出 ValueError.
+        """
+        if self.bitrate is not None and not 6000 <= self.bitrate <= 510000:
+            raise ValueError(f"码率超出范围(6000-510000): {self.bitrate}")
+        if self.complexity is not None and not 0 <= self.complexity <= 10:
+            raise ValueError(f"复杂度超出范围(0-10): {self.complexity}")
+        if self.packet_loss_perc is not None and not 0 <= self.packet_loss_perc <= 100:
+            raise ValueError(f"预期丢包率超出范围(0-100): {self.packet_loss_perc}")
+        if (
+            self.packet_duration_ms is not None
+            and self.packet_duration_ms not in SUPPORTED_PACKET_DURATIONS
+        ):
+            raise ValueError(
+                f"不支持的包时长: {self.packet_duration_ms}ms，"
+                f"可选 {SUPPORTED_PACKET_DURATIONS}"
+            )
+        if (
+            self.packet_duration_ms is not None
+            and self.packet_duration_ms != AudioConfig.FRAME_DURATION
+        ):
+            raise ValueError(
+                f"包时长 {self.packet_duration_ms}ms 与 hello 声明的 frame_duration "
+                f"{AudioConfig.FRAME_DURATION}ms 不一致"
+            )
+        return self
+
+    def apply(self, encoder):
+        """
+        将档位写入新建的 opuslib.Encoder（在交给编码线程之前调用）.
+        """
+        if self.bitrate is not None:
+            encoder.bitrate = int(self.bitrate)
+        if self.complexity is not None:
+            encoder.complexity = int(self.complexity)
+        if self.inband_fec is not None:
+            encoder.inband_fec = int(self.inband_fec)
+        if self.packet_loss_perc is not None:
+            encoder.packet_loss_perc = int(self.packet_loss_perc)
+        if self.dtx is not None:
+            # opuslib.Encoder 未暴露 DTX 属性，直接调用 ctl
+            opuslib.api.encoder.encoder_ctl(
+                encoder.encoder_state, opuslib.api.ctl.set_dtx, int(self.dtx)
+            )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "bitrate": self.bitrate,
+            "complexity": self.complexity,
+            "dtx": self.dtx,
+            "inband_fec": self.inband_fec,
+            "packet_loss_perc": self.packet_loss_perc,
+            "packet_duration_ms": self.packet_duration_ms,
+        }
+
+
+# 内置档位
+BUILTIN_PROFILES: Dict[str, OpusEncoderProfile] = {
+    # 保持 libopus 默认参数
+    "default": OpusEncoderProfile("default"),
+    # 低功耗：降低复杂度并启用DTX，适合树莓派等ARM设备
+    "low_power": OpusEncoderProfile(
+        "low_power", bitrate=16000, complexity=3, dtx=True
+    ),
+    # 计量网络：低码率+DTX，带少量FEC冗余
+    "metered": OpusEncoderProfile(
+        "metered",
+        bitrate=12000,
+        complexity=5,
+        dtx=True,
+        inband_fec=True,
+        packet_loss_perc=5,
+    ),
+    # 弱网：启用带内FEC应对丢包
+    "lossy_network": OpusEncoderProfile(
+        "lossy_network",
+        bitrate=24000,
+        complexity=8,
+        inband_fec=True,
+        packet_loss_perc=15,
+    ),
+}
+
+# 配置键 -> 档位字段
+_CONFIG_FIELDS = {
+    "BITRATE": "bitrate",
+    "COMPLEXITY": "complexity",
+    "DTX": "dtx",
+    "INBAND_FEC": "inband_fec",
+    "PACKET_LOSS_PERC": "packet_loss_perc",
+    "PACKET_DURATION_MS": "packet_duration_ms",
+}
+
+
+def profile_from_dict(name: str, values: Dict[str, Any]) -> OpusEncoderProfile:
+    """根据配置字典构造档位.
+
+    Args:
+        name: 档位名称
+        values: 配置项，可用 "BASE" 指定继承的内置档位，其余键见 _CONFIG_FIELDS
+    """
+    base_name = values.get("BASE", "default")
+    base = BUILTIN_PROFILES.get(base_name)
+    if base is None:
+        raise ValueError(f"未知的基础编码档位: {base_name}")
+
+    overrides = {
+        field: values[key] for key, field in _CONFIG_FIELDS.items() if key in values
+    }
+    packet_ms = overrides.get("packet_duration_ms")
+    if packet_ms is not None and packet_ms != AudioConfig.FRAME_DURATION:
+        logger.warning(
+            f"编码档位 {name} 的 PACKET_DURATION_MS={packet_ms} 与 hello 声明的 "
+            f"frame_duration {AudioConfig.FRAME_DURATION}ms 不一致，已忽略"
+        )
+        overrides["packet_duration_ms"] = None
+    return replace(base, name=name, **overrides).validate()
+
+
+def resolve_profile(name: str, config) -> OpusEncoderProfile:
+    """
+    按名称查找档位：优先 AUDIO_OPTIONS.ENCODER_PROFILES 中的自定义档位，其次内置档位.
+    """
+    custom_profiles = config.get_config("AUDIO_OPTIONS.ENCODER_PROFILES", {}) or {}
+    if name in custom_profiles:
+        return profile_from_dict(name, custom_profiles[name])
+    if name in BUILTIN_PROFILES:
+        return BUILTIN_PROFILES[name]
+    raise ValueError(f"未知的编码档位: {name}")
+
+
+def load_profile_from_config(config) -> OpusEncoderProfile:
+    """
+    读取 AUDIO_OPTIONS.ENCODER_PROFILE 配置的档位，失败时回退默认档位.
+    """
+    name = config.get_config("AUDIO_OPTIONS.ENCODER_PROFILE", "default") or "default"
+    try:
+        return resolve_profile(name, config)
+    except Exception as e:
+        logger.warning(f"编码档位 {name} 无效，使用默认档位: {e}")
+        return BUILTIN_PROFILES["default"]
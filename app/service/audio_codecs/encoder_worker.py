@@ -0,0 +1,354 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+
+from app.service.audio_codecs.ring_buffer import AudioRingBuffer
+from app.common.constants import AudioConfig
+from app.common.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class SpscFrameQueue:
+    """
+    有界单生产者/单消费者帧队列，满时丢弃最旧帧（drop-oldest）.
+
+    存储区在构造时分配，生产者（音频回调线程）只做一次槽位拷贝并推进写序号，
+    不持锁；消费者拷贝槽位后校验写序号，若拷贝期间被生产者覆盖则计为丢帧。
+    """
+
+    def __init__(self, block_size: int, slots: int = 16, dtype=np.int16):
+        if slots < 2:
+            raise ValueError(f"帧队列槽位数至少为2: {slots}")
+
+        self.slots = int(slots)
+        # 槽位预留2倍余量，兼容驱动偶发的非标准块长
+        self.slot_size = int(block_size) * 2
+        self._frames = np.zeros((self.slots, self.slot_size), dtype=dtype)
+        self._lengths = np.zeros(self.slots, dtype=np.int64)
+        self._timestamps = np.zeros(self.slots, dtype=np.float64)
+
+        self._write_seq = 0
+        self._read_seq = 0
+
+        # 统计
+        self.dropped = 0
+        self.rejected = 0
+
+        self._event = threading.Event()
+        self._waiting = False
+
+    def __len__(self) -> int:
+        return min(self._write_seq - self._read_seq, self.slots - 1)
+
+    def put(self, block: np.ndarray, timestamp: float) -> bool:
+        """
+        生产者线程调用：拷贝一块样本入队.
+        """
+        samples = block.reshape(-1)
+        count = len(samples)
+        if count > self.slot_size:
+            self.rejected += 1
+            return False
+
+        seq = self._write_seq
+        slot = seq % self.slots
+        self._frames[slot, :count] = samples
+        self._lengths[slot] = count
+        self._timestamps[slot] = timestamp
+        self._write_seq = seq + 1
+
+        if self._waiting:
+            self._waiting = False
+            self._event.set()
+        return True
+
+    def get_into(self, out: np.ndarray):
+        """消费者线程调用：取出最旧的一块样本拷贝到 out.
+
+        Returns:
+            (样本数, 入队时间戳)；队列为空时返回 (0, 0.0)
+        """
+        while True:
+            lag = self._write_seq - self._read_seq
+            if lag <= 0:
+                return 0, 0.0
+
+            # 落后超过容量：跳过最旧帧，保留最新的 slots - 1 帧
+            if lag > self.slots - 1:
+                skipped = lag - (self.slots - 1)
+                self.dropped += skipped
+                self._read_seq += skipped
+
+            seq = self._read_seq
+            slot = seq % self.slots
+            count = int(self._lengths[slot])
+            out[:count] = self._frames[slot, :count]
+            timestamp = float(self._timestamps[slot])
+            self._read_seq = seq + 1
+
+            # 拷贝期间生产者已绕回覆盖该槽位，数据可能不完整，丢弃后继续
+            if self._write_seq - seq >= self.slots:
+                self.dropped += 1
+                continue
+            return count, timestamp
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        if self._write_seq > self._read_seq:
+            return True
+
+        self._event.clear()
+        self._waiting = True
+        try:
+            if self._write_seq > self._read_seq:
+                return True
+            self._event.wait(timeout)
+            return self._write_seq > self._read_seq
+        finally:
+            self._waiting = False
+
+    def wakeup(self):
+        self._event.set()
+
+    def clear(self) -> int:
+        """
+        丢弃所有待处理帧，返回丢弃的帧数.
+
+        可在事件循环线程调用；与消费者并发时最多多处理一帧旧数据。
+        """
+        pending = len(self)
+        self._read_seq = self._write_seq
+        return pending
+
+
+class AudioEncoderWorker:
+    """
+    录音编码工作线程.
+
+    音频回调只把设备样本拷贝进有界 SPSC 队列；重采样、AEC、采集总线发布和
+    Opus 编码都在本线程完成，避免 GIL 争用拉长实时回调。
+    """
+
+    # 延迟统计窗口（帧数）
+    LATENCY_WINDOW = 512
+
+    def __init__(
+        self,
+        block_size: int,
+        frame_size: int,
+        preprocess: Callable[[np.ndarray], Optional[np.ndarray]],
+        queue_slots: int = 16,
+    ):
+        """
+        Args:
+            block_size: 设备回调块长（样本数）
+            frame_size: 编码帧长（16kHz样本数）
+            preprocess: 设备样本 -> 16kHz帧的处理函数（重采样/AEC/发布），
+                数据不足一帧时返回None
+            queue_slots: 队列槽位数
+        """
+        self.frame_size = frame_size
+        self._preprocess = preprocess
+        self._queue = SpscFrameQueue(block_size, queue_slots)
+        self._work_buffer = np.zeros(self._queue.slot_size, dtype=np.int16)
+
+        self._encoder = None
+        self._callback: Optional[Callable[[bytes], None]] = None
+
+        # 编码器/档位在编码线程内、帧边界处切换，避免与 encode 并发
+        self._profile = None
+        self._pending_encoder = None
+        self._packet_size = frame_size
+        self._packet_buffer = AudioRingBuffer(frame_size * 8)
+        self._dtx_enabled = False
+        self._dtx_suppressed = 0
+
+        # 上行语音门限（可选），在编码后决定哪些包需要发送
+        self._speech_gate = None
+
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+        # 编码耗时与采集->编码完成耗时（毫秒），环形窗口
+        self._encode_ms = np.zeros(self.LATENCY_WINDOW, dtype=np.float64)
+        self._pipeline_ms = np.zeros(self.LATENCY_WINDOW, dtype=np.float64)
+        self._encoded_frames = 0
+        self._encode_errors = 0
+        self._max_encode_ms = 0.0
+
+    def set_callback(self, callback: Optional[Callable[[bytes], None]]):
+        self._callback = callback
+
+    def set_speech_gate(self, gate):
+        """
+        设置上行语音门限（SpeechGate），None 表示不做门限.
+        """
+        self._speech_gate = gate
+
+    def set_encoder(self, encoder, profile=None):
+        """设置编码器及其档位，在下一帧编码前生效（不重开音频流）.
+
+        Args:
+            encoder: 已按档位配置好的 opuslib.Encoder
+            profile: 对应的 OpusEncoderProfile，决定包长与DTX处理
+        """
+        self._pending_encoder = (encoder, profile)
+
+    def _swap_pending_encoder(self):
+        encoder, profile = self._pending_encoder
+        self._pending_encoder = None
+
+        packet_ms = profile.packet_duration_ms if profile else None
+        packet_size = (
+            self.frame_size
+            if packet_ms is None
+            else AudioConfig.INPUT_SAMPLE_RATE * packet_ms // 1000
+        )
+        if packet_size != self._packet_size:
+            # 切换包长时丢弃未凑满的残余样本
+            self._packet_buffer.clear()
+            self._packet_size = packet_size
+
+        self._encoder = encoder
+        self._dtx_enabled = bool(profile and profile.dtx)
+        self._profile = profile
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._run, name="AudioEncoder", daemon=True
+        )
+        self._thread.start()
+        logger.info("录音编码线程已启动")
+
+    def stop(self, timeout: float = 1.0):
+        self._running = False
+        self._queue.wakeup()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=timeout)
+        self._thread = None
+        logger.info("录音编码线程已停止")
+
+    def submit(self, indata: np.ndarray) -> bool:
+        """
+        音频回调线程调用：仅拷贝样本.
+        """
+        return self._queue.put(indata, time.perf_counter())
+
+    def clear(self) -> int:
+        return self._queue.clear()
+
+    def _run(self):
+        while self._running:
+            try:
+                if not self._queue.wait(timeout=0.5):
+                    continue
+
+                while self._running:
+                    count, captured_at = self._queue.get_into(self._work_buffer)
+                    if count == 0:
+                        break
+                    self._process_block(self._work_buffer[:count], captured_at)
+            except Exception as e:
+                logger.error(f"录音编码线程错误: {e}", exc_info=True)
+                time.sleep(0.01)
+
+    def _process_block(self, block: np.ndarray, captured_at: float):
+        frame = self._preprocess(block)
+        if frame is None or len(frame) != self.frame_size:
+            return
+
+        if self._pending_encoder is not None:
+            self._swap_pending_encoder()
+
+        if not self._callback or self._encoder is None:
+            return
+
+        if self._packet_size == self.frame_size:
+            self._encode_packet(frame, captured_at)
+            return
+
+        # 包长与采集帧长不同：按包长重新切分
+        self._packet_buffer.write(frame)
+        while len(self._packet_buffer) >= self._packet_size:
+            self._encode_packet(
+                self._packet_buffer.read(self._packet_size), captured_at
+            )
+
+    def _encode_packet(self, pcm: np.ndarray, captured_at: float):
+        callback = self._callback
+        encoder = self._encoder
+        if not callback or encoder is None:
+            return
+
+        try:
+            start = time.perf_counter()
+            encoded_data = encoder.encode(pcm.tobytes(), len(pcm))
+            done = time.perf_counter()
+        except Exception as e:
+            self._encode_errors += 1
+            logger.warning(f"实时录音编码失败: {e}")
+            return
+
+        encode_ms = (done - start) * 1000
+        slot = self._encoded_frames % self.LATENCY_WINDOW
+        self._encode_ms[slot] = encode_ms
+        self._pipeline_ms[slot] = (done - captured_at) * 1000
+        self._encoded_frames += 1
+        if encode_ms > self._max_encode_ms:
+            self._max_encode_ms = encode_ms
+
+        gate = self._speech_gate
+        if gate is not None:
+            gate.process(pcm, encoded_data, self._emit)
+        else:
+            self._emit(encoded_data)
+
+    def _emit(self, encoded_data: bytes):
+        # DTX：不超过2字节的包表示静音期，无需发送
+        if self._dtx_enabled and len(encoded_data) <= 2:
+            self._dtx_suppressed += 1
+            return
+
+        callback = self._callback
+        if encoded_data and callback:
+            try:
+                callback(encoded_data)
+            except Exception as e:
+                logger.warning(f"编码音频回调失败: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取编码统计：丢帧数、队列深度、编码耗时分位数.
+        """
+        filled = min(self._encoded_frames, self.LATENCY_WINDOW)
+        stats = {
+            "running": bool(self._thread and self._thread.is_alive()),
+            "queue_depth": len(self._queue),
+            "queue_slots": self._queue.slots,
+            "dropped_blocks": self._queue.dropped,
+            "rejected_blocks": self._queue.rejected,
+            "encoded_frames": self._encoded_frames,
+            "encode_errors": self._encode_errors,
+            "encode_ms_max": round(self._max_encode_ms, 3),
+            "dtx_suppressed": self._dtx_suppressed,
+            "profile": self._profile.name if self._profile else None,
+        }
+        if self._speech_gate is not None:
+            stats["speech_gate"] = self._speech_gate.get_stats()
+        if filled:
+            encode_ms = self._encode_ms[:filled]
+            pipeline_ms = self._pipeline_ms[:filled]
+            stats.update(
+                {
+                    "encode_ms_p50": round(float(np.percentile(encode_ms, 50)), 3),
+                    "encode_ms_p99": round(float(np.percentile(encode_ms, 99)), 3),
+                    "pipeline_ms_p50": round(float(np.percentile(pipeline_ms, 50)), 3),
+                    "pipeline_ms_p99": round(float(np.percentile(pipeline_ms, 99)), 3),
+                }
+            )
+        return stats
@@ -0,0 +1,284 @@
+import math
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from app.common.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class JitterBuffer:
+    """
+    下行 Opus 播放抖动缓冲.
+
+    接收侧（事件循环/网络线程）调用 put() 存入数据包，播放回调按帧调用 pop()
+    取出下一帧的解码指令：
+    - PACKET：正常解码该包
+    - FEC：当前帧丢失，用下一包的带内FEC恢复
+    - PLC：当前帧丢失，调用解码器丢包补偿
+    - WAIT：缓冲中（起播或排空后重新缓冲），输出静音
+
+    目标深度按到达间隔的额外延迟（以帧为单位）的95分位自适应调整，
+    与 WebRTC NetEq 的到达间隔直方图思路一致。
+
+    丢包检测、带内FEC恢复与空洞补偿依赖传输层序列号：MQTT/UDP 的包头 nonce
+    携带逐包递增的序列号，由协议层随包传入。WebSocket/TCP 不携带序列号且不丢包，
+    按到达顺序编号。
+
+    只有存在丢包证据（缺失帧之后的包已到达）时才补偿，连续补偿超过 max_conceal
+    帧后直接跳到下一个已到达的包。缓冲区排空时无法区分网络迟到、句间停顿与流结束，
+    此时只返回 WAIT 并重新缓冲，不推进播放位置，后续到达的包按序播放，不丢内容。
+    序列号相对播放位置后退超过 2×max_depth（远超正常迟到范围）或前跳超过 capacity
+    时视为发送端重新计数（新会话/回绕），从该包重新起播。
+    """
+
+    PACKET = "packet"
+    FEC = "fec"
+    PLC = "plc"
+    WAIT = "wait"
+
+    # 到达间隔统计窗口（包数）
+    IAT_WINDOW = 100
+
+    def __init__(
+        self,
+        frame_duration_ms: int,
+        min_depth: int = 1,
+        start_depth: int = 2,
+        max_depth: int = 10,
+        max_conceal: int = 2,
+        capacity: int = 200,
+    ):
+        self.frame_duration_ms = frame_duration_ms
+        self.min_depth = max(1, int(min_depth))
+        self.max_depth = max(self.min_depth, int(max_depth))
+        self.max_conceal = max(0, int(max_conceal))
+        self.capacity = max(self.max_depth, int(capacity))
+        self._start_depth = min(max(self.min_depth, int(start_depth)), self.max_depth)
+
+        self._lock = threading.Lock()
+        self._packets: Dict[int, bytes] = {}
+
+        self._sequenced = False
+        self._arrival_seq = 0
+        self._next_seq: Optional[int] = None
+        # 已播放/补偿到的位置，低于该序号的包视为迟到；新流起播前为None
+        self._play_floor: Optional[int] = None
+        self._starved = False
+        self._last_arrival_seq: Optional[int] = None
+        self._last_arrival_at = 0.0
+
+        self._buffering = True
+        self._concealed_run = 0
+        self._target_depth = self._start_depth
+
+        # 到达间隔额外延迟窗口（帧）
+        self._iat = np.zeros(self.IAT_WINDOW, dtype=np.float64)
+        self._iat_count = 0
+
+        # 统计
+        self.packets_received = 0
+        self.packets_played = 0
+        # 欠载：缓冲排空后恢复时发现期间有包丢失
+        self.underruns = 0
+        self.late_packets = 0
+        self.lost_packets = 0
+        self.concealed_frames = 0
+        self.fec_recovered = 0
+        self.overflow_dropped = 0
+        self.resyncs = 0
+
+    @property
+    def depth(self) -> int:
+        return len(self._packets)
+
+    @property
+    def target_depth(self) -> int:
+        return self._target_depth
+
+    def put(self, packet: bytes, sequence: Optional[int] = None) -> bool:
+        """存入一个数据包.
+
+        Args:
+            packet: Opus 数据包
+            sequence: 传输层序列号；为空时按到达顺序编号
+
+        Returns:
+            是否被接收（迟到/重复的包返回False）
+        """
+        now = time.monotonic()
+        with self._lock:
+            if sequence is None:
+                sequence = self._arrival_seq
+                self._arrival_seq += 1
+            else:
+                self._sequenced = True
+
+            self.packets_received += 1
+
+            if self._sequenced and self._is_restart(sequence):
+                # 发送端重新计数（新会话/回绕）：旧编号的包无法与之排序，从新包重新起播
+                self.resyncs += 1
+                self._reset_position()
+
+            self._update_arrival_stats(sequence, now)
+
+            if (
+                self._play_floor is not None and sequence < self._play_floor
+            ) or sequence in self._packets:
+                # 该帧已播放/补偿或重复，丢弃
+                self.late_packets += 1
+                return False
+
+            # 起播前乱序先到的后续包不会使前面的包被拒
+            if self._next_seq is None or sequence < self._next_seq:
+                self._next_seq = sequence
+            self._packets[sequence] = packet
+
+            # 超过容量：丢弃最旧包，限制累计延迟
+            while len(self._packets) > self.capacity:
+                oldest = min(self._packets)
+                del self._packets[oldest]
+                self.overflow_dropped += 1
+                if oldest >= self._next_seq:
+                    self._next_seq = oldest + 1
+                    self._play_floor = self._next_seq
+            return True
+
+    def pop(self) -> Tuple[str, Optional[bytes]]:
+        """
+        播放回调调用：返回下一帧的解码指令及数据.
+        """
+        with self._lock:
+            if self._next_seq is None:
+                return self.WAIT, None
+
+            if self._buffering:
+                if not self._ready_to_play():
+                    return self.WAIT, None
+                self._buffering = False
+
+            seq = self._next_seq
+            packet = self._packets.pop(seq, None)
+            if packet is not None:
+                return self._play(seq, packet)
+
+            if not self._packets:
+                # 缓冲区已空：没有丢包证据（可能是句间停顿或流结束），不推进播放位置
+                self._buffering = True
+                self._starved = self._play_floor is not None
+                return self.WAIT, None
+
+            # 后续包已到达：当前帧丢失
+            if self._starved:
+                self._starved = False
+                self.underruns += 1
+            if self._concealed_run >= self.max_conceal:
+                # 连续补偿过多：跳到下一个已到达的包，避免补偿帧累积延迟
+                next_seq = min(self._packets)
+                self.lost_packets += next_seq - seq
+                return self._play(next_seq, self._packets.pop(next_seq))
+
+            self._next_seq = seq + 1
+            self._play_floor = self._next_seq
+            self._concealed_run += 1
+            self.lost_packets += 1
+            self.concealed_frames += 1
+            next_packet = self._packets.get(seq + 1)
+            if next_packet is not None:
+                self.fec_recovered += 1
+                return self.FEC, next_packet
+            return self.PLC, None
+
+    def _play(self, seq: int, packet: bytes) -> Tuple[str, Optional[bytes]]:
+        self._next_seq = seq + 1
+        self._play_floor = self._next_seq
+        self._concealed_run = 0
+        self._starved = False
+        self.packets_played += 1
+        return self.PACKET, packet
+
+    def _reset_position(self):
+        self._packets.clear()
+        self._next_seq = None
+        self._play_floor = None
+        self._last_arrival_seq = None
+        self._buffering = True
+        self._starved = False
+        self._concealed_run = 0
+
+    def _is_restart(self, sequence: int) -> bool:
+        if self._next_seq is None:
+            return False
+        offset = sequence - self._next_seq
+        return offset < -2 * self.max_depth or offset > self.capacity
+
+    def _ready_to_play(self) -> bool:
+        if not self._packets:
+            return False
+        if len(self._packets) >= self._target_depth:
+            return True
+        # 流已停止送包（如TTS末尾），不再等满目标深度
+        idle_ms = (time.monotonic() - self._last_arrival_at) * 1000
+        return idle_ms >= self._target_depth * self.frame_duration_ms
+
+    def _update_arrival_stats(self, sequence: int, now: float):
+        if self._last_arrival_seq is not None and sequence > self._last_arrival_seq:
+            elapsed_frames = (now - self._last_arrival_at) * 1000 / self.frame_duration_ms
+            # 相对于发送间隔的额外延迟，提前到达（突发）记为0
+            extra = max(0.0, elapsed_frames - (sequence - self._last_arrival_seq))
+            self._iat[self._iat_count % self.IAT_WINDOW] = extra
+            self._iat_count += 1
+            self._update_target_depth()
+
+        if self._last_arrival_seq is None or sequence > self._last_arrival_seq:
+            self._last_arrival_seq = sequence
+        self._last_arrival_at = now
+
+    def _update_target_depth(self):
+        filled = min(self._iat_count, self.IAT_WINDOW)
+        # 样本不足时保持起播深度
+        if filled < 10:
+            return
+        p95 = float(np.percentile(self._iat[:filled], 95))
+        target = self.min_depth + math.ceil(p95)
+        self._target_depth = min(max(target, self.min_depth), self.max_depth)
+
+    def jitter_ms(self) -> float:
+        filled = min(self._iat_count, self.IAT_WINDOW)
+        if not filled:
+            return 0.0
+        return float(np.percentile(self._iat[:filled], 95)) * self.frame_duration_ms
+
+    def clear(self) -> int:
+        """
+        清空缓冲（打断/新会话），保留自适应统计，返回丢弃的包数.
+        """
+        with self._lock:
+            cleared = len(self._packets)
+            self._reset_position()
+            return cleared
+
+    def is_empty(self) -> bool:
+        return not self._packets
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "depth": self.depth,
+            "target_depth": self._target_depth,
+            "frame_duration_ms": self.frame_duration_ms,
+            "jitter_ms": round(self.jitter_ms(), 1),
+            "buffering": self._buffering,
+            "packets_received": self.packets_received,
+            "packets_played": self.packets_played,
+            "underruns": self.underruns,
+            "late_packets": self.late_packets,
+            "lost_packets": self.lost_packets,
+            "concealed_frames": self.concealed_frames,
+            "fec_recovered": self.fec_recovered,
+            "overflow_dropped": self.overflow_dropped,
+            "resyncs": self.resyncs,
+        }
@@ -0,0 +1,139 @@
+import threading
+from typing import Optional
+
+import numpy as np
+
+
+class AudioRingBuffer:
+    """
+    定长数组环形缓冲区，用于音频回调中的重采样/参考信号缓存.
+
+    存储区在构造时一次性分配，读写均为向量化切片拷贝，稳态下没有逐样本的
+    Python 对象分配。写入超出容量时丢弃最旧的数据（与原 deque 截断语义一致）。
+    读取返回的是内部暂存区的连续视图，在下一次 read 之前有效；需要长期持有时
+    请传入 out 或自行 copy。
+    """
+
+    def __init__(self, capacity: int, dtype=np.int16):
+        if capacity <= 0:
+            raise ValueError(f"环形缓冲区容量必须大于0: {capacity}")
+
+        self._capacity = int(capacity)
+        self._dtype = np.dtype(dtype)
+        self._buffer = np.zeros(self._capacity, dtype=self._dtype)
+        # 读出暂存区：环绕时拼接为连续内存，避免每次读取分配新数组
+        self._scratch = np.zeros(self._capacity, dtype=self._dtype)
+
+        self._read_pos = 0
+        self._size = 0
+        self._dropped = 0
+
+        # 参考信号等场景存在跨线程读写，索引更新需加锁（临界区仅为切片拷贝）
+        self._lock = threading.Lock()
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @property
+    def dropped(self) -> int:
+        """
+        因溢出被丢弃的样本总数.
+        """
+        return self._dropped
+
+    def __len__(self) -> int:
+        return self._size
+
+    def free_space(self) -> int:
+        return self._capacity - self._size
+
+    def write(self, data: np.ndarray) -> int:
+        """写入样本，空间不足时覆盖最旧数据.
+
+        Args:
+            data: 一维（或可展平的）样本数组
+
+        Returns:
+            本次因溢出丢弃的样本数
+        """
+        samples = np.asarray(data).reshape(-1)
+        count = len(samples)
+        if count == 0:
+            return 0
+
+        with self._lock:
+            dropped = 0
+            if count >= self._capacity:
+                # 单次写入超过容量，只保留最新的 capacity 个样本
+                dropped = self._size + count - self._capacity
+                self._buffer[:] = samples[count - self._capacity :]
+                self._read_pos = 0
+                self._size = self._capacity
+            else:
+                overflow = self._size + count - self._capacity
+                if overflow > 0:
+                    self._read_pos = (self._read_pos + overflow) % self._capacity
+                    self._size -= overflow
+                    dropped = overflow
+
+                write_pos = (self._read_pos + self._size) % self._capacity
+                first = min(count, self._capacity - write_pos)
+                self._buffer[write_pos : write_pos + first] = samples[:first]
+                if first < count:
+                    self._buffer[: count - first] = samples[first:]
+                self._size += count
+
+            self._dropped += dropped
+            return dropped
+
+    def read(self, count: int, out: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+        """读取并消费 count 个样本.
+
+        Args:
+            count: 样本数
+            out: 可选的目标数组（长度至少为 count），为空时返回内部暂存区视图
+
+        Returns:
+            连续的样本数组；数据不足时返回 None
+        """
+        if count <= 0 or count > self._capacity:
+            return None
+
+        with self._lock:
+            if self._size < count:
+                return None
+
+            target = self._scratch[:count] if out is None else out[:count]
+            first = min(count, self._capacity - self._read_pos)
+            target[:first] = self._buffer[self._read_pos : self._read_pos + first]
+            if first < count:
+                target[first:count] = self._buffer[: count - first]
+
+            self._read_pos = (self._read_pos + count) % self._capacity
+            self._size -= count
+            return target
+
+    def read_or_silence(
+        self, count: int, out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        读取 count 个样本，数据不足时返回静音（不消费已有数据）.
+        """
+        frame = self.read(count, out)
+        if frame is not None:
+            return frame
+
+        target = self._scratch[:count] if out is None else out[:count]
+        target.fill(0)
+        return target
+
+    def clear(self) -> int:
+        """
+        清空缓冲区，返回被清除的样本数.
+        """
+        with self._lock:
+            cleared = self._size
+            self._read_pos = 0
+            self._size = 0
+            return cleared
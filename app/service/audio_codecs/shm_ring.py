@@ -0,0 +1,213 @@
+from multiprocessing import shared_memory
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from app.common.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class SharedFrameRing:
+    """
+    跨进程单生产者/单消费者帧环，存储区位于 multiprocessing.shared_memory.
+
+    布局：头部 int64[4]（写序号、读序号、消费者等待标志、保留）、每槽长度与标签
+    int64、发布时间 float64，以及 [slots, slot_size] 帧数据。语义与 SpscFrameQueue
+    一致：生产者拷贝槽位后推进写序号，不持锁；消费者拷贝后校验槽位未被覆盖，
+    落后过多时跳过最旧帧并计入丢帧。
+
+    唤醒：消费者等待前置位等待标志，生产者看到标志后通过进程间信号量（doorbell）
+    唤醒，消费者处理不过来时生产者不产生系统调用。
+    """
+
+    _WRITE = 0
+    _READ = 1
+    _WAITING = 2
+    _HEADER_FIELDS = 4
+
+    def __init__(
+        self,
+        slot_size: int,
+        slots: int = 32,
+        dtype=np.int16,
+        doorbell=None,
+        name: Optional[str] = None,
+    ):
+        """
+        Args:
+            slot_size: 每槽最大样本数
+            slots: 槽位数（至少为2）
+            dtype: 样本类型
+            doorbell: 进程间信号量（multiprocessing 上下文的 Semaphore）
+            name: 已存在的共享内存名称（附加到对端创建的环），None 时新建
+        """
+        if slots < 2:
+            raise ValueError(f"共享帧环槽位数至少为2: {slots}")
+
+        self.slot_size = int(slot_size)
+        self.slots = int(slots)
+        self.dtype = np.dtype(dtype)
+        self.doorbell = doorbell
+
+        header_bytes = self._HEADER_FIELDS * 8
+        meta_bytes = self.slots * 8 * 3
+        data_bytes = self.slots * self.slot_size * self.dtype.itemsize
+        size = header_bytes + meta_bytes + data_bytes
+
+        self._owner = name is None
+        if self._owner:
+            self._shm = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+        self.name = self._shm.name
+
+        buf = self._shm.buf
+        offset = 0
+        self._header = np.ndarray((self._HEADER_FIELDS,), np.int64, buf, offset)
+        offset += header_bytes
+        self._lengths = np.ndarray((self.slots,), np.int64, buf, offset)
+        offset += self.slots * 8
+        self._tags = np.ndarray((self.slots,), np.int64, buf, offset)
+        offset += self.slots * 8
+        self._timestamps = np.ndarray((self.slots,), np.float64, buf, offset)
+        offset += self.slots * 8
+        self._frames = np.ndarray((self.slots, self.slot_size), self.dtype, buf, offset)
+
+        if self._owner:
+            self._header.fill(0)
+
+        # 统计（各进程本地）
+        self.dropped = 0
+        self.rejected = 0
+
+    def spec(self) -> Dict[str, Any]:
+        """
+        对端附加所需的参数（可 pickle）.
+        """
+        return {
+            "name": self.name,
+            "slot_size": self.slot_size,
+            "slots": self.slots,
+            "dtype": self.dtype.str,
+        }
+
+    @classmethod
+    def attach(cls, spec: Dict[str, Any], doorbell=None) -> "SharedFrameRing":
+        return cls(
+            spec["slot_size"],
+            spec["slots"],
+            np.dtype(spec["dtype"]),
+            doorbell=doorbell,
+            name=spec["name"],
+        )
+
+    @property
+    def pending(self) -> int:
+        lag = int(self._header[self._WRITE]) - int(self._header[self._READ])
+        return min(lag, self.slots - 1)
+
+    def put(self, samples: np.ndarray, tag: int = 0, timestamp: float = 0.0) -> bool:
+        """
+        生产者调用：拷贝一帧入环，超过槽位长度时拒绝.
+        """
+        samples = samples.reshape(-1)
+        count = len(samples)
+        if count > self.slot_size:
+            self.rejected += 1
+            return False
+
+        header = self._header
+        seq = int(header[self._WRITE])
+        slot = seq % self.slots
+        self._frames[slot, :count] = samples
+        self._lengths[slot] = count
+        self._tags[slot] = tag
+        self._timestamps[slot] = timestamp
+        header[self._WRITE] = seq + 1
+
+        if header[self._WAITING] and self.doorbell is not None:
+            header[self._WAITING] = 0
+            self.doorbell.release()
+        return True
+
+    def get_into(self, out: np.ndarray) -> Tuple[int, int, float]:
+        """消费者调用：取出最旧的一帧拷贝到 out.
+
+        Returns:
+            (样本数, 标签, 发布时间)；环为空时返回 (0, 0, 0.0)
+        """
+        header = self._header
+        while True:
+            read_seq = int(header[self._READ])
+            lag = int(header[self._WRITE]) - read_seq
+            if lag <= 0:
+                return 0, 0, 0.0
+
+            if lag > self.slots - 1:
+                skipped = lag - (self.slots - 1)
+                self.dropped += skipped
+                read_seq += skipped
+
+            slot = read_seq % self.slots
+            count = int(self._lengths[slot])
+            tag = int(self._tags[slot])
+            timestamp = float(self._timestamps[slot])
+            out[:count] = self._frames[slot, :count]
+
+            # 拷贝期间被生产者覆盖：丢弃并重试
+            if int(header[self._WRITE]) - read_seq > self.slots - 1:
+                self.dropped += 1
+                header[self._READ] = read_seq + 1
+                continue
+
+            header[self._READ] = read_seq + 1
+            return count, tag, timestamp
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        消费者阻塞等待新帧，返回是否有数据可读.
+        """
+        if self.pending:
+            return True
+        if self.doorbell is None:
+            return False
+
+        header = self._header
+        header[self._WAITING] = 1
+        # 置位等待标志后再检查一次，避免与生产者之间的唤醒丢失
+        if self.pending:
+            header[self._WAITING] = 0
+            return True
+        self.doorbell.acquire(timeout=timeout)
+        header[self._WAITING] = 0
+        return self.pending > 0
+
+    def wakeup(self):
+        """
+        唤醒等待中的消费者（关闭时使用）.
+        """
+        if self.doorbell is not None:
+            self.doorbell.release()
+
+    def close(self):
+        """
+        释放映射；创建方同时删除共享内存.
+        """
+        # 共享内存关闭前需释放所有 ndarray 视图
+        self._header = self._lengths = self._tags = self._timestamps = None
+        self._frames = None
+        try:
+            self._shm.close()
+            if self._owner:
+                self._shm.unlink()
+        except (BufferError, FileNotFoundError) as e:
+            logger.debug(f"释放共享帧环失败: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "slots": self.slots,
+            "pending": self.pending if self._header is not None else 0,
+            "dropped": self.dropped,
+            "rejected": self.rejected,
+        }
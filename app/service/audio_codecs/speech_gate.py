@@ -0,0 +1,199 @@
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+import webrtcvad
+
+from app.common.constants import AudioConfig
+from app.common.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class SpeechGate:
+    """
+    上行语音门限：LISTENING 状态下只发送语音段，静音段不上传.
+
+    在编码线程中按包调用 process()：
+    - 检测到语音起点时先补发预录（pre-roll）缓存的包，避免吞掉起始音节
+    - 语音结束后继续发送拖尾（hangover）时长，之后的静音包被丢弃
+    - 说过话且静音持续超过 end_of_speech_ms 时触发一次本地说话结束事件
+    未激活时直接透传所有包。
+    """
+
+    # webrtcvad 检测子帧时长（毫秒），可整除所有 Opus 包长
+    VAD_FRAME_MS = 10
+
+    def __init__(
+        self,
+        aggressiveness: int = 2,
+        pre_roll_ms: int = 300,
+        hangover_ms: int = 400,
+        end_of_speech_ms: int = 800,
+        min_speech_ms: int = 200,
+    ):
+        self.sample_rate = AudioConfig.INPUT_SAMPLE_RATE
+        self.pre_roll_ms = max(0, int(pre_roll_ms))
+        self.hangover_ms = max(0, int(hangover_ms))
+        self.end_of_speech_ms = max(self.hangover_ms, int(end_of_speech_ms))
+        self.min_speech_ms = max(0, int(min_speech_ms))
+
+        self._vad = webrtcvad.Vad(min(max(int(aggressiveness), 0), 3))
+        self._vad_frame_size = self.sample_rate * self.VAD_FRAME_MS // 1000
+
+        # 激活/重置由事件循环线程设置，在编码线程的下一个包生效
+        self._active = False
+        self._reset_pending = False
+
+        # 预录缓存：(编码包, 时长ms)
+        self._pre_roll: deque = deque()
+        self._pre_roll_total_ms = 0
+
+        self._in_speech = False
+        self._speech_ms = 0
+        self._silence_ms = 0
+        self._heard_speech = False
+        self._end_reported = False
+
+        self._on_end_of_speech: Optional[Callable[[], None]] = None
+
+        # 统计
+        self.packets_in = 0
+        self.packets_sent = 0
+        self.packets_suppressed = 0
+        self.speech_segments = 0
+        self.end_of_speech_events = 0
+
+    @property
+    def active(self) -> bool:
+        return self._active
+
+    def set_active(self, active: bool):
+        """
+        激活/关闭门限（事件循环线程调用），激活时重置语音状态.
+        """
+        if active and not self._active:
+            self._reset_pending = True
+        self._active = active
+
+    def set_end_of_speech_callback(self, callback: Optional[Callable[[], None]]):
+        """
+        设置说话结束回调（在编码线程中调用）.
+        """
+        self._on_end_of_speech = callback
+
+    def _reset(self):
+        self._reset_pending = False
+        self._pre_roll.clear()
+        self._pre_roll_total_ms = 0
+        self._in_speech = False
+        self._speech_ms = 0
+        self._silence_ms = 0
+        self._heard_speech = False
+        self._end_reported = False
+
+    def _is_speech(self, pcm: np.ndarray) -> bool:
+        """
+        按10ms子帧检测，半数及以上子帧为语音时判定整包为语音.
+        """
+        step = self._vad_frame_size
+        frames = len(pcm) // step
+        if frames == 0:
+            return False
+
+        voiced = 0
+        for i in range(frames):
+            chunk = pcm[i * step : (i + 1) * step]
+            if self._vad.is_speech(chunk.tobytes(), self.sample_rate):
+                voiced += 1
+        return voiced * 2 >= frames
+
+    def process(self, pcm: np.ndarray, packet: bytes, emit: Callable[[bytes], None]):
+        """处理一个编码包（编码线程调用）.
+
+        Args:
+            pcm: 该包对应的16kHz PCM
+            packet: Opus 编码包
+            emit: 发送函数，需要上传的包（含补发的预录包）按顺序传入
+        """
+        if not self._active:
+            emit(packet)
+            return
+
+        if self._reset_pending:
+            self._reset()
+
+        self.packets_in += 1
+        duration_ms = len(pcm) * 1000 // self.sample_rate
+
+        try:
+            speech = self._is_speech(pcm)
+        except Exception as e:
+            # VAD异常时按语音处理，宁可多发不可漏发
+            logger.debug(f"VAD检测失败: {e}")
+            speech = True
+
+        if speech:
+            self._silence_ms = 0
+            self._speech_ms += duration_ms
+            if not self._in_speech:
+                self._in_speech = True
+                self.speech_segments += 1
+                # 语音起点：先补发预录缓存
+                while self._pre_roll:
+                    emit(self._pre_roll.popleft()[0])
+                    self.packets_sent += 1
+                self._pre_roll_total_ms = 0
+            if self._speech_ms >= self.min_speech_ms:
+                self._heard_speech = True
+                self._end_reported = False
+            emit(packet)
+            self.packets_sent += 1
+            return
+
+        self._silence_ms += duration_ms
+        if self._in_speech and self._silence_ms <= self.hangover_ms:
+            # 拖尾期间继续发送，保留句尾弱音
+            emit(packet)
+            self.packets_sent += 1
+            return
+
+        if self._in_speech:
+            self._in_speech = False
+            self._speech_ms = 0
+
+        # 静音：缓存为预录，超出时长的旧包直接丢弃
+        self._pre_roll.append((packet, duration_ms))
+        self._pre_roll_total_ms += duration_ms
+        while self._pre_roll and self._pre_roll_total_ms > self.pre_roll_ms:
+            self._pre_roll_total_ms -= self._pre_roll.popleft()[1]
+            self.packets_suppressed += 1
+
+        if (
+            self._heard_speech
+            and not self._end_reported
+            and self._silence_ms >= self.end_of_speech_ms
+        ):
+            self._end_reported = True
+            self.end_of_speech_events += 1
+            callback = self._on_end_of_speech
+            if callback:
+                try:
+                    callback()
+                except Exception as e:
+                    logger.warning(f"说话结束回调失败: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        suppressed_ratio = (
+            self.packets_suppressed / self.packets_in if self.packets_in else 0.0
+        )
+        return {
+            "active": self._active,
+            "in_speech": self._in_speech,
+            "packets_in": self.packets_in,
+            "packets_sent": self.packets_sent,
+            "packets_suppressed": self.packets_suppressed,
+            "suppressed_ratio": round(suppressed_ratio, 3),
+            "speech_segments": self.speech_segments,
+            "end_of_speech_events": self.end_of_speech_events,
+        }
@@ -0,0 +1,817 @@
+import asyncio
+import json
+import multiprocessing
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from app.common.constants import AudioConfig
+from app.common.config_manager import ConfigManager
+from app.common.logging_config import get_logger
+from app.service.audio_codecs.shm_ring import SharedFrameRing
+
+logger = get_logger(__name__)
+
+# 播放参考块上限（48kHz 下约170ms，覆盖常见的输出回调块长）
+RENDER_SLOT_SIZE = 8192
+# 事件为 UTF-8 JSON，统计快照是最大的一类
+EVENT_SLOT_SIZE = 16384
+
+
+@dataclass
+class DSPWorkerSpec:
+    """
+    工作进程启动参数（可 pickle）.
+    """
+
+    frame_size: int
+    capture_ring: Dict[str, Any]
+    processed_ring: Dict[str, Any]
+    render_ring: Dict[str, Any]
+    event_ring: Dict[str, Any]
+    aec: bool = True
+    wake_word: bool = False
+    barge_in: bool = False
+    stats_interval: float = 2.0
+    doorbells: Dict[str, Any] = field(default_factory=dict)
+
+
+def run_dsp_worker(spec: DSPWorkerSpec, control):
+    """
+    工作进程入口（spawn 启动）.
+    """
+    from app.common.logging_config import setup_logging
+
+    setup_logging()
+    try:
+        asyncio.run(_DSPWorkerProcess(spec, control).run())
+    except KeyboardInterrupt:
+        pass
+
+
+class _DSPWorkerProcess:
+    """
+    工作进程侧：AEC + 进程内采集总线 + 唤醒词/打断检测.
+
+    采集线程从 capture 环取原始16kHz帧，先把 render 环中的播放PCM交给AEC作参考，
+    处理后的帧写回 processed 环（标签为帧序号，供主进程配对），同时发布到本进程
+    的 CaptureBus；WakeWordDetector 与 VADDetector 像在主进程中一样订阅该总线。
+    检测结果与统计以 JSON 事件写入 event 环；控制命令经管道从主进程下发。
+    """
+
+    def __init__(self, spec: DSPWorkerSpec, control):
+        from app.service.audio_codecs.capture_bus import CaptureBus
+
+        self.spec = spec
+        self._control = control
+        doorbells = spec.doorbells
+        self.capture_ring = SharedFrameRing.attach(spec.capture_ring, doorbells.get("capture"))
+        self.processed_ring = SharedFrameRing.attach(
+            spec.processed_ring, doorbells.get("processed")
+        )
+        self.render_ring = SharedFrameRing.attach(spec.render_ring)
+        self.event_ring = SharedFrameRing.attach(spec.event_ring, doorbells.get("event"))
+        self._event_lock = threading.Lock()
+
+        self.capture_bus = CaptureBus(spec.frame_size)
+        self.aec_processor = None
+        self.aec_enabled = False
+        self.wake_word_detector = None
+        self.barge_in_detector = None
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stopped: Optional[asyncio.Event] = None
+        self._running = True
+        self._frames_processed = 0
+        self._process_time_ms = 0.0
+        self._process_time_max_ms = 0.0
+
+    def subscribe_capture(self, name: str, loop=None):
+        """
+        检测器通过该方法订阅进程内采集总线（与 AudioCodec 接口一致）.
+        """
+        return self.capture_bus.subscribe(name, loop)
+
+    def emit(self, event: Dict[str, Any]):
+        """
+        写入一条事件（多线程调用，加锁保证事件环单生产者）.
+        """
+        payload = np.frombuffer(
+            json.dumps(event, ensure_ascii=False, default=str).encode("utf-8"),
+            dtype=np.uint8,
+        )
+        with self._event_lock:
+            if not self.event_ring.put(payload, timestamp=time.monotonic()):
+                logger.warning(f"DSP事件过大，已丢弃: {event.get('type')}")
+
+    async def run(self):
+        self._loop = asyncio.get_running_loop()
+        self._stopped = asyncio.Event()
+
+        if self.spec.aec:
+            await self._initialize_aec()
+
+        capture_thread = threading.Thread(
+            target=self._capture_loop, name="DSPCapture", daemon=True
+        )
+        capture_thread.start()
+        threading.Thread(target=self._control_loop, name="DSPControl", daemon=True).start()
+
+        aec = self.aec_processor
+        self.emit(
+            {
+                "type": "started",
+                "aec_enabled": self.aec_enabled,
+                "aec_backend": aec.backend if aec else None,
+                "needs_processing": bool(aec and aec.needs_processing),
+                "uses_render_reference": bool(aec and aec.uses_render_reference),
+            }
+        )
+
+        if self.spec.barge_in:
+            await self._start_barge_in()
+        if self.spec.wake_word:
+            asyncio.create_task(self._start_wake_word())
+
+        while not self._stopped.is_set():
+            try:
+                await asyncio.wait_for(self._stopped.wait(), self.spec.stats_interval)
+            except asyncio.TimeoutError:
+                self.emit({"type": "stats", **self.get_stats()})
+
+        await self._shutdown(capture_thread)
+
+    async def _initialize_aec(self):
+        from app.service.audio_codecs.aec_processor import AECProcessor
+
+        try:
+            self.aec_processor = AECProcessor()
+            await self.aec_processor.initialize()
+            self.aec_enabled = True
+        except Exception as e:
+            logger.warning(f"DSP进程AEC初始化失败，将使用原始音频: {e}")
+            self.aec_enabled = False
+
+    async def _start_wake_word(self):
+        from app.service.audio_processing.wake_word_detect import WakeWordDetector
+
+        detector = WakeWordDetector()
+        self.wake_word_detector = detector
+        detector.on_detected(
+            lambda text, _full: self.emit(
+                {"type": "wake_word", "text": text, "detected_at": time.monotonic()}
+            )
+        )
+        detector.on_error = lambda error: self.emit(
+            {"type": "wake_word_error", "error": str(error)}
+        )
+        ok = await detector.start(self)
+        self.emit(
+            {
+                "type": "wake_word_ready",
+                "ok": ok,
+                "load_time_ms": detector.load_time_ms,
+                "warmup_time_ms": detector.warmup_time_ms,
+            }
+        )
+
+    async def _start_barge_in(self):
+        from app.service.audio_processing.vad_detector import VADDetector
+
+        detector = VADDetector()
+        detector.on_detected(
+            lambda latency_ms: self.emit({"type": "barge_in", "latency_ms": latency_ms})
+        )
+        if await detector.start(self):
+            self.barge_in_detector = detector
+
+    def _capture_loop(self):
+        """
+        采集线程：原始帧 -> AEC -> processed 环 + 进程内总线.
+        """
+        frame = np.zeros(self.capture_ring.slot_size, dtype=np.int16)
+        render = np.zeros(self.render_ring.slot_size, dtype=np.int16)
+
+        while self._running:
+            if not self.capture_ring.wait(timeout=0.5):
+                continue
+            while self._running:
+                count, seq, _ = self.capture_ring.get_into(frame)
+                if count == 0:
+                    break
+
+                started = time.perf_counter()
+                samples = frame[:count]
+                aec = self.aec_processor
+                if self.aec_enabled and aec is not None and aec.needs_processing:
+                    # 先送入已到达的播放参考，再处理本帧
+                    while True:
+                        rendered, rate, _ = self.render_ring.get_into(render)
+                        if rendered == 0:
+                            break
+                        aec.push_render(render[:rendered], rate)
+                    try:
+                        samples = aec.process_audio(samples)
+                    except Exception as e:
+                        logger.warning(f"DSP进程AEC处理失败，使用原始音频: {e}")
+
+                # 负序号表示主进程不等待结果（只供检测器使用）
+                if seq >= 0:
+                    self.processed_ring.put(samples, tag=seq, timestamp=time.monotonic())
+                self.capture_bus.publish(samples)
+
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                self._frames_processed += 1
+                self._process_time_ms += elapsed_ms
+                self._process_time_max_ms = max(self._process_time_max_ms, elapsed_ms)
+
+    def _control_loop(self):
+        """
+        控制线程：接收主进程命令，主进程退出（管道关闭）时停止.
+        """
+        while self._running:
+            try:
+                command, kwargs = self._control.recv()
+            except (EOFError, OSError):
+                command, kwargs = "stop", {}
+            try:
+                self._loop.call_soon_threadsafe(self._dispatch_command, command, kwargs)
+            except RuntimeError:
+                break
+            if command == "stop":
+                break
+
+    def _dispatch_command(self, command: str, kwargs: Dict[str, Any]):
+        """
+        事件循环线程：执行控制命令.
+        """
+        wake = self.wake_word_detector
+        barge = self.barge_in_detector
+        if command == "stop":
+            self._stopped.set()
+        elif command == "wake_word_pause" and wake:
+            asyncio.create_task(wake.pause())
+        elif command == "wake_word_resume" and wake:
+            asyncio.create_task(wake.resume())
+        elif command == "wake_word_stop" and wake:
+            asyncio.create_task(wake.stop())
+        elif command == "barge_in_active" and barge:
+            barge.set_active(bool(kwargs.get("active")))
+        elif command == "barge_in_stop" and barge:
+            asyncio.create_task(barge.stop())
+        elif command == "aec_enabled":
+            aec = self.aec_processor
+            self.aec_enabled = bool(kwargs.get("enabled")) and bool(
+                aec and aec._is_initialized
+            )
+        elif command == "reset_aec":
+            asyncio.create_task(self._reset_aec())
+        elif command == "reset_capture":
+            self.capture_bus.reset()
+
+    async def _reset_aec(self):
+        """
+        设备切换后重建AEC（参考信号流随设备重扫失效）.
+        """
+        enabled = self.aec_enabled
+        self.aec_enabled = False
+        if self.aec_processor:
+            await self.aec_processor.close()
+        await self._initialize_aec()
+        self.aec_enabled = self.aec_enabled and enabled
+
+    async def _shutdown(self, capture_thread: threading.Thread):
+        self._running = False
+        self.capture_ring.wakeup()
+        for detector in (self.wake_word_detector, self.barge_in_detector):
+            if detector:
+                try:
+                    await detector.stop()
+                except Exception as e:
+                    logger.warning(f"DSP进程停止检测器失败: {e}")
+        capture_thread.join(timeout=1.0)
+        if self.aec_processor:
+            await self.aec_processor.close()
+        self.capture_bus.close()
+        for ring in (
+            self.capture_ring,
+            self.processed_ring,
+            self.render_ring,
+            self.event_ring,
+        ):
+            ring.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = {
+            "frames_processed": self._frames_processed,
+            "process_time_avg_ms": round(
+                self._process_time_ms / self._frames_processed, 3
+            )
+            if self._frames_processed
+            else 0.0,
+            "process_time_max_ms": round(self._process_time_max_ms, 3),
+            "capture_ring": self.capture_ring.get_stats(),
+            "render_ring": self.render_ring.get_stats(),
+            "capture_bus": self.capture_bus.get_stats(),
+        }
+        if self.aec_processor is not None:
+            stats["aec"] = {"enabled": self.aec_enabled, **self.aec_processor.get_status()}
+        if self.wake_word_detector is not None:
+            stats["wake_word"] = self.wake_word_detector.get_performance_stats()
+        if self.barge_in_detector is not None:
+            stats["barge_in"] = self.barge_in_detector.get_performance_stats()
+        return stats
+
+
+class DSPWorker:
+    """
+    DSP 工作进程（主进程侧）：把 AEC、唤醒词推理与打断检测移出主进程.
+
+    主进程中 PyQt 渲染、websocket I/O 与音频处理争用同一个 GIL，UI 繁忙时会造成
+    编码线程与检测线程抖动。启用后（AUDIO_OPTIONS.DSP_PROCESS.ENABLED）：
+
+    - 编码线程把重采样后的16kHz帧写入 capture 环，阻塞等待（最多 response_timeout_ms）
+      处理后的同序号帧；超时或工作进程异常时回退为原始帧，录音不中断
+    - 播放回调把写给设备的PCM写入 render 环（软件AEC参考信号），只做拷贝
+    - 检测结果经 event 环返回，由事件线程投递到主事件循环
+    - RemoteWakeWordDetector / RemoteBargeInDetector 提供与本地检测器一致的接口
+
+    生命周期由 Application 管理：组件初始化前 start()，shutdown 时 stop()。
+    """
+
+    def __init__(self):
+        config = ConfigManager.get_instance()
+        options = config.get_config("AUDIO_OPTIONS.DSP_PROCESS", {}) or {}
+        self.enabled = bool(options.get("ENABLED", False))
+        self.ring_slots = int(options.get("RING_SLOTS", 32))
+        self.response_timeout = float(options.get("RESPONSE_TIMEOUT_MS", 15)) / 1000
+        self.start_timeout = float(options.get("START_TIMEOUT_S", 10.0))
+
+        self.aec = bool(config.get_config("AEC_OPTIONS.ENABLED", True))
+        self.wake_word = bool(config.get_config("WAKE_WORD_OPTIONS.USE_WAKE_WORD", False))
+        self.barge_in = bool(config.get_config("AUDIO_OPTIONS.BARGE_IN.ENABLED", False))
+
+        self.frame_size = AudioConfig.INPUT_FRAME_SIZE
+
+        # 由工作进程 started 事件填充
+        self.aec_enabled = False
+        self.aec_backend: Optional[str] = None
+        self.aec_needs_processing = False
+        self.aec_uses_render_reference = False
+
+        self._process = None
+        self._control = None
+        self._control_lock = threading.Lock()
+        self._capture_ring: Optional[SharedFrameRing] = None
+        self._processed_ring: Optional[SharedFrameRing] = None
+        self._render_ring: Optional[SharedFrameRing] = None
+        self._event_ring: Optional[SharedFrameRing] = None
+        self._processed = np.zeros(self.frame_size * 2, dtype=np.int16)
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._event_thread: Optional[threading.Thread] = None
+        self._handlers: Dict[str, List[Callable[[Dict[str, Any]], None]]] = {}
+        self._started: Optional[asyncio.Future] = None
+        self._running = False
+        self._alive = False
+
+        # 统计
+        self._capture_seq = 0
+        self.round_trips = 0
+        self.timeouts = 0
+        self.stale_frames = 0
+        self._round_trip_ms = 0.0
+        self._round_trip_max_ms = 0.0
+        self._remote_stats: Dict[str, Any] = {}
+
+    @property
+    def alive(self) -> bool:
+        return self._alive
+
+    def on_event(self, event_type: str, handler: Callable[[Dict[str, Any]], None]):
+        """
+        注册事件处理函数（在主事件循环线程中调用）.
+        """
+        self._handlers.setdefault(event_type, []).append(handler)
+
+    async def start(self) -> bool:
+        """
+        创建共享内存环并启动工作进程，等待其完成AEC初始化.
+        """
+        if not self.enabled:
+            return False
+
+        self._loop = asyncio.get_running_loop()
+        self._started = self._loop.create_future()
+        context = multiprocessing.get_context("spawn")
+
+        doorbells = {
+            "capture": context.Semaphore(0),
+            "processed": context.Semaphore(0),
+            "event": context.Semaphore(0),
+        }
+        slots = self.ring_slots
+        self._capture_ring = SharedFrameRing(
+            self.frame_size * 2, slots, doorbell=doorbells["capture"]
+        )
+        self._processed_ring = SharedFrameRing(
+            self.frame_size * 2, slots, doorbell=doorbells["processed"]
+        )
+        self._render_ring = SharedFrameRing(RENDER_SLOT_SIZE, slots)
+        self._event_ring = SharedFrameRing(
+            EVENT_SLOT_SIZE, slots, np.uint8, doorbell=doorbells["event"]
+        )
+
+        spec = DSPWorkerSpec(
+            frame_size=self.frame_size,
+            capture_ring=self._capture_ring.spec(),
+            processed_ring=self._processed_ring.spec(),
+            render_ring=self._render_ring.spec(),
+            event_ring=self._event_ring.spec(),
+            aec=self.aec,
+            wake_word=self.wake_word,
+            barge_in=self.barge_in,
+            doorbells=doorbells,
+        )
+        receiver, self._control = context.Pipe(duplex=False)
+        self._process = context.Process(
+            target=run_dsp_worker, args=(spec, receiver), name="XiaozhiDSP", daemon=True
+        )
+
+        started = time.perf_counter()
+        try:
+            self._process.start()
+        except Exception:
+            self._process = None
+            self._close_rings()
+            raise
+        finally:
+            receiver.close()
+        self._running = True
+        self._alive = True
+        self._event_thread = threading.Thread(
+            target=self._event_loop, name="DSPEvents", daemon=True
+        )
+        self._event_thread.start()
+
+        try:
+            ok = await asyncio.wait_for(asyncio.shield(self._started), self.start_timeout)
+        except asyncio.TimeoutError:
+            logger.error(f"DSP工作进程启动超时({self.start_timeout}s)")
+            ok = False
+        if not ok:
+            await self.stop()
+            return False
+
+        logger.info(
+            f"DSP工作进程已启动 - pid: {self._process.pid}, "
+            f"耗时: {(time.perf_counter() - started) * 1000:.0f}ms, "
+            f"AEC: {self.aec_backend if self.aec_enabled else '未启用'}"
+        )
+        return True
+
+    async def stop(self):
+        """
+        停止工作进程并释放共享内存.
+        """
+        if self._process is None:
+            return
+        self._running = False
+        self.send_command("stop")
+        # 之后的采集帧直接回退为原始音频
+        self._alive = False
+
+        process = self._process
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, process.join, 3.0)
+        if process.is_alive():
+            logger.warning("DSP工作进程未按时退出，强制终止")
+            process.terminate()
+            await loop.run_in_executor(None, process.join, 1.0)
+
+        if self._event_ring is not None:
+            self._event_ring.wakeup()
+        if self._event_thread is not None:
+            await loop.run_in_executor(None, self._event_thread.join, 1.0)
+            self._event_thread = None
+
+        with self._control_lock:
+            try:
+                self._control.close()
+            except OSError:
+                pass
+        self._close_rings()
+        self._process = None
+        logger.info("DSP工作进程已停止")
+
+    def _close_rings(self):
+        for ring in (
+            self._capture_ring,
+            self._processed_ring,
+            self._render_ring,
+            self._event_ring,
+        ):
+            if ring is not None:
+                ring.close()
+        self._capture_ring = self._processed_ring = None
+        self._render_ring = self._event_ring = None
+
+    def send_command(self, command: str, **kwargs):
+        """
+        下发控制命令（任意线程调用）.
+        """
+        if self._control is None or not self._alive:
+            return
+        with self._control_lock:
+            try:
+                self._control.send((command, kwargs))
+            except (OSError, ValueError) as e:
+                logger.debug(f"DSP命令发送失败: {command}: {e}")
+
+    def process_capture(self, frame: np.ndarray) -> Optional[np.ndarray]:
+        """编码线程调用：把一帧交给工作进程处理并等待结果.
+
+        Returns:
+            处理后的帧（内部缓冲视图，下一次调用前有效）；超时或进程不可用时返回None
+        """
+        ring = self._capture_ring
+        if not self._alive or ring is None:
+            return None
+
+        seq = self._capture_seq
+        self._capture_seq += 1
+        started = time.perf_counter()
+        if not ring.put(frame, tag=seq, timestamp=time.monotonic()):
+            return None
+
+        processed_ring = self._processed_ring
+        deadline = started + self.response_timeout
+        while True:
+            count, tag, _ = processed_ring.get_into(self._processed)
+            if count:
+                if tag == seq:
+                    elapsed_ms = (time.perf_counter() - started) * 1000
+                    self.round_trips += 1
+                    self._round_trip_ms += elapsed_ms
+                    self._round_trip_max_ms = max(self._round_trip_max_ms, elapsed_ms)
+                    return self._processed[:count]
+                # 之前超时帧的迟到结果
+                self.stale_frames += 1
+                continue
+
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                self.timeouts += 1
+                return None
+            processed_ring.wait(remaining)
+
+    def submit_capture(self, frame: np.ndarray):
+        """
+        编码线程调用：只把帧交给工作进程的检测器，不等待处理结果（无需AEC时）.
+        """
+        ring = self._capture_ring
+        if ring is not None and self._alive:
+            ring.put(frame, tag=-1, timestamp=time.monotonic())
+
+    def push_render(self, samples: np.ndarray, sample_rate: int):
+        """
+        播放回调调用：写入参考信号（软件AEC），只做拷贝.
+        """
+        ring = self._render_ring
+        if ring is None or not self._alive:
+            return
+        ring.put(samples, tag=int(sample_rate))
+
+    def _event_loop(self):
+        """
+        事件线程：读取工作进程事件并投递到主事件循环，同时监测进程存活.
+        """
+        payload = np.zeros(EVENT_SLOT_SIZE, dtype=np.uint8)
+        while self._running:
+            ring = self._event_ring
+            if ring is None:
+                break
+            if not ring.wait(timeout=0.5):
+                process = self._process
+                if self._running and process is not None and not process.is_alive():
+                    logger.error(
+                        f"DSP工作进程意外退出（exitcode={process.exitcode}），"
+                        f"采集将回退为原始音频"
+                    )
+                    self._alive = False
+                    self._post({"type": "exited", "exitcode": process.exitcode})
+                    if self._loop is not None and self._started is not None:
+                        # 启动阶段退出：不再等待 started 事件
+                        self._loop.call_soon_threadsafe(self._fail_start)
+                    break
+                continue
+
+            while True:
+                count, _, _ = ring.get_into(payload)
+                if count == 0:
+                    break
+                try:
+                    event = json.loads(payload[:count].tobytes().decode("utf-8"))
+                except ValueError as e:
+                    logger.warning(f"DSP事件解析失败: {e}")
+                    continue
+                self._post(event)
+
+    def _post(self, event: Dict[str, Any]):
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            loop.call_soon_threadsafe(self._dispatch_event, event)
+        except RuntimeError:
+            pass
+
+    def _fail_start(self):
+        if self._started is not None and not self._started.done():
+            self._started.set_result(False)
+
+    def _dispatch_event(self, event: Dict[str, Any]):
+        """
+        事件循环线程：更新本地状态并调用处理函数.
+        """
+        event_type = event.get("type")
+        if event_type == "started":
+            self.aec_enabled = bool(event.get("aec_enabled"))
+            self.aec_backend = event.get("aec_backend")
+            self.aec_needs_processing = bool(event.get("needs_processing"))
+            self.aec_uses_render_reference = bool(event.get("uses_render_reference"))
+            if self._started is not None and not self._started.done():
+                self._started.set_result(True)
+        elif event_type == "stats":
+            self._remote_stats = event
+
+        for handler in self._handlers.get(event_type, ()):
+            try:
+                handler(event)
+            except Exception as e:
+                logger.error(f"DSP事件处理失败({event_type}): {e}", exc_info=True)
+
+    def get_remote_stats(self, section: str) -> Dict[str, Any]:
+        """
+        工作进程最近一次上报的分项统计（aec / wake_word / barge_in）.
+        """
+        return dict(self._remote_stats.get(section) or {})
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "alive": self._alive,
+            "pid": self._process.pid if self._process is not None else None,
+            "round_trips": self.round_trips,
+            "timeouts": self.timeouts,
+            "stale_frames": self.stale_frames,
+            "round_trip_avg_ms": round(self._round_trip_ms / self.round_trips, 3)
+            if self.round_trips
+            else 0.0,
+            "round_trip_max_ms": round(self._round_trip_max_ms, 3),
+            "remote": {
+                key: value
+                for key, value in self._remote_stats.items()
+                if key not in ("type", "aec", "wake_word", "barge_in")
+            },
+        }
+
+
+class RemoteWakeWordDetector:
+    """
+    与 WakeWordDetector 接口一致的代理，推理在DSP工作进程中运行.
+    """
+
+    def __init__(self, worker: DSPWorker):
+        self._worker = worker
+        self.enabled = worker.wake_word and worker.alive
+        self.paused = False
+        self._running = False
+        self.on_detected_callback: Optional[Callable] = None
+        self.on_error: Optional[Callable] = None
+        self.load_time_ms: Optional[float] = None
+        self.warmup_time_ms: Optional[float] = None
+
+        self._ready: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._pending_tasks = set()
+        worker.on_event("wake_word_ready", self._on_ready)
+        worker.on_event("wake_word", self._on_wake_word)
+        worker.on_event("wake_word_error", self._on_error)
+        worker.on_event("exited", lambda _event: self._on_ready({"ok": False}))
+
+    def on_detected(self, callback: Callable):
+        self.on_detected_callback = callback
+
+    def load_model(self) -> asyncio.Future:
+        """
+        模型已在工作进程中后台加载，返回就绪Future.
+        """
+        if not self.enabled and not self._ready.done():
+            self._ready.set_result(False)
+        return self._ready
+
+    async def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        try:
+            return await asyncio.wait_for(asyncio.shield(self.load_model()), timeout)
+        except asyncio.TimeoutError:
+            return False
+
+    async def start(self, audio_codec=None) -> bool:
+        if not self.enabled:
+            return False
+        self._running = await self.wait_ready()
+        return self._running
+
+    async def stop(self):
+        self._running = False
+        self._worker.send_command("wake_word_stop")
+        for task in list(self._pending_tasks):
+            task.cancel()
+
+    async def pause(self):
+        self.paused = True
+        self._worker.send_command("wake_word_pause")
+
+    async def resume(self):
+        self.paused = False
+        self._worker.send_command("wake_word_resume")
+
+    def is_running(self) -> bool:
+        return self._running and not self.paused and self._worker.alive
+
+    def _on_ready(self, event: Dict[str, Any]):
+        self.load_time_ms = event.get("load_time_ms")
+        self.warmup_time_ms = event.get("warmup_time_ms")
+        if not self._ready.done():
+            self._ready.set_result(bool(event.get("ok")))
+
+    def _on_wake_word(self, event: Dict[str, Any]):
+        callback = self.on_detected_callback
+        if not self._running or callback is None:
+            return
+        text = event.get("text")
+        if asyncio.iscoroutinefunction(callback):
+            task = asyncio.create_task(callback(text, text))
+            self._pending_tasks.add(task)
+            task.add_done_callback(self._pending_tasks.discard)
+        else:
+            callback(text, text)
+
+    def _on_error(self, event: Dict[str, Any]):
+        if self.on_error:
+            self.on_error(RuntimeError(event.get("error")))
+
+    def get_performance_stats(self):
+        return {
+            "process": "dsp_worker",
+            **self._worker.get_remote_stats("wake_word"),
+            "is_running": self.is_running(),
+        }
+
+
+class RemoteBargeInDetector:
+    """
+    与 VADDetector 接口一致的代理，检测在DSP工作进程中运行.
+    """
+
+    def __init__(self, worker: DSPWorker):
+        self._worker = worker
+        self.enabled = worker.barge_in and worker.alive
+        self.on_barge_in: Optional[Callable[[float], None]] = None
+        self._active = False
+        self._running = False
+        worker.on_event("barge_in", self._on_barge_in)
+
+    def on_detected(self, callback: Callable[[float], None]):
+        self.on_barge_in = callback
+
+    async def start(self, audio_codec=None) -> bool:
+        self._running = self.enabled
+        return self._running
+
+    async def stop(self):
+        self._running = False
+        self._worker.send_command("barge_in_stop")
+
+    def set_active(self, active: bool):
+        if active == self._active:
+            return
+        self._active = active
+        self._worker.send_command("barge_in_active", active=active)
+
+    def is_running(self) -> bool:
+        return self._running and self._active
+
+    def _on_barge_in(self, event: Dict[str, Any]):
+        if self._running and self.on_barge_in:
+            self.on_barge_in(float(event.get("latency_ms") or 0.0))
+
+    def get_performance_stats(self):
+        return {
+            "process": "dsp_worker",
+            **self._worker.get_remote_stats("barge_in"),
+            "active": self._active,
+        }
@@ -0,0 +1,164 @@
+from typing import Any, Callable, Dict
+
+import numpy as np
+import webrtcvad
+
+from app.common.logging_config import get_logger
+from app.service.audio_processing.noise_floor import NoiseFloorTracker
+
+logger = get_logger(__name__)
+
+
+class KWSPreGate:
+    """
+    唤醒词推理前置门限：静音时不把音频送入 KWS 编码器.
+
+    每帧先做能量判断（高于自适应噪声底 margin_db 且高于绝对下限 min_level_dbfs），
+    可选叠加 webrtcvad（任一10ms子帧判为语音即视为活动）。门限关闭期间帧只复制进
+    回看缓冲（lookback_ms）；检测到活动时先按时间顺序回放回看缓冲，再放行当前帧，
+    保证唤醒词的第一个音节不会丢失。活动结束后保持 hangover_ms 再关闭，
+    关闭时返回 True，由调用方重置 KWS 流（下次打开从干净状态开始解码）。
+    """
+
+    VAD_FRAME_MS = 10
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        margin_db: float = 9.0,
+        min_level_dbfs: float = -60.0,
+        lookback_ms: int = 500,
+        hangover_ms: int = 1000,
+        use_vad: bool = False,
+        vad_aggressiveness: int = 2,
+    ):
+        self.sample_rate = sample_rate
+        self.margin_db = float(margin_db)
+        self.min_level_dbfs = float(min_level_dbfs)
+        self.lookback_ms = int(lookback_ms)
+        self.hangover_ms = int(hangover_ms)
+
+        self._noise_floor = NoiseFloorTracker(self.min_level_dbfs)
+        self._vad = (
+            webrtcvad.Vad(min(max(int(vad_aggressiveness), 0), 3)) if use_vad else None
+        )
+        self._vad_frame_size = sample_rate * self.VAD_FRAME_MS // 1000
+
+        # 回看缓冲：预分配的int16环形缓冲，按帧长首次分配
+        self._lookback = np.zeros(0, dtype=np.int16)
+        self._lookback_write = 0
+        self._lookback_filled = 0
+
+        self.is_open = False
+        self._hangover_left_ms = 0.0
+
+        # 统计
+        self.frames_total = 0
+        self.frames_passed = 0
+        self.frames_gated = 0
+        self.lookback_frames_replayed = 0
+        self.openings = 0
+
+    def _is_active(self, frame: np.ndarray, frame_ms: float) -> bool:
+        level_db = self._noise_floor.update(frame, frame_ms)
+        if level_db < self.min_level_dbfs:
+            return False
+        if level_db >= self._noise_floor.floor_db + self.margin_db:
+            return True
+        if self._vad is None:
+            return False
+
+        step = self._vad_frame_size
+        for start in range(0, len(frame) - step + 1, step):
+            chunk = frame[start : start + step]
+            if self._vad.is_speech(chunk.tobytes(), self.sample_rate):
+                return True
+        return False
+
+    def _remember(self, frame: np.ndarray):
+        count = len(frame)
+        capacity = self.sample_rate * self.lookback_ms // 1000
+        if capacity <= 0:
+            return
+        if len(self._lookback) != capacity:
+            self._lookback = np.zeros(capacity, dtype=np.int16)
+            self._lookback_write = 0
+            self._lookback_filled = 0
+
+        if count >= capacity:
+            self._lookback[:] = frame[-capacity:]
+            self._lookback_write = 0
+            self._lookback_filled = capacity
+            return
+
+        end = self._lookback_write + count
+        if end <= capacity:
+            self._lookback[self._lookback_write : end] = frame
+        else:
+            first = capacity - self._lookback_write
+            self._lookback[self._lookback_write :] = frame[:first]
+            self._lookback[: count - first] = frame[first:]
+        self._lookback_write = end % capacity
+        self._lookback_filled = min(self._lookback_filled + count, capacity)
+
+    def _replay(self, feed: Callable[[np.ndarray], None]):
+        filled = self._lookback_filled
+        if not filled:
+            return
+        capacity = len(self._lookback)
+        start = (self._lookback_write - filled) % capacity
+        if start + filled <= capacity:
+            feed(self._lookback[start : start + filled])
+        else:
+            feed(self._lookback[start:])
+            feed(self._lookback[: self._lookback_write])
+        self._lookback_filled = 0
+        self.lookback_frames_replayed += 1
+
+    def process(self, frame: np.ndarray, feed: Callable[[np.ndarray], None]) -> bool:
+        """判断一帧是否送入KWS，放行的音频（含回看缓冲）通过 feed 依次送出.
+
+        Args:
+            frame: 采集帧（int16）
+            feed: 接收放行音频的回调（int16，调用返回后不再保留引用）
+
+        Returns:
+            门限是否在本帧关闭（调用方应重置KWS流）
+        """
+        self.frames_total += 1
+        frame_ms = len(frame) * 1000 / self.sample_rate
+        closed = False
+
+        if self._is_active(frame, frame_ms):
+            self._hangover_left_ms = self.hangover_ms
+            if not self.is_open:
+                self.is_open = True
+                self.openings += 1
+                self._replay(feed)
+        elif self.is_open:
+            self._hangover_left_ms -= frame_ms
+            if self._hangover_left_ms <= 0:
+                self.is_open = False
+                closed = True
+
+        if self.is_open:
+            feed(frame)
+            self.frames_passed += 1
+            return False
+
+        self._remember(frame)
+        self.frames_gated += 1
+        return closed
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "gate_open": self.is_open,
+            "gate_openings": self.openings,
+            "gate_frames_passed": self.frames_passed,
+            "gate_frames_skipped": self.frames_gated,
+            "gate_skip_ratio": round(self.frames_gated / self.frames_total, 3)
+            if self.frames_total
+            else 0.0,
+            "gate_lookback_replays": self.lookback_frames_replayed,
+            "gate_noise_floor_dbfs": round(self._noise_floor.floor_db, 1),
+        }
@@ -0,0 +1,49 @@
+import math
+
+import numpy as np
+
+
+class NoiseFloorTracker:
+    """
+    自适应噪声底估计：电平低于噪声底时快速下降，高于时缓慢上升.
+
+    短时语音不会明显抬高噪声底，而持续的背景噪声/残留回声会在数秒内被跟踪。
+    时间常数与帧长无关（按每次更新的时长换算平滑系数）。
+    """
+
+    def __init__(
+        self,
+        initial_db: float = -60.0,
+        fall_ms: float = 30.0,
+        rise_ms: float = 2000.0,
+    ):
+        self.floor_db = float(initial_db)
+        self.fall_ms = float(fall_ms)
+        self.rise_ms = float(rise_ms)
+        self._coefficients = {}
+
+    def _coefficient(self, duration_ms: float, tau_ms: float) -> float:
+        key = (duration_ms, tau_ms)
+        value = self._coefficients.get(key)
+        if value is None:
+            value = 1.0 - math.exp(-duration_ms / tau_ms)
+            self._coefficients[key] = value
+        return value
+
+    @staticmethod
+    def level_dbfs(samples: np.ndarray) -> float:
+        """
+        int16 样本的电平（dBFS）.
+        """
+        floats = samples.astype(np.float32)
+        power = float(np.dot(floats, floats)) / max(1, len(floats))
+        return 10 * math.log10(power / (32768.0**2) + 1e-10)
+
+    def update(self, samples: np.ndarray, duration_ms: float) -> float:
+        """
+        用一段样本更新噪声底，返回该段电平（dBFS）.
+        """
+        level_db = self.level_dbfs(samples)
+        tau = self.fall_ms if level_db < self.floor_db else self.rise_ms
+        self.floor_db += self._coefficient(duration_ms, tau) * (level_db - self.floor_db)
+        return level_db
@@ -1,298 +1,251 @@
-import logging
 import threading
 import time
+from typing import Callable, Optional
 
 import numpy as np
-import pyaudio
 import webrtcvad
 
-from src.constants.constants import AbortReason, DeviceState
+from app.common.constants import AudioConfig
+from app.common.config_manager import ConfigManager
+from app.common.logging_config import get_logger
+from app.service.audio_processing.noise_floor import NoiseFloorTracker
 
-# 配置日志
-logger = logging.getLogger("VADDetector")
+logger = get_logger(__name__)
 
 
 class VADDetector:
     """
-    基于WebRTC VAD的语音活动检测器，用于检测用户打断.
-    """
+    打断（barge-in）检测：SPEAKING 期间检测用户说话并触发中止播放.
 
-    def __init__(self, audio_codec, protocol, app_instance, loop):
-        """初始化VAD检测器.
+    不再单独打开麦克风，而是订阅 AudioCodec 的采集总线（AEC 之后的16kHz帧），
+    在独立工作线程中处理；非 SPEAKING 状态下线程阻塞等待，不消费任何帧。
 
-        参数:
-            audio_codec: 音频编解码器实例
-            protocol: 通信协议实例
-            app_instance: 应用程序实例
-            loop: 事件循环
-        """
-        self.audio_codec = audio_codec
-        self.protocol = protocol
-        self.app = app_instance
-        self.loop = loop
-
-        # VAD设置
-        self.vad = webrtcvad.Vad()
-        self.vad.set_mode(3)  # 设置最高灵敏度
-
-        # 参数设置
-        self.sample_rate = 16000
-        self.frame_duration = 20  # 毫秒
-        self.frame_size = int(self.sample_rate * self.frame_duration / 1000)
-        self.speech_window = 5  # 连续检测到多少帧语音才触发打断
-        self.energy_threshold = 300  # 能量阈值
-
-        # 状态变量
-        self.running = False
-        self.paused = False
-        self.thread = None
-        self.speech_count = 0
-        self.silence_count = 0
-        self.triggered = False
-
-        # 创建独立的PyAudio实例和流，避免与主音频流冲突
-        self.pa = None
-        self.stream = None
-
-    def start(self):
-        """
-        启动VAD检测器.
-        """
-        if self.thread and self.thread.is_alive():
-            logger.warning("VAD检测器已经在运行")
-            return
+    每10ms子帧同时满足以下条件记为语音：
+    - webrtcvad 判定为语音
+    - 能量高于自适应噪声底 noise_margin_db 以上（噪声底快降慢升，跟踪背景与残留回声）
+    - 能量高于绝对下限 min_level_dbfs
+    累计语音时长达到 trigger_ms（中间允许不超过 max_gap_ms 的间断）时触发一次，
+    直到下次进入 SPEAKING 才会再次触发。触发延迟为语音起点到触发时刻的时长。
+    """
 
-        self.running = True
-        self.paused = False
+    VAD_FRAME_MS = 10
 
-        # 初始化PyAudio和流
-        self._initialize_audio_stream()
+    def __init__(self):
+        self.audio_codec = None
+        self.on_barge_in: Optional[Callable[[float], None]] = None
 
-        # 启动检测线程
-        self.thread = threading.Thread(target=self._detection_loop, daemon=True)
-        self.thread.start()
-        logger.info("VAD检测器已启动")
+        config = ConfigManager.get_instance()
+        options = config.get_config("AUDIO_OPTIONS.BARGE_IN", {}) or {}
+        self.enabled = bool(options.get("ENABLED", False))
 
-    def stop(self):
-        """
-        停止VAD检测器.
-        """
-        self.running = False
+        self.sample_rate = AudioConfig.INPUT_SAMPLE_RATE
+        self.aggressiveness = min(max(int(options.get("AGGRESSIVENESS", 3)), 0), 3)
+        self.trigger_ms = int(options.get("TRIGGER_MS", 120))
+        self.max_gap_ms = int(options.get("MAX_GAP_MS", 30))
+        self.noise_margin_db = float(options.get("NOISE_MARGIN_DB", 12.0))
+        self.min_level_dbfs = float(options.get("MIN_LEVEL_DBFS", -55.0))
 
-        # 关闭音频流
-        self._close_audio_stream()
+        self._vad = webrtcvad.Vad(self.aggressiveness)
+        self._vad_frame_size = self.sample_rate * self.VAD_FRAME_MS // 1000
 
-        if self.thread and self.thread.is_alive():
-            self.thread.join(timeout=1.0)
+        # 采集总线订阅与工作线程
+        self._capture = None
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
 
-        logger.info("VAD检测器已停止")
+        # 激活由事件循环线程设置（进入/离开 SPEAKING），工作线程在下一帧生效
+        self._active = False
+        self._active_event = threading.Event()
+        self._reset_pending = False
 
-    def pause(self):
-        """
-        暂停VAD检测.
-        """
-        self.paused = True
-        logger.info("VAD检测器已暂停")
+        # 检测状态（仅工作线程访问）
+        # 噪声底快降（约30ms）慢升（约2s），语音段的短时能量不会明显抬高噪声底
+        self._noise_floor = NoiseFloorTracker(self.min_level_dbfs)
+        self._speech_ms = 0
+        self._gap_ms = 0
+        self._onset_time = 0.0
+        self._triggered = False
 
-    def resume(self):
-        """
-        恢复VAD检测.
-        """
-        self.paused = False
-        # 重置状态
-        self.speech_count = 0
-        self.silence_count = 0
-        self.triggered = False
-        logger.info("VAD检测器已恢复")
-
-    def is_running(self):
-        """
-        检查VAD检测器是否正在运行.
-        """
-        return self.running and not self.paused
+        # 统计
+        self.frames_processed = 0
+        self.speech_subframes = 0
+        self.triggers = 0
+        self.last_trigger_latency_ms: Optional[float] = None
+        self._latency_total_ms = 0.0
+        self._latency_max_ms = 0.0
 
-    def _initialize_audio_stream(self):
+    def on_detected(self, callback: Callable[[float], None]):
         """
-        初始化独立的音频流.
+        设置打断回调（在工作线程中调用，参数为触发延迟毫秒）.
         """
-        try:
-            # 创建PyAudio实例
-            self.pa = pyaudio.PyAudio()
-
-            # 获取默认输入设备
-            device_index = None
-            for i in range(self.pa.get_device_count()):
-                device_info = self.pa.get_device_info_by_index(i)
-                if device_info["maxInputChannels"] > 0:
-                    device_index = i
-                    break
-
-            if device_index is None:
-                logger.error("找不到可用的输入设备")
-                return False
-
-            # 创建输入流
-            self.stream = self.pa.open(
-                format=pyaudio.paInt16,
-                channels=1,
-                rate=self.sample_rate,
-                input=True,
-                input_device_index=device_index,
-                frames_per_buffer=self.frame_size,
-                start=True,
-            )
-
-            logger.info(f"VAD检测器音频流已初始化，使用设备索引: {device_index}")
-            return True
-
-        except Exception as e:
-            logger.error(f"初始化VAD音频流失败: {e}")
-            return False
+        self.on_barge_in = callback
 
-    def _close_audio_stream(self):
+    async def start(self, audio_codec) -> bool:
         """
-        关闭音频流.
+        订阅采集总线并启动检测线程.
         """
-        try:
-            if self.stream:
-                self.stream.stop_stream()
-                self.stream.close()
-                self.stream = None
-
-            if self.pa:
-                self.pa.terminate()
-                self.pa = None
-
-            logger.info("VAD检测器音频流已关闭")
-        except Exception as e:
-            logger.error(f"关闭VAD音频流失败: {e}")
+        if not self.enabled:
+            logger.info("打断检测未启用")
+            return False
+        if audio_codec is None:
+            logger.warning("音频编解码器不可用，无法启动打断检测")
+            return False
 
-    def _detection_loop(self):
-        """
-        VAD检测主循环.
-        """
-        logger.info("VAD检测循环已启动")
+        self.audio_codec = audio_codec
+        self._capture = audio_codec.subscribe_capture("barge_in")
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._run, name="BargeInVAD", daemon=True
+        )
+        self._thread.start()
+        logger.info(
+            f"打断检测已启动 - 触发时长: {self.trigger_ms}ms, "
+            f"噪声余量: {self.noise_margin_db}dB"
+        )
+        return True
+
+    async def stop(self):
+        """
+        停止检测线程并取消订阅.
+        """
+        self._running = False
+        self._active_event.set()
+        if self._capture:
+            self._capture.close()
+
+        thread = self._thread
+        if thread and thread.is_alive():
+            thread.join(timeout=1.0)
+        self._thread = None
+        logger.info("打断检测已停止")
+
+    def set_active(self, active: bool):
+        """
+        进入/离开 SPEAKING 时由事件循环线程调用.
+        """
+        if active and not self._active:
+            self._reset_pending = True
+        self._active = active
+        if active:
+            self._active_event.set()
+        else:
+            self._active_event.clear()
+
+    def is_running(self) -> bool:
+        return self._running and self._active
+
+    def _reset(self):
+        self._reset_pending = False
+        self._speech_ms = 0
+        self._gap_ms = 0
+        self._triggered = False
+        if self._capture:
+            # 只检测进入 SPEAKING 之后的语音
+            self._capture.skip_pending()
+
+    def _run(self):
+        capture = self._capture
+        while self._running:
+            if not self._active_event.wait(0.5):
+                continue
+            if not self._running:
+                break
+            if self._reset_pending:
+                self._reset()
 
-        while self.running:
-            # 如果暂停或者音频流未初始化，则跳过
-            if self.paused or not self.stream:
-                time.sleep(0.1)
+            if not capture.wait(timeout=0.1):
                 continue
 
             try:
-                # 只在说话状态下进行检测
-                if self.app.device_state == DeviceState.SPEAKING:
-                    # 读取音频帧
-                    frame = self._read_audio_frame()
-                    if not frame:
-                        time.sleep(0.01)
-                        continue
-
-                    # 检测是否是语音
-                    is_speech = self._detect_speech(frame)
-
-                    # 如果检测到语音并且达到触发条件，处理打断
-                    if is_speech:
-                        self._handle_speech_frame(frame)
-                    else:
-                        self._handle_silence_frame(frame)
-                else:
-                    # 不在说话状态，重置状态
-                    self._reset_state()
-
+                while self._active and not self._reset_pending:
+                    frame = capture.read()
+                    if frame is None:
+                        break
+                    self._process_frame(frame, capture.last_timestamp)
             except Exception as e:
-                logger.error(f"VAD检测循环出错: {e}")
-
-            time.sleep(0.01)  # 小延迟，减少CPU使用
-
-        logger.info("VAD检测循环已结束")
-
-    def _read_audio_frame(self):
-        """
-        读取一帧音频数据.
-        """
-        try:
-            if not self.stream or not self.stream.is_active():
-                return None
-
-            # 读取音频数据
-            data = self.stream.read(self.frame_size, exception_on_overflow=False)
-            return data
-        except Exception as e:
-            logger.error(f"读取音频帧失败: {e}")
-            return None
-
-    def _detect_speech(self, frame):
-        """
-        检测是否是语音.
-        """
-        try:
-            # 确保帧长度正确
-            if len(frame) != self.frame_size * 2:  # 16位音频，每个样本2字节
-                return False
-
-            # 使用VAD检测
-            is_speech = self.vad.is_speech(frame, self.sample_rate)
-
-            # 计算音频能量
-            audio_data = np.frombuffer(frame, dtype=np.int16)
-            energy = np.mean(np.abs(audio_data))
-
-            # 结合VAD和能量阈值
-            is_valid_speech = is_speech and energy > self.energy_threshold
-
-            if is_valid_speech:
-                logger.debug(
-                    f"检测到语音 [能量: {energy:.2f}] [连续语音帧: {self.speech_count+1}]"
-                )
-
-            return is_valid_speech
-        except Exception as e:
-            logger.error(f"检测语音失败: {e}")
-            return False
+                logger.error(f"打断检测处理失败: {e}", exc_info=True)
+                time.sleep(0.1)
 
-    def _handle_speech_frame(self, frame):
+    def _process_frame(self, frame: np.ndarray, published_at: float):
         """
-        处理语音帧.
+        按10ms子帧检测一帧（published_at 为该帧发布到采集总线的时间）.
         """
-        self.speech_count += 1
-        self.silence_count = 0
-
-        # 检测到足够的连续语音帧，触发打断
-        if self.speech_count >= self.speech_window and not self.triggered:
-            self.triggered = True
-            logger.info("检测到持续语音，触发打断！")
-            self._trigger_interrupt()
+        self.frames_processed += 1
+        if self._triggered:
+            return
 
-            # 立即暂停自己，防止重复触发
-            self.paused = True
-            logger.info("VAD检测器已自动暂停以防止重复触发")
+        step = self._vad_frame_size
+        subframes = len(frame) // step
+        frame_ms = subframes * self.VAD_FRAME_MS
 
-            # 重置状态
-            self.speech_count = 0
-            self.silence_count = 0
-            self.triggered = False
+        for index in range(subframes):
+            chunk = frame[index * step : (index + 1) * step]
+            level_db = self._noise_floor.update(chunk, self.VAD_FRAME_MS)
 
-    def _handle_silence_frame(self, frame):
-        """
-        处理静音帧.
-        """
-        self.silence_count += 1
-        self.speech_count = 0
+            is_speech = (
+                level_db >= self.min_level_dbfs
+                and level_db >= self._noise_floor.floor_db + self.noise_margin_db
+                and self._vad.is_speech(chunk.tobytes(), self.sample_rate)
+            )
 
-    def _reset_state(self):
-        """
-        重置状态.
-        """
-        self.speech_count = 0
-        self.silence_count = 0
-        self.triggered = False
+            if not is_speech:
+                if self._speech_ms:
+                    self._gap_ms += self.VAD_FRAME_MS
+                    if self._gap_ms > self.max_gap_ms:
+                        self._speech_ms = 0
+                        self._gap_ms = 0
+                continue
 
-    def _trigger_interrupt(self):
-        """
-        触发打断.
-        """
-        # 通知应用程序中止当前语音输出
-        self.app.schedule(
-            lambda: self.app.abort_speaking(AbortReason.WAKE_WORD_DETECTED)
+            self.speech_subframes += 1
+            if self._speech_ms == 0:
+                # 语音起点：该子帧开始时刻 ≈ 帧发布时间 - 帧内剩余时长
+                self._onset_time = published_at - (
+                    frame_ms - index * self.VAD_FRAME_MS
+                ) / 1000
+            self._speech_ms += self.VAD_FRAME_MS
+            self._gap_ms = 0
+
+            if self._speech_ms >= self.trigger_ms:
+                self._trigger()
+                return
+
+    def _trigger(self):
+        self._triggered = True
+        self.triggers += 1
+
+        latency_ms = (time.monotonic() - self._onset_time) * 1000
+        self.last_trigger_latency_ms = latency_ms
+        self._latency_total_ms += latency_ms
+        self._latency_max_ms = max(self._latency_max_ms, latency_ms)
+        logger.info(
+            f"检测到用户打断 - 触发延迟: {latency_ms:.0f}ms, "
+            f"噪声底: {self._noise_floor.floor_db:.1f}dBFS"
         )
+
+        callback = self.on_barge_in
+        if callback:
+            try:
+                callback(latency_ms)
+            except Exception as e:
+                logger.warning(f"打断回调失败: {e}")
+
+    def get_performance_stats(self):
+        """
+        获取性能统计信息.
+        """
+        return {
+            "enabled": self.enabled,
+            "active": self._active,
+            "frames_processed": self.frames_processed,
+            "speech_subframes": self.speech_subframes,
+            "noise_floor_dbfs": round(self._noise_floor.floor_db, 1),
+            "triggers": self.triggers,
+            "last_trigger_latency_ms": round(self.last_trigger_latency_ms, 1)
+            if self.last_trigger_latency_ms is not None
+            else None,
+            "avg_trigger_latency_ms": round(self._latency_total_ms / self.triggers, 1)
+            if self.triggers
+            else None,
+            "max_trigger_latency_ms": round(self._latency_max_ms, 1),
+            "dropped_frames": self._capture.dropped if self._capture else 0,
+        }
@@ -1,4 +1,5 @@
 import asyncio
+import threading
 import time
 from pathlib import Path
 from typing import Callable, Optional
@@ -10,9 +11,53 @@ from app.common.constants import AudioConfig
 from app.common.config_manager import ConfigManager
 from app.common.logging_config import get_logger
 from app.common.path_manager import path_manager
+from app.service.audio_processing.kws_pre_gate import KWSPreGate
 
 logger = get_logger(__name__)
 
+KWS_MODEL_FILES = (
+    "encoder.onnx",
+    "decoder.onnx",
+    "joiner.onnx",
+    "tokens.txt",
+    "keywords.txt",
+)
+
+
+def create_keyword_spotter(
+    model_dir: Path,
+    sample_rate: int = 16000,
+    num_threads: int = 4,
+    provider: str = "cpu",
+    max_active_paths: int = 2,
+    keywords_score: float = 1.8,
+    keywords_threshold: float = 0.2,
+    num_trailing_blanks: int = 1,
+):
+    """
+    从模型目录创建 Sherpa-ONNX KeywordSpotter（检测器与离线评测共用）.
+    """
+    model_dir = Path(model_dir)
+    for name in KWS_MODEL_FILES:
+        if not (model_dir / name).exists():
+            raise FileNotFoundError(f"模型文件不存在: {model_dir / name}")
+
+    return sherpa_onnx.KeywordSpotter(
+        tokens=str(model_dir / "tokens.txt"),
+        encoder=str(model_dir / "encoder.onnx"),
+        decoder=str(model_dir / "decoder.onnx"),
+        joiner=str(model_dir / "joiner.onnx"),
+        keywords_file=str(model_dir / "keywords.txt"),
+        num_threads=num_threads,
+        sample_rate=sample_rate,
+        feature_dim=80,
+        max_active_paths=max_active_paths,
+        keywords_score=keywords_score,
+        keywords_threshold=keywords_threshold,
+        num_trailing_blanks=num_trailing_blanks,
+        provider=provider,
+    )
+
 
 class WakeWordDetector:
 
@@ -21,7 +66,32 @@ class WakeWordDetector:
         self.audio_codec = None
         self.is_running_flag = False
         self.paused = False
-        self.detection_task = None
+
+        # 采集总线订阅（替代轮询队列）
+        self._capture = None
+
+        # 推理线程：阻塞等待采集帧，KWS特征提取与解码不占用事件循环
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._inference_thread: Optional[threading.Thread] = None
+        self._unpaused = threading.Event()
+        self._waveform = np.zeros(0, dtype=np.float32)
+        self._pending_tasks = set()
+
+        # 推理统计
+        self._frames_processed = 0
+        self._decode_calls = 0
+        self._decode_time_ms = 0.0
+        self._decode_time_max_ms = 0.0
+        self._inference_cpu_s = 0.0
+        self._detections = 0
+        self._dispatch_lag_ms = 0.0
+        self._dispatch_lag_max_ms = 0.0
+
+        # 模型后台加载：就绪Future（结果为模型是否可用）与加载/预热耗时
+        self._ready_future: Optional[asyncio.Future] = None
+        self._stop_requested = False
+        self.load_time_ms: Optional[float] = None
+        self.warmup_time_ms: Optional[float] = None
 
         # 防重复触发机制 - 缩短冷却时间提高响应
         self.last_detection_time = 0
@@ -46,9 +116,11 @@ class WakeWordDetector:
         self.keyword_spotter = None
         self.stream = None
 
-        # 初始化配置
+        # 静音前置门限（None 表示每帧都送入KWS）
+        self.pre_gate: Optional[KWSPreGate] = None
+
+        # 初始化配置（模型在 load_model() 中后台加载）
         self._load_config(config)
-        self._init_kws_model()
         self._validate_config()
 
     def _load_config(self, config):
@@ -84,8 +156,22 @@ class WakeWordDetector:
             "WAKE_WORD_OPTIONS.NUM_TRAILING_BLANKS", 1
         )
 
+        # 静音前置门限：无语音活动时跳过特征提取与解码，降低常驻CPU占用
+        gate_options = config.get_config("WAKE_WORD_OPTIONS.PRE_GATE", {}) or {}
+        if gate_options.get("ENABLED", True):
+            self.pre_gate = KWSPreGate(
+                sample_rate=self.sample_rate,
+                margin_db=gate_options.get("MARGIN_DB", 9.0),
+                min_level_dbfs=gate_options.get("MIN_LEVEL_DBFS", -60.0),
+                lookback_ms=gate_options.get("LOOKBACK_MS", 500),
+                hangover_ms=gate_options.get("HANGOVER_MS", 1000),
+                use_vad=gate_options.get("USE_VAD", False),
+                vad_aggressiveness=gate_options.get("VAD_AGGRESSIVENESS", 2),
+            )
+
         logger.info(
-            f"KWS配置加载完成 - 阈值: {self.keywords_threshold}, 分数: {self.keywords_score}"
+            f"KWS配置加载完成 - 阈值: {self.keywords_threshold}, 分数: {self.keywords_score}, "
+            f"前置门限: {'启用' if self.pre_gate else '禁用'}"
         )
 
     def _init_kws_model(self):
@@ -93,41 +179,17 @@ class WakeWordDetector:
         初始化Sherpa-ONNX KeywordSpotter模型.
         """
         try:
-            # 检查模型文件
-            encoder_path = self.model_dir / "encoder.onnx"
-            decoder_path = self.model_dir / "decoder.onnx"
-            joiner_path = self.model_dir / "joiner.onnx"
-            tokens_path = self.model_dir / "tokens.txt"
-            keywords_path = self.model_dir / "keywords.txt"
-
-            required_files = [
-                encoder_path,
-                decoder_path,
-                joiner_path,
-                tokens_path,
-                keywords_path,
-            ]
-            for file_path in required_files:
-                if not file_path.exists():
-                    raise FileNotFoundError(f"模型文件不存在: {file_path}")
-
             logger.info(f"加载Sherpa-ONNX KeywordSpotter模型: {self.model_dir}")
 
-            # 创建KeywordSpotter
-            self.keyword_spotter = sherpa_onnx.KeywordSpotter(
-                tokens=str(tokens_path),
-                encoder=str(encoder_path),
-                decoder=str(decoder_path),
-                joiner=str(joiner_path),
-                keywords_file=str(keywords_path),
-                num_threads=self.num_threads,
+            self.keyword_spotter = create_keyword_spotter(
+                self.model_dir,
                 sample_rate=self.sample_rate,
-                feature_dim=80,
+                num_threads=self.num_threads,
+                provider=self.provider,
                 max_active_paths=self.max_active_paths,
                 keywords_score=self.keywords_score,
                 keywords_threshold=self.keywords_threshold,
                 num_trailing_blanks=self.num_trailing_blanks,
-                provider=self.provider,
             )
 
             logger.info("Sherpa-ONNX KeywordSpotter模型加载成功")
@@ -136,6 +198,65 @@ class WakeWordDetector:
             logger.error(f"Sherpa-ONNX KeywordSpotter初始化失败: {e}", exc_info=True)
             self.enabled = False
 
+    def load_model(self) -> asyncio.Future:
+        """在后台线程加载KWS模型并预热，返回就绪Future（结果为模型是否可用）.
+
+        ONNX 模型加载耗时数百毫秒到数秒，不在事件循环线程上进行；重复调用返回同一Future。
+        """
+        if self._ready_future is None:
+            loop = asyncio.get_running_loop()
+            if self.enabled:
+                self._ready_future = loop.run_in_executor(None, self._load_and_warm_up)
+            else:
+                self._ready_future = loop.create_future()
+                self._ready_future.set_result(False)
+        return self._ready_future
+
+    async def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """
+        等待模型加载与预热完成，返回模型是否可用.
+        """
+        try:
+            return await asyncio.wait_for(asyncio.shield(self.load_model()), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"等待KWS模型加载超时({timeout}s)")
+            return False
+
+    def _load_and_warm_up(self) -> bool:
+        """
+        后台线程：加载模型并用静音做一次预热解码.
+        """
+        started = time.perf_counter()
+        self._init_kws_model()
+        self.load_time_ms = (time.perf_counter() - started) * 1000
+        if not self.keyword_spotter:
+            return False
+
+        self._warm_up()
+        logger.info(
+            f"KWS模型就绪 - 加载耗时: {self.load_time_ms:.0f}ms, "
+            f"预热耗时: {self.warmup_time_ms or 0.0:.0f}ms"
+        )
+        return True
+
+    def _warm_up(self):
+        """
+        对一秒静音做完整的特征提取与解码，触发ONNX Runtime的首次分配与图优化，
+        避免首次真实检测时的额外延迟。预热失败不影响检测。
+        """
+        started = time.perf_counter()
+        try:
+            stream = self.keyword_spotter.create_stream()
+            silence = np.zeros(self.sample_rate, dtype=np.float32)
+            stream.accept_waveform(sample_rate=self.sample_rate, waveform=silence)
+            while self.keyword_spotter.is_ready(stream):
+                self.keyword_spotter.decode_stream(stream)
+                self.keyword_spotter.get_result(stream)
+        except Exception as e:
+            logger.warning(f"KWS模型预热失败: {e}")
+            return
+        self.warmup_time_ms = (time.perf_counter() - started) * 1000
+
     def on_detected(self, callback: Callable):
         """
         设置检测到唤醒词的回调函数.
@@ -150,20 +271,34 @@ class WakeWordDetector:
             logger.warning("唤醒词功能未启用")
             return False
 
-        if not self.keyword_spotter:
+        # 等待后台加载完成（未调用 load_model() 时在此发起加载）
+        if not await self.wait_ready() or not self.keyword_spotter:
             logger.error("KeywordSpotter未初始化")
             return False
 
+        if self._stop_requested:
+            # 模型加载期间已请求停止
+            return False
+
         try:
             self.audio_codec = audio_codec
+            self._loop = asyncio.get_running_loop()
             self.is_running_flag = True
             self.paused = False
+            self._unpaused.set()
 
             # 创建检测流
             self.stream = self.keyword_spotter.create_stream()
 
-            # 启动检测任务
-            self.detection_task = asyncio.create_task(self._detection_loop())
+            # 订阅采集总线，推理线程阻塞等待新帧（不绑定事件循环）
+            if audio_codec:
+                self._capture = audio_codec.subscribe_capture("wakeword")
+
+            # 特征提取与解码在独立推理线程中运行，只把检测结果投递回事件循环
+            self._inference_thread = threading.Thread(
+                target=self._inference_loop, name="WakeWordKWS", daemon=True
+            )
+            self._inference_thread.start()
 
             logger.info("Sherpa-ONNX KeywordSpotter检测器启动成功")
             return True
@@ -172,95 +307,134 @@ class WakeWordDetector:
             self.enabled = False
             return False
 
-    async def _detection_loop(self):
+    def _inference_loop(self):
         """
-        检测循环.
+        推理线程主循环：等待采集帧 -> 送入KWS流 -> 解码.
         """
         error_count = 0
         MAX_ERRORS = 5
+        cpu_mark = time.thread_time()
 
         while self.is_running_flag:
-            try:
-                if self.paused:
-                    await asyncio.sleep(0.1)
-                    continue
+            if self.paused:
+                # 暂停期间阻塞等待恢复，恢复后从最新位置开始
+                self._unpaused.wait(0.5)
+                if self._capture and not self.paused:
+                    self._capture.skip_pending()
+                continue
+
+            capture = self._capture
+            if capture is None:
+                time.sleep(0.5)
+                continue
+
+            # 阻塞等待新帧（无数据时线程休眠，不产生空转唤醒）
+            if not capture.wait(timeout=0.5):
+                continue
 
-                if not self.audio_codec:
-                    await asyncio.sleep(0.5)
-                    continue
-
-                # 处理音频数据
-                await self._process_audio()
-
-                # 减少延迟提高响应速度
-                await asyncio.sleep(0.005)
+            try:
+                self._process_audio()
                 error_count = 0
-
-            except asyncio.CancelledError:
-                break
             except Exception as e:
                 error_count += 1
                 logger.error(f"KWS检测循环错误({error_count}/{MAX_ERRORS}): {e}")
-
-                # 调用错误回调
-                if self.on_error:
-                    try:
-                        if asyncio.iscoroutinefunction(self.on_error):
-                            await self.on_error(e)
-                        else:
-                            self.on_error(e)
-                    except Exception as callback_error:
-                        logger.error(f"执行错误回调时失败: {callback_error}")
+                self._post_to_loop(self._dispatch_error, e)
 
                 if error_count >= MAX_ERRORS:
                     logger.critical("达到最大错误次数，停止KWS检测")
                     break
-                await asyncio.sleep(1)
+                time.sleep(1)
 
-    async def _process_audio(self):
-        """处理音频数据 - 批量处理优化"""
-        try:
-            if not self.audio_codec or not self.stream:
-                return
-
-            # 批量获取多个音频帧以提高效率
-            audio_batches = []
-            for _ in range(3):  # 一次处理最多3帧
-                data = await self.audio_codec.get_raw_audio_for_detection()
-                if data:
-                    audio_batches.append(data)
-
-            if not audio_batches:
-                return
-
-            # 批量处理音频数据
-            for data in audio_batches:
-                # 转换音频格式
-                if isinstance(data, bytes):
-                    samples = (
-                        np.frombuffer(data, dtype=np.int16).astype(np.float32) / 32768.0
-                    )
-                else:
-                    samples = np.array(data, dtype=np.float32)
+            # 推理线程累计CPU时间（含等待唤醒的开销）
+            now = time.thread_time()
+            self._inference_cpu_s += now - cpu_mark
+            cpu_mark = now
+
+    def _process_audio(self):
+        """
+        消费所有已到达的帧并解码（推理线程）.
+        """
+        if not self._capture or not self.stream:
+            return
 
-                # 提供音频数据给KeywordSpotter
-                self.stream.accept_waveform(
-                    sample_rate=self.sample_rate, waveform=samples
-                )
+        gate = self.pre_gate
+        while True:
+            frame = self._capture.read()
+            if frame is None:
+                break
+            self._frames_processed += 1
+
+            if gate is None:
+                self._feed_waveform(frame)
+            elif gate.process(frame, self._feed_waveform):
+                # 门限关闭：丢弃未完成的解码状态，下次从回看缓冲重新开始
+                self.keyword_spotter.reset_stream(self.stream)
+
+        # 处理检测结果
+        while self.keyword_spotter.is_ready(self.stream):
+            started = time.perf_counter()
+            self.keyword_spotter.decode_stream(self.stream)
+            result = self.keyword_spotter.get_result(self.stream)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self._decode_calls += 1
+            self._decode_time_ms += elapsed_ms
+            self._decode_time_max_ms = max(self._decode_time_max_ms, elapsed_ms)
+
+            if result:
+                # 重置流状态，检测结果切回事件循环处理
+                self.keyword_spotter.reset_stream(self.stream)
+                self._post_to_loop(self._dispatch_detection, result, time.monotonic())
+                break
 
-            # 处理检测结果
-            while self.keyword_spotter.is_ready(self.stream):
-                self.keyword_spotter.decode_stream(self.stream)
-                result = self.keyword_spotter.get_result(self.stream)
+    def _feed_waveform(self, samples: np.ndarray):
+        """
+        int16 音频转换到预分配的float32缓冲后送入KWS流.
+        """
+        count = len(samples)
+        if len(self._waveform) < count:
+            self._waveform = np.zeros(count, dtype=np.float32)
+        waveform = self._waveform[:count]
+        np.multiply(samples, 1.0 / 32768.0, out=waveform, casting="unsafe")
+        self.stream.accept_waveform(sample_rate=self.sample_rate, waveform=waveform)
+
+    def _post_to_loop(self, callback, *args):
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            loop.call_soon_threadsafe(callback, *args)
+        except RuntimeError:
+            # 事件循环已关闭
+            pass
 
-                if result:
-                    await self._handle_detection_result(result)
-                    # 重置流状态
-                    self.keyword_spotter.reset_stream(self.stream)
-                    break  # 检测到后立即处理，不继续批量处理
+    def _dispatch_detection(self, result, detected_at: float):
+        """
+        事件循环线程：记录投递延迟并处理检测结果.
+        """
+        lag_ms = (time.monotonic() - detected_at) * 1000
+        self._dispatch_lag_ms = lag_ms
+        self._dispatch_lag_max_ms = max(self._dispatch_lag_max_ms, lag_ms)
+        if not self.is_running_flag:
+            return
+        task = asyncio.create_task(self._handle_detection_result(result))
+        self._pending_tasks.add(task)
+        task.add_done_callback(self._pending_tasks.discard)
 
-        except Exception as e:
-            logger.debug(f"KWS音频处理错误: {e}")
+    def _dispatch_error(self, error: Exception):
+        """
+        事件循环线程：调用错误回调.
+        """
+        if not self.on_error:
+            return
+        try:
+            if asyncio.iscoroutinefunction(self.on_error):
+                task = asyncio.create_task(self.on_error(error))
+                self._pending_tasks.add(task)
+                task.add_done_callback(self._pending_tasks.discard)
+            else:
+                self.on_error(error)
+        except Exception as callback_error:
+            logger.error(f"执行错误回调时失败: {callback_error}")
 
     async def _handle_detection_result(self, result):
         """
@@ -272,6 +446,7 @@ class WakeWordDetector:
             return
 
         self.last_detection_time = current_time
+        self._detections += 1
 
         # 触发回调
         if self.on_detected_callback:
@@ -287,14 +462,22 @@ class WakeWordDetector:
         """
         停止检测器.
         """
+        self._stop_requested = True
         self.is_running_flag = False
+        self._unpaused.set()
 
-        if self.detection_task:
-            self.detection_task.cancel()
-            try:
-                await self.detection_task
-            except asyncio.CancelledError:
-                pass
+        if self._capture:
+            # 关闭订阅会唤醒阻塞等待中的推理线程
+            self._capture.close()
+
+        thread = self._inference_thread
+        if thread and thread.is_alive():
+            # 最多等待一次解码完成
+            await asyncio.get_running_loop().run_in_executor(None, thread.join, 2.0)
+        self._inference_thread = None
+
+        for task in list(self._pending_tasks):
+            task.cancel()
 
         logger.info("Sherpa-ONNX KeywordSpotter检测器已停止")
 
@@ -303,6 +486,7 @@ class WakeWordDetector:
         暂停检测.
         """
         self.paused = True
+        self._unpaused.clear()
         logger.debug("KWS检测已暂停")
 
     async def resume(self):
@@ -310,6 +494,7 @@ class WakeWordDetector:
         恢复检测.
         """
         self.paused = False
+        self._unpaused.set()
         logger.debug("KWS检测已恢复")
 
     def is_running(self) -> bool:
@@ -342,7 +527,7 @@ class WakeWordDetector:
         """
         获取性能统计信息.
         """
-        return {
+        stats = {
             "enabled": self.enabled,
             "engine": "sherpa-onnx-kws",
             "provider": self.provider,
@@ -350,7 +535,30 @@ class WakeWordDetector:
             "keywords_threshold": self.keywords_threshold,
             "keywords_score": self.keywords_score,
             "is_running": self.is_running(),
+            "dropped_frames": self._capture.dropped if self._capture else 0,
+            "frames_processed": self._frames_processed,
+            "decode_calls": self._decode_calls,
+            "decode_time_avg_ms": round(self._decode_time_ms / self._decode_calls, 3)
+            if self._decode_calls
+            else 0.0,
+            "decode_time_max_ms": round(self._decode_time_max_ms, 3),
+            "inference_cpu_s": round(self._inference_cpu_s, 3),
+            "detections": self._detections,
+            # 检测结果从推理线程投递到事件循环处理的延迟（反映事件循环滞后）
+            "dispatch_lag_ms": round(self._dispatch_lag_ms, 2),
+            "dispatch_lag_max_ms": round(self._dispatch_lag_max_ms, 2),
+            "model_ready": self.keyword_spotter is not None,
+            "model_load_time_ms": round(self.load_time_ms, 1)
+            if self.load_time_ms is not None
+            else None,
+            "model_warmup_time_ms": round(self.warmup_time_ms, 1)
+            if self.warmup_time_ms is not None
+            else None,
+            "pre_gate_enabled": self.pre_gate is not None,
         }
+        if self.pre_gate is not None:
+            stats.update(self.pre_gate.get_stats())
+        return stats
 
     def clear_cache(self):
         """
@@ -3,6 +3,7 @@ import json
 from typing import Any, Dict, Optional, Tuple
 
 from app.service.iot.thing import Thing
+from app.common import json_codec
 from app.common.logging_config import get_logger
 
 logger = get_logger(__name__)
@@ -89,7 +90,7 @@ class ThingManager:
             else:
                 states.append(json.loads(state_json))  # 转换JSON字符串为字典
 
-        return changed, json.dumps(states)
+        return changed, json_codec.dumps_raw(states)
 
     async def get_states_json_str(self) -> str:
         """
@@ -0,0 +1,217 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+from app.common.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class AudioUplinkSender:
+    """
+    上行音频发送器：每个协议会话一个常驻发送任务.
+
+    编码线程调用 offer() 把编码帧放入有界通道（deque + 锁），发送任务在事件循环中
+    按入队顺序逐帧调用协议的 send_audio。通道满时按丢弃策略处理：
+    - oldest：丢弃最旧帧，保证实时性（默认）
+    - newest：丢弃新到的帧，保证已排队内容连续
+
+    唤醒：发送任务空闲等待前置位等待标志，编码线程仅在标志置位时
+    call_soon_threadsafe 唤醒一次；网络慢导致积压时不再逐帧调度，
+    发送任务一次取出最多 batch_frames 帧连续发送（合并唤醒与调度开销）。
+    """
+
+    DROP_OLDEST = "oldest"
+    DROP_NEWEST = "newest"
+
+    def __init__(
+        self,
+        send_func: Callable[[bytes], Awaitable[Any]],
+        loop: asyncio.AbstractEventLoop,
+        max_frames: int = 50,
+        batch_frames: int = 10,
+        drop_policy: str = DROP_OLDEST,
+        should_send: Optional[Callable[[], bool]] = None,
+    ):
+        """
+        Args:
+            send_func: 协议发送协程函数（如 protocol.send_audio）
+            loop: 发送任务所在事件循环
+            max_frames: 通道容量（帧）
+            batch_frames: 每次唤醒最多连续发送的帧数
+            drop_policy: 通道满时的丢弃策略（oldest / newest）
+            should_send: 发送前的状态检查（事件循环中调用），返回 False 时丢弃该批
+        """
+        if drop_policy not in (self.DROP_OLDEST, self.DROP_NEWEST):
+            logger.warning(f"未知的上行丢弃策略: {drop_policy}，使用 oldest")
+            drop_policy = self.DROP_OLDEST
+
+        self._send = send_func
+        self._loop = loop
+        self.max_frames = max(1, int(max_frames))
+        self.batch_frames = max(1, int(batch_frames))
+        self.drop_policy = drop_policy
+        self._should_send = should_send
+
+        self._lock = threading.Lock()
+        self._frames: Deque[Tuple[bytes, float]] = deque()
+        self._waiting = False
+        self._wakeup = asyncio.Event()
+        self._running = False
+        self._task: Optional[asyncio.Task] = None
+
+        # 统计
+        self.frames_offered = 0
+        self.frames_sent = 0
+        self.frames_dropped = 0
+        self.frames_discarded = 0
+        self.send_errors = 0
+        self.batches = 0
+        self.max_batch = 0
+        self.max_depth = 0
+        self._latency_total_ms = 0.0
+        self._latency_max_ms = 0.0
+        self._last_latency_ms = 0.0
+
+    @property
+    def depth(self) -> int:
+        return len(self._frames)
+
+    def start(self):
+        """
+        在事件循环中启动发送任务.
+        """
+        if self._running:
+            return
+        self._running = True
+        self._task = asyncio.create_task(self._run(), name="上行音频发送")
+
+    async def stop(self):
+        """
+        停止发送任务并丢弃未发送的帧（会话结束后不再补发）.
+        """
+        self._running = False
+        with self._lock:
+            self.frames_discarded += len(self._frames)
+            self._frames.clear()
+        self._wakeup.set()
+
+        task = self._task
+        self._task = None
+        if task and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+            except Exception as e:
+                logger.warning(f"上行音频发送任务结束异常: {e}")
+
+    def offer(self, data: bytes) -> bool:
+        """编码线程调用：放入一帧，返回是否入队.
+
+        不阻塞编码线程；通道满时按丢弃策略处理。
+        """
+        if not self._running:
+            return False
+
+        wake = False
+        with self._lock:
+            self.frames_offered += 1
+            if len(self._frames) >= self.max_frames:
+                self.frames_dropped += 1
+                if self.drop_policy == self.DROP_NEWEST:
+                    return False
+                self._frames.popleft()
+            self._frames.append((data, time.monotonic()))
+            depth = len(self._frames)
+            if depth > self.max_depth:
+                self.max_depth = depth
+            if self._waiting:
+                self._waiting = False
+                wake = True
+
+        if wake:
+            try:
+                self._loop.call_soon_threadsafe(self._wakeup.set)
+            except RuntimeError:
+                # 事件循环已关闭
+                pass
+        return True
+
+    def _take_batch(self):
+        """
+        取出最多 batch_frames 帧；通道为空时置位等待标志.
+        """
+        with self._lock:
+            if not self._frames:
+                self._waiting = True
+                return None
+            count = min(len(self._frames), self.batch_frames)
+            return [self._frames.popleft() for _ in range(count)]
+
+    async def _run(self):
+        try:
+            while self._running:
+                batch = self._take_batch()
+                if batch is None:
+                    self._wakeup.clear()
+                    # 清除事件前生产者可能已入队：再检查一次，避免丢失唤醒
+                    if self.depth == 0:
+                        await self._wakeup.wait()
+                    continue
+
+                if self._should_send is not None and not self._should_send():
+                    self.frames_discarded += len(batch)
+                    continue
+
+                self.batches += 1
+                if len(batch) > self.max_batch:
+                    self.max_batch = len(batch)
+                for data, queued_at in batch:
+                    if not self._running:
+                        break
+                    try:
+                        await self._send(data)
+                    except asyncio.CancelledError:
+                        raise
+                    except Exception as e:
+                        self.send_errors += 1
+                        logger.error(f"发送上行音频失败: {e}")
+                        continue
+                    self._record_sent(queued_at)
+        except asyncio.CancelledError:
+            pass
+
+    def _record_sent(self, queued_at: float):
+        latency_ms = (time.monotonic() - queued_at) * 1000
+        self.frames_sent += 1
+        self._last_latency_ms = latency_ms
+        self._latency_total_ms += latency_ms
+        if latency_ms > self._latency_max_ms:
+            self._latency_max_ms = latency_ms
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "running": self._running,
+            "queue_depth": self.depth,
+            "max_queue_depth": self.max_depth,
+            "queue_capacity": self.max_frames,
+            "drop_policy": self.drop_policy,
+            "frames_offered": self.frames_offered,
+            "frames_sent": self.frames_sent,
+            "frames_dropped": self.frames_dropped,
+            "frames_discarded": self.frames_discarded,
+            "send_errors": self.send_errors,
+            "batches": self.batches,
+            "max_batch": self.max_batch,
+            "last_send_latency_ms": round(self._last_latency_ms, 2),
+            "avg_send_latency_ms": round(
+                self._latency_total_ms / self.frames_sent, 2
+            )
+            if self.frames_sent
+            else None,
+            "max_send_latency_ms": round(self._latency_max_ms, 2),
+        }
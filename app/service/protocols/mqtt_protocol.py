@@ -1,15 +1,14 @@
 import asyncio
-import json
-import socket
-import threading
+import struct
 import time
+from typing import Optional
 
 import paho.mqtt.client as mqtt
-from cryptography.hazmat.backends import default_backend
-from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
 
+from app.common import json_codec
 from app.common.constants import AudioConfig
 from app.service.protocols.protocol import Protocol
+from app.service.protocols.udp_audio_crypto import UdpAudioCrypto
 from app.common.config_manager import ConfigManager
 from app.common.logging_config import get_logger
 
@@ -17,15 +16,39 @@ from app.common.logging_config import get_logger
 logger = get_logger(__name__)
 
 
+class UdpAudioChannel(asyncio.DatagramProtocol):
+    """
+    UDP音频通道：数据报在事件循环中直接回调，无接收线程与跨线程调度.
+    """
+
+    def __init__(self, on_packet, on_lost=None):
+        self._on_packet = on_packet
+        self._on_lost = on_lost
+        self.packets_received = 0
+
+    def datagram_received(self, data: bytes, addr):
+        self.packets_received += 1
+        self._on_packet(data)
+
+    def error_received(self, exc: Exception):
+        # ICMP不可达等错误，不影响后续收发
+        logger.warning(f"UDP通道错误: {exc}")
+
+    def connection_lost(self, exc: Optional[Exception]):
+        if exc is not None:
+            logger.warning(f"UDP通道异常关闭: {exc}")
+        if self._on_lost:
+            self._on_lost(self)
+
+
 class MqttProtocol(Protocol):
     def __init__(self, loop):
         super().__init__()
         self.loop = loop
         self.config = ConfigManager.get_instance()
         self.mqtt_client = None
-        self.udp_socket = None
-        self.udp_thread = None
-        self.udp_running = False
+        self.udp_transport = None
+        self._udp_channel = None
         self.connected = False
 
         # 连接状态监控
@@ -51,6 +74,8 @@ class MqttProtocol(Protocol):
         self.udp_port = 0
         self.aes_key = None
         self.aes_nonce = None
+        # 会话级AES-CTR上下文（密钥、nonce前缀与发送缓冲预先构造）
+        self._udp_crypto = None
         self.local_sequence = 0
         self.remote_sequence = 0
 
@@ -227,7 +252,7 @@ class MqttProtocol(Protocol):
                         lambda: self._on_connection_state_changed(False, reason)
                     )
 
-                # 停止UDP接收线程
+                # 关闭UDP通道
                 self._stop_udp_receiver()
 
                 # 只有在异常断开且启用自动重连时才尝试重连
@@ -320,7 +345,7 @@ class MqttProtocol(Protocol):
             }
 
             # 发送消息并等待响应
-            if not await self.send_text(json.dumps(hello_message)):
+            if not await self.send_text(json_codec.dumps(hello_message)):
                 logger.error("发送hello消息失败")
                 return False
 
@@ -332,23 +357,9 @@ class MqttProtocol(Protocol):
                     await self._on_network_error("等待响应超时")
                 return False
 
-            # 创建UDP套接字
+            # 创建UDP通道（事件循环上的数据报传输）
             try:
-                if self.udp_socket:
-                    self.udp_socket.close()
-
-                self.udp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-                self.udp_socket.settimeout(0.5)
-
-                # 启动UDP接收线程
-                if self.udp_thread and self.udp_thread.is_alive():
-                    self.udp_running = False
-                    self.udp_thread.join(1.0)
-
-                self.udp_running = True
-                self.udp_thread = threading.Thread(target=self._udp_receive_thread)
-                self.udp_thread.daemon = True
-                self.udp_thread.start()
+                await self._open_udp_channel()
 
                 self.connected = True
                 self._reconnect_attempts = 0  # 重置重连计数
@@ -375,7 +386,7 @@ class MqttProtocol(Protocol):
         处理MQTT消息.
         """
         try:
-            data = json.loads(payload)
+            data = json_codec.loads(payload)
             msg_type = data.get("type")
 
             if msg_type == "goodbye":
@@ -407,6 +418,7 @@ class MqttProtocol(Protocol):
                 self.udp_port = udp.get("port")
                 self.aes_key = udp.get("key")
                 self.aes_nonce = udp.get("nonce")
+                self._udp_crypto = UdpAudioCrypto(self.aes_key, self.aes_nonce)
 
                 # 重置序列号
                 self.local_sequence = 0
@@ -438,76 +450,56 @@ class MqttProtocol(Protocol):
                             self._on_incoming_json(json_data)
 
                     self.loop.call_soon_threadsafe(process_json)
-        except json.JSONDecodeError:
+        except json_codec.JSONDecodeError:
             logger.error(f"无效的JSON数据: {payload}")
         except Exception as e:
             logger.error(f"处理MQTT消息时出错: {e}")
 
-    def _udp_receive_thread(self):
-        """UDP接收线程.
-
-        参考 audio_player.py 的实现方式
+    async def _open_udp_channel(self):
         """
-        logger.info(
-            f"UDP接收线程已启动，监听来自 {self.udp_server}:{self.udp_port} 的数据"
-        )
-
-        self.udp_running = True
-        debug_counter = 0
-
-        while self.udp_running:
-            try:
-                data, addr = self.udp_socket.recvfrom(4096)
-                debug_counter += 1
-
-                try:
-                    # 验证数据包
-                    if len(data) < 16:  # 至少需要16字节的nonce
-                        logger.error(f"无效的音频数据包大小: {len(data)}")
-                        continue
-
-                    # 分离nonce和加密数据
-                    received_nonce = data[:16]
-                    encrypted_audio = data[16:]
-
-                    # 使用AES-CTR解密
-                    decrypted = self.aes_ctr_decrypt(
-                        bytes.fromhex(self.aes_key), received_nonce, encrypted_audio
-                    )
-
-                    # 调试信息
-                    if debug_counter % 100 == 0:
-                        logger.debug(
-                            f"已解密音频数据包 #{debug_counter}, 大小: {len(decrypted)} 字节"
-                        )
-
-                    # 处理解密后的音频数据
-                    if self._on_incoming_audio:
+        在事件循环上创建连接到音频服务器的UDP数据报通道.
+        """
+        self._stop_udp_receiver()
 
-                        def process_audio(audio_data=decrypted):
-                            if asyncio.iscoroutinefunction(self._on_incoming_audio):
-                                coro = self._on_incoming_audio(audio_data)
-                                if coro is not None:
-                                    asyncio.create_task(coro)
-                            else:
-                                self._on_incoming_audio(audio_data)
+        transport, channel = await self.loop.create_datagram_endpoint(
+            lambda: UdpAudioChannel(self._on_udp_packet, self._on_udp_channel_lost),
+            remote_addr=(self.udp_server, self.udp_port),
+        )
+        self.udp_transport = transport
+        self._udp_channel = channel
+        logger.info(f"UDP音频通道已建立: {self.udp_server}:{self.udp_port}")
 
-                        self.loop.call_soon_threadsafe(process_audio)
+    def _on_udp_channel_lost(self, channel: UdpAudioChannel):
+        if channel is self._udp_channel:
+            self.udp_transport = None
+            self._udp_channel = None
 
-                except Exception as e:
-                    logger.error(f"处理音频数据包错误: {e}")
-                    continue
+    def _on_udp_packet(self, data: bytes):
+        """
+        事件循环中处理一个UDP音频包：解密后直接交给音频回调.
+        """
+        if len(data) < UdpAudioCrypto.NONCE_SIZE:
+            logger.error(f"无效的音频数据包大小: {len(data)}")
+            return
 
-            except socket.timeout:
-                # 超时是正常的，继续循环
-                pass
-            except Exception as e:
-                logger.error(f"UDP接收线程错误: {e}")
-                if not self.udp_running:
-                    break
-                time.sleep(0.1)  # 避免在错误情况下过度消耗CPU
+        crypto = self._udp_crypto
+        callback = self._on_incoming_audio
+        if crypto is None or callback is None:
+            return
 
-        logger.info("UDP接收线程已停止")
+        try:
+            # nonce 第12-16字节为服务端逐包递增的序列号（大端），供抖动缓冲检测丢包
+            (sequence,) = struct.unpack_from(">I", data, 12)
+            self.remote_sequence = sequence
+
+            # 使用AES-CTR解密（nonce为包头16字节）
+            decrypted = crypto.decrypt_packet(data)
+            if asyncio.iscoroutinefunction(callback):
+                asyncio.create_task(callback(decrypted, sequence))
+            else:
+                callback(decrypted, sequence)
+        except Exception as e:
+            logger.error(f"处理音频数据包错误: {e}")
 
     async def send_text(self, message):
         """
@@ -532,30 +524,20 @@ class MqttProtocol(Protocol):
 
         参考 audio_sender.py 的实现方式
         """
-        if not self.udp_socket or not self.udp_server or not self.udp_port:
+        crypto = self._udp_crypto
+        transport = self.udp_transport
+        if transport is None or crypto is None:
             logger.error("UDP通道未初始化")
             return False
 
         try:
-            # 生成新的nonce (类似于 audio_sender.py 中的实现)
-            # 格式: 0x01 (1字节) + 0x00 (3字节) + 长度 (2字节) + 原始nonce (8字节) + 序列号 (8字节)
+            # nonce: 会话前缀 (2字节) + 长度 (2字节) + 原始nonce (8字节) + 序列号 (4字节)
             self.local_sequence = (self.local_sequence + 1) & 0xFFFFFFFF
-            new_nonce = (
-                self.aes_nonce[:4]  # 固定前缀
-                + format(len(audio_data), "04x")  # 数据长度
-                + self.aes_nonce[8:24]  # 原始nonce
-                + format(self.local_sequence, "08x")  # 序列号
-            )
-
-            encrypt_encoded_data = self.aes_ctr_encrypt(
-                bytes.fromhex(self.aes_key), bytes.fromhex(new_nonce), bytes(audio_data)
-            )
-
-            # 拼接nonce和密文
-            packet = bytes.fromhex(new_nonce) + encrypt_encoded_data
 
-            # 发送数据包
-            self.udp_socket.sendto(packet, (self.udp_server, self.udp_port))
+            # 在复用缓冲中组装 nonce+密文，直接以 memoryview 发送
+            # （传输层需要排队时会自行拷贝）
+            packet = crypto.encrypt_packet(audio_data, self.local_sequence)
+            transport.sendto(packet)
 
             # 每发送10个包打印一次日志
             if self.local_sequence % 10 == 0:
@@ -590,7 +572,7 @@ class MqttProtocol(Protocol):
             # 如果有会话ID，发送goodbye消息
             if self.session_id:
                 goodbye_msg = {"type": "goodbye", "session_id": self.session_id}
-                await self.send_text(json.dumps(goodbye_msg))
+                await self.send_text(json_codec.dumps(goodbye_msg))
 
             # 处理goodbye
             await self._handle_goodbye()
@@ -615,59 +597,17 @@ class MqttProtocol(Protocol):
         if not self.mqtt_client or not self.mqtt_client.is_connected():
             return False
 
-        # 检查UDP连接状态
-        return self.udp_socket is not None and self.udp_running
-
-    def aes_ctr_encrypt(self, key, nonce, plaintext):
-        """AES-CTR模式加密函数
-        Args:
-            key: bytes格式的加密密钥
-            nonce: bytes格式的初始向量
-            plaintext: 待加密的原始数据
-        Returns:
-            bytes格式的加密数据
-        """
-        cipher = Cipher(
-            algorithms.AES(key), modes.CTR(nonce), backend=default_backend()
-        )
-        encryptor = cipher.encryptor()
-        return encryptor.update(plaintext) + encryptor.finalize()
-
-    def aes_ctr_decrypt(self, key, nonce, ciphertext):
-        """AES-CTR模式解密函数
-        Args:
-            key: bytes格式的解密密钥
-            nonce: bytes格式的初始向量（需要与加密时使用的相同）
-            ciphertext: bytes格式的加密数据
-        Returns:
-            bytes格式的解密后的原始数据
-        """
-        cipher = Cipher(
-            algorithms.AES(key), modes.CTR(nonce), backend=default_backend()
-        )
-        decryptor = cipher.decryptor()
-        plaintext = decryptor.update(ciphertext) + decryptor.finalize()
-        return plaintext
+        # 检查UDP通道状态
+        transport = self.udp_transport
+        return transport is not None and not transport.is_closing()
 
     async def _handle_goodbye(self):
         """
         处理goodbye消息.
         """
         try:
-            # 停止UDP接收线程
-            if self.udp_thread and self.udp_thread.is_alive():
-                self.udp_running = False
-                self.udp_thread.join(1.0)
-                self.udp_thread = None
-            logger.info("UDP接收线程已停止")
-
-            # 关闭UDP套接字
-            if self.udp_socket:
-                try:
-                    self.udp_socket.close()
-                except Exception as e:
-                    logger.error(f"关闭UDP套接字失败: {e}")
-                self.udp_socket = None
+            # 关闭UDP通道
+            self._stop_udp_receiver()
 
             # 停止MQTT客户端
             if self.mqtt_client:
@@ -688,6 +628,7 @@ class MqttProtocol(Protocol):
             self.udp_port = 0
             self.aes_key = None
             self.aes_nonce = None
+            self._udp_crypto = None
 
             # 调用音频通道关闭回调
             if self._on_audio_channel_closed:
@@ -697,33 +638,35 @@ class MqttProtocol(Protocol):
             logger.error(f"处理goodbye消息时出错: {e}")
 
     def _stop_udp_receiver(self):
+        """关闭UDP通道（立即生效，无需等待线程退出）.
+
+        可在MQTT网络线程中调用，此时切回事件循环关闭传输.
         """
-        停止UDP接收线程和关闭UDP套接字.
-        """
-        # 关闭UDP接收线程
-        if (
-            hasattr(self, "udp_thread")
-            and self.udp_thread
-            and self.udp_thread.is_alive()
-        ):
-            self.udp_running = False
-            try:
-                self.udp_thread.join(1.0)
-            except RuntimeError:
-                pass  # 处理线程已经终止的情况
+        transport = getattr(self, "udp_transport", None)
+        if transport is None:
+            return
+        self.udp_transport = None
+        self._udp_channel = None
 
-        # 关闭UDP套接字
-        if hasattr(self, "udp_socket") and self.udp_socket:
-            try:
-                self.udp_socket.close()
-            except Exception as e:
-                logger.error(f"关闭UDP套接字失败: {e}")
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+
+        try:
+            if running_loop is self.loop or self.loop.is_closed():
+                transport.close()
+            else:
+                self.loop.call_soon_threadsafe(transport.close)
+            logger.info("UDP音频通道已关闭")
+        except Exception as e:
+            logger.error(f"关闭UDP通道失败: {e}")
 
     def __del__(self):
         """
         析构函数，清理资源.
         """
-        # 停止UDP接收相关资源
+        # 关闭UDP通道
         self._stop_udp_receiver()
 
         # 关闭MQTT客户端
@@ -920,7 +863,7 @@ class MqttProtocol(Protocol):
             except asyncio.CancelledError:
                 pass
 
-        # 停止UDP接收线程
+        # 关闭UDP通道
         self._stop_udp_receiver()
 
         # 停止MQTT客户端
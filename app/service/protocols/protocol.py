@@ -1,10 +1,82 @@
-import json
+from typing import Optional
 
+from app.common import json_codec
 from app.common.constants import AbortReason, ListeningMode
+from app.common.json_codec import MessageTemplate
 from app.common.logging_config import get_logger
 
 logger = get_logger(__name__)
 
+# 固定形状的控制消息：预序列化，发送时只替换会话ID等字段
+_SESSION = "{{session_id}}"
+ABORT_TEMPLATE = MessageTemplate({"session_id": _SESSION, "type": "abort"})
+ABORT_WAKE_WORD_TEMPLATE = MessageTemplate(
+    {"session_id": _SESSION, "type": "abort", "reason": "wake_word_detected"}
+)
+WAKE_WORD_TEMPLATE = MessageTemplate(
+    {
+        "session_id": _SESSION,
+        "type": "listen",
+        "state": "detect",
+        "text": "{{text}}",
+    }
+)
+LISTEN_START_TEMPLATES = {
+    mode: MessageTemplate(
+        {
+            "session_id": _SESSION,
+            "type": "listen",
+            "state": "start",
+            "mode": mode_name,
+        }
+    )
+    for mode, mode_name in (
+        (ListeningMode.REALTIME, "realtime"),
+        (ListeningMode.AUTO_STOP, "auto"),
+        (ListeningMode.MANUAL, "manual"),
+    )
+}
+LISTEN_STOP_TEMPLATE = MessageTemplate(
+    {"session_id": _SESSION, "type": "listen", "state": "stop"}
+)
+IOT_DESCRIPTOR_TEMPLATE = MessageTemplate(
+    {
+        "session_id": _SESSION,
+        "type": "iot",
+        "update": True,
+        "descriptors": ["{{descriptor}}"],
+    }
+)
+IOT_STATES_TEMPLATE = MessageTemplate(
+    {"session_id": _SESSION, "type": "iot", "update": True, "states": "{{states}}"}
+)
+MCP_TEMPLATE = MessageTemplate(
+    {"session_id": _SESSION, "type": "mcp", "payload": "{{payload}}"}
+)
+
+
+def _json_fragment(value, expected_type: type, name: str) -> Optional[str]:
+    """转为可嵌入消息模板的 JSON 片段.
+
+    RawJSON 原样使用；其他字符串/字节解码一次并校验类型，Python 对象直接序列化。
+    非法时记录错误并返回None（丢弃该消息），不向服务器发送残缺帧。
+    """
+    if isinstance(value, json_codec.RawJSON):
+        return value
+    if isinstance(value, (str, bytes, bytearray)):
+        try:
+            value = json_codec.loads(value)
+        except json_codec.JSONDecodeError as e:
+            logger.error(f"{name}不是合法的JSON，已丢弃: {e}")
+            return None
+    if not isinstance(value, expected_type):
+        logger.error(
+            f"{name}应为JSON{'对象' if expected_type is dict else '数组'}，"
+            f"实际为 {type(value).__name__}，已丢弃"
+        )
+        return None
+    return json_codec.dumps(value)
+
 
 class Protocol:
     def __init__(self):
@@ -26,8 +98,12 @@ class Protocol:
         self._on_incoming_json = callback
 
     def on_incoming_audio(self, callback):
-        """
-        设置音频数据接收回调函数.
+        """设置音频数据接收回调函数.
+
+        Args:
+            callback: 回调函数，接收参数 (data: bytes, sequence: Optional[int])；
+                sequence 为传输层序列号（MQTT/UDP 包头携带），
+                WebSocket 等无序列号的传输传 None，由抖动缓冲按到达顺序编号
         """
         self._on_incoming_audio = callback
 
@@ -95,50 +171,40 @@ class Protocol:
         """
         raise NotImplementedError("close_audio_channel方法必须由子类实现")
 
+    def _session_fragment(self) -> str:
+        return json_codec.dumps(self.session_id)
+
     async def send_abort_speaking(self, reason):
         """
         发送中止语音的消息.
         """
-        message = {"session_id": self.session_id, "type": "abort"}
         if reason == AbortReason.WAKE_WORD_DETECTED:
-            message["reason"] = "wake_word_detected"
-        await self.send_text(json.dumps(message))
+            template = ABORT_WAKE_WORD_TEMPLATE
+        else:
+            template = ABORT_TEMPLATE
+        await self.send_text(template.render(session_id=self.session_id))
 
     async def send_wake_word_detected(self, wake_word):
         """
         发送检测到唤醒词的消息.
         """
-        message = {
-            "session_id": self.session_id,
-            "type": "listen",
-            "state": "detect",
-            "text": wake_word,
-        }
-        await self.send_text(json.dumps(message))
+        await self.send_text(
+            WAKE_WORD_TEMPLATE.render(session_id=self.session_id, text=wake_word)
+        )
 
     async def send_start_listening(self, mode):
         """
         发送开始监听的消息.
         """
-        mode_map = {
-            ListeningMode.REALTIME: "realtime",
-            ListeningMode.AUTO_STOP: "auto",
-            ListeningMode.MANUAL: "manual",
-        }
-        message = {
-            "session_id": self.session_id,
-            "type": "listen",
-            "state": "start",
-            "mode": mode_map[mode],
-        }
-        await self.send_text(json.dumps(message))
+        await self.send_text(
+            LISTEN_START_TEMPLATES[mode].render(session_id=self.session_id)
+        )
 
     async def send_stop_listening(self):
         """
         发送停止监听的消息.
         """
-        message = {"session_id": self.session_id, "type": "listen", "state": "stop"}
-        await self.send_text(json.dumps(message))
+        await self.send_text(LISTEN_STOP_TEMPLATE.render(session_id=self.session_id))
 
     async def send_iot_descriptors(self, descriptors):
         """
@@ -147,7 +213,7 @@ class Protocol:
         try:
             # 解析描述符数据
             if isinstance(descriptors, str):
-                descriptors_data = json.loads(descriptors)
+                descriptors_data = json_codec.loads(descriptors)
             else:
                 descriptors_data = descriptors
 
@@ -156,21 +222,21 @@ class Protocol:
                 logger.error("IoT descriptors should be an array")
                 return
 
+            session = self._session_fragment()
+
             # 为每个描述符发送单独的消息
             for i, descriptor in enumerate(descriptors_data):
                 if descriptor is None:
                     logger.error(f"Failed to get IoT descriptor at index {i}")
                     continue
 
-                message = {
-                    "session_id": self.session_id,
-                    "type": "iot",
-                    "update": True,
-                    "descriptors": [descriptor],
-                }
-
                 try:
-                    await self.send_text(json.dumps(message))
+                    await self.send_text(
+                        IOT_DESCRIPTOR_TEMPLATE.render_raw(
+                            session_id=session,
+                            descriptor=json_codec.dumps(descriptor),
+                        )
+                    )
                 except Exception as e:
                     logger.error(
                         f"Failed to send JSON message for IoT descriptor "
@@ -178,40 +244,34 @@ class Protocol:
                     )
                     continue
 
-        except json.JSONDecodeError as e:
+        except json_codec.JSONDecodeError as e:
             logger.error(f"Failed to parse IoT descriptors: {e}")
             return
 
     async def send_iot_states(self, states):
         """
-        发送物联网设备状态信息.
+        发送物联网设备状态信息（RawJSON 原样嵌入，其他字符串校验后发送）.
         """
-        if isinstance(states, str):
-            states_data = json.loads(states)
-        else:
-            states_data = states
+        states = _json_fragment(states, list, "IoT状态")
+        if states is None:
+            return
 
-        message = {
-            "session_id": self.session_id,
-            "type": "iot",
-            "update": True,
-            "states": states_data,
-        }
-        await self.send_text(json.dumps(message))
+        await self.send_text(
+            IOT_STATES_TEMPLATE.render_raw(
+                session_id=self._session_fragment(), states=states
+            )
+        )
 
     async def send_mcp_message(self, payload):
         """
-        发送MCP消息.
+        发送MCP消息（RawJSON 原样嵌入，不再解码后重新编码；其他字符串校验后发送）.
         """
-        if isinstance(payload, str):
-            payload_data = json.loads(payload)
-        else:
-            payload_data = payload
-
-        message = {
-            "session_id": self.session_id,
-            "type": "mcp",
-            "payload": payload_data,
-        }
+        payload = _json_fragment(payload, dict, "MCP消息")
+        if payload is None:
+            return
 
-        await self.send_text(json.dumps(message))
+        await self.send_text(
+            MCP_TEMPLATE.render_raw(
+                session_id=self._session_fragment(), payload=payload
+            )
+        )
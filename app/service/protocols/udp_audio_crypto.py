@@ -0,0 +1,84 @@
+import struct
+from typing import Union
+
+from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+
+BytesLike = Union[bytes, bytearray, memoryview]
+
+
+class UdpAudioCrypto:
+    """
+    MQTT/UDP 音频包 AES-CTR 加解密（每个会话一个实例）.
+
+    包格式：16字节 nonce + 密文。发送 nonce 由会话 nonce 派生：
+    [0:2] 会话前缀 | [2:4] 负载长度（大端） | [4:12] 会话 nonce 原样 | [12:16] 序列号（大端）
+
+    密钥与 AES 算法对象在会话建立时构造一次；发送包在复用的缓冲区中组装，
+    nonce 用 struct 原地写入，密文由 update_into 直接写到 nonce 之后，
+    除每包必需的 CTR 上下文外不产生中间对象。
+    """
+
+    NONCE_SIZE = 16
+    # update_into 要求输出缓冲比输入多出一个分组减一字节
+    _BLOCK_SLACK = 15
+    _LENGTH = struct.Struct(">H")
+    _SEQUENCE = struct.Struct(">I")
+
+    def __init__(self, key_hex: str, nonce_hex: str, max_payload: int = 1500):
+        """
+        Args:
+            key_hex: 十六进制密钥（服务器 hello 下发）
+            nonce_hex: 十六进制会话 nonce（16字节）
+            max_payload: 预分配的最大负载字节数，超出时自动扩容
+        """
+        nonce = bytes.fromhex(nonce_hex)
+        if len(nonce) != self.NONCE_SIZE:
+            raise ValueError(f"UDP nonce 长度应为16字节: {len(nonce)}")
+
+        self._algorithm = algorithms.AES(bytes.fromhex(key_hex))
+        self._backend = default_backend()
+        self._nonce_template = nonce
+        self._allocate(max_payload)
+
+    def _allocate(self, max_payload: int):
+        self._buffer = bytearray(self.NONCE_SIZE + max_payload + self._BLOCK_SLACK)
+        self._buffer[: self.NONCE_SIZE] = self._nonce_template
+        self._view = memoryview(self._buffer)
+        self._nonce_view = self._view[: self.NONCE_SIZE]
+        self._max_payload = max_payload
+
+    def encrypt_packet(self, payload: BytesLike, sequence: int) -> memoryview:
+        """加密一个音频负载并组装 UDP 包.
+
+        Returns:
+            指向内部缓冲的 memoryview，下一次调用前有效（发送后即可丢弃）
+        """
+        size = len(payload)
+        if size > self._max_payload:
+            self._allocate(size)
+
+        buffer = self._buffer
+        self._LENGTH.pack_into(buffer, 2, size)
+        self._SEQUENCE.pack_into(buffer, 12, sequence & 0xFFFFFFFF)
+
+        encryptor = Cipher(
+            self._algorithm, modes.CTR(self._nonce_view), backend=self._backend
+        ).encryptor()
+        end = self.NONCE_SIZE + size
+        encryptor.update_into(
+            payload, self._view[self.NONCE_SIZE : end + self._BLOCK_SLACK]
+        )
+        return self._view[:end]
+
+    def decrypt_packet(self, packet: BytesLike) -> bytes:
+        """
+        解密收到的 UDP 包（nonce + 密文），返回音频负载.
+        """
+        view = memoryview(packet)
+        decryptor = Cipher(
+            self._algorithm,
+            modes.CTR(view[: self.NONCE_SIZE]),
+            backend=self._backend,
+        ).decryptor()
+        return decryptor.update(view[self.NONCE_SIZE :])
@@ -1,5 +1,4 @@
 import asyncio
-import json
 import ssl
 import time
 
@@ -11,6 +10,7 @@ except ImportError:
 
 import websockets
 
+from app.common import json_codec
 from app.common.constants import AudioConfig
 from app.service.protocols.protocol import Protocol
 from app.common.config_manager import ConfigManager
@@ -129,7 +129,7 @@ class WebsocketProtocol(Protocol):
                     "frame_duration": AudioConfig.FRAME_DURATION,
                 },
             }
-            await self.send_text(json.dumps(hello_message))
+            await self.send_text(json_codec.dumps(hello_message))
 
             # 等待服务器hello响应
             try:
@@ -367,7 +367,7 @@ class WebsocketProtocol(Protocol):
                 try:
                     if isinstance(message, str):
                         try:
-                            data = json.loads(message)
+                            data = json_codec.loads(message)
                             msg_type = data.get("type")
                             if msg_type == "hello":
                                 # 处理服务器 hello 消息
@@ -375,10 +375,10 @@ class WebsocketProtocol(Protocol):
                             else:
                                 if self._on_incoming_json:
                                     self._on_incoming_json(data)
-                        except json.JSONDecodeError as e:
+                        except json_codec.JSONDecodeError as e:
                             logger.error(f"无效的JSON消息: {message}, 错误: {e}")
                     elif isinstance(message, bytes):
-                        # 二进制消息，可能是音频
+                        # 二进制消息，可能是音频；TCP按序可靠送达，不携带序列号（sequence 缺省为 None）
                         if self._on_incoming_audio:
                             self._on_incoming_audio(message)
                 except Exception as e:
@@ -0,0 +1,484 @@
+# coding:utf-8
+"""
+AEC 质量与开销基准.
+
+由近端语音与远端（TTS）WAV 合成回声场景：远端信号经房间冲激响应（合成指数衰减
+或指定 RIR WAV）、回声延迟和增益得到回声，叠加近端语音（双讲/近端单讲窗口）与
+背景噪声作为麦克风信号。逐帧送入 AECProcessor 的各后端（或自定义后端），统计：
+
+- ERLE：远端单讲段回声能量 / 残留回声能量（dB，残留 = 输出 - 近端 - 噪声），
+  分收敛期与稳态
+- 残留回声电平：稳态远端单讲段残留回声电平（dBFS）
+- 双讲失真：双讲段输出相对“近端+噪声”的信号失真比 SDR（dB，越高越好）
+- 近端单讲失真：近端单讲段 SDR（AEC 不应损伤近端语音）
+- CPU：每秒音频的处理耗时（ms/s）与单帧耗时 p99
+
+未提供 WAV 时使用合成的类语音信号。结果输出为表格，并可写入 JSON 便于对比。
+
+后端写法：
+    none                        直通（基线）
+    pbfdaf                      软件AEC（AEC_OPTIONS.BACKEND=pbfdaf）
+    pbfdaf[PBFDAF.FILTER_LENGTH_MS=400,PBFDAF.STEP_SIZE=0.5]
+                                方括号内覆盖 AEC_OPTIONS 配置项（点号表示嵌套）
+    webrtc                      WebRTC APM（仅macOS，参考信号直接写入）
+    package.module:factory      自定义后端，factory(sample_rate) 返回带
+                                process(capture, reference) -> ndarray 的对象
+
+用法（在项目根目录）:
+    python -m benchmarks.aec_quality --near near.wav --far tts.wav \\
+        --backends none pbfdaf "pbfdaf[PBFDAF.FILTER_LENGTH_MS=400]" \\
+        --output bench/aec_quality.json
+"""
+import argparse
+import asyncio
+import importlib
+import json
+import platform
+import re
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+
+@dataclass
+class EchoScene:
+    """
+    回声场景：窗口以场景时长的比例表示.
+    """
+
+    name: str
+    duration_s: float = 12.0
+    delay_ms: float = 60.0
+    rt60_ms: float = 250.0
+    echo_gain_db: float = -6.0
+    noise_dbfs: float = -65.0
+    double_talk: List[Tuple[float, float]] = field(default_factory=list)
+    near_only: List[Tuple[float, float]] = field(default_factory=list)
+    rir_file: Optional[str] = None
+
+
+DEFAULT_SCENES = [
+    EchoScene("echo_only"),
+    EchoScene("long_delay", delay_ms=150.0),
+    EchoScene("reverberant", rt60_ms=600.0),
+    EchoScene(
+        "double_talk", double_talk=[(0.5, 0.7)], near_only=[(0.85, 0.95)]
+    ),
+    EchoScene(
+        "noisy_double_talk",
+        noise_dbfs=-40.0,
+        double_talk=[(0.5, 0.7)],
+        near_only=[(0.85, 0.95)],
+    ),
+]
+
+
+def speech_like(samples: int, seed: int) -> np.ndarray:
+    """
+    类语音合成信号：带限噪声 + 音节级幅度调制 + 停顿（float，峰值约0.5）.
+    """
+    rng = np.random.default_rng(seed)
+    noise = np.convolve(rng.standard_normal(samples), np.ones(4) / 4, mode="same")
+    t = np.arange(samples) / SAMPLE_RATE
+    envelope = np.sin(2 * np.pi * 3.5 * t + rng.uniform(0, np.pi)) ** 2
+    # 约每1.5秒一次短停顿
+    envelope *= (np.sin(2 * np.pi * t / 1.5) > -0.8).astype(np.float64)
+    signal = noise * envelope
+    return 0.5 * signal / (np.abs(signal).max() + 1e-9)
+
+
+def read_wav(path: str) -> np.ndarray:
+    """
+    读取 WAV 第一声道并重采样到16kHz，返回 float（满幅为1）.
+    """
+    import soxr
+
+    from app.service.audio_codecs.audio_backend import WavSource
+
+    source = WavSource(path)
+    data = source.read(len(source._samples))
+    data = np.zeros(0) if data is None else data.astype(np.float64) / 32768.0
+    if len(data) and source.samplerate != SAMPLE_RATE:
+        data = soxr.resample(data, source.samplerate, SAMPLE_RATE)
+    return data
+
+
+def load_wav(path: str, samples: int) -> np.ndarray:
+    """
+    读取 WAV 并循环/截断到指定长度.
+    """
+    data = read_wav(path)
+    if len(data) == 0:
+        return np.zeros(samples)
+    return np.resize(data, samples)
+
+
+def room_impulse_response(scene: EchoScene, seed: int) -> np.ndarray:
+    """
+    回声路径冲激响应：延迟 + 直达声 + 指数衰减混响尾（按RT60）.
+    """
+    delay = int(scene.delay_ms * SAMPLE_RATE / 1000)
+    if scene.rir_file:
+        rir = read_wav(scene.rir_file)
+        rir /= np.abs(rir).max() + 1e-9
+    else:
+        rng = np.random.default_rng(seed)
+        length = max(1, int(scene.rt60_ms * SAMPLE_RATE / 1000))
+        t = np.arange(length) / SAMPLE_RATE
+        decay = np.exp(-6.91 * t / (scene.rt60_ms / 1000))
+        rir = rng.standard_normal(length) * decay * 0.3
+        rir[0] = 1.0
+    return np.concatenate([np.zeros(delay), rir])
+
+
+def _window_mask(samples: int, windows) -> np.ndarray:
+    mask = np.zeros(samples, dtype=bool)
+    for start, end in windows:
+        mask[int(start * samples) : int(end * samples)] = True
+    return mask
+
+
+def build_scene(
+    scene: EchoScene, near_file: Optional[str], far_file: Optional[str], seed: int
+) -> Dict[str, np.ndarray]:
+    """
+    合成场景信号（float，满幅为1）与各段掩码.
+    """
+    samples = int(scene.duration_s * SAMPLE_RATE)
+    far = load_wav(far_file, samples) if far_file else speech_like(samples, seed)
+    near = load_wav(near_file, samples) if near_file else speech_like(samples, seed + 1)
+
+    near_only = _window_mask(samples, scene.near_only)
+    near_active = _window_mask(samples, scene.double_talk) | near_only
+    far = np.where(near_only, 0.0, far)
+    near = np.where(near_active, near, 0.0)
+
+    rir = room_impulse_response(scene, seed)
+    echo = np.convolve(far, rir)[:samples]
+    far_rms = np.sqrt(np.mean(far**2)) + 1e-12
+    echo_rms = np.sqrt(np.mean(echo**2)) + 1e-12
+    echo *= far_rms * 10 ** (scene.echo_gain_db / 20) / echo_rms
+
+    rng = np.random.default_rng(seed + 2)
+    noise = rng.standard_normal(samples) * 10 ** (scene.noise_dbfs / 20)
+
+    return {
+        "far": far,
+        "near": near,
+        "echo": echo,
+        "noise": noise,
+        "capture": echo + near + noise,
+        "far_only": ~near_active,
+        "double_talk": near_active & ~near_only,
+        "near_only": near_only,
+    }
+
+
+def to_int16(signal: np.ndarray) -> np.ndarray:
+    return (np.clip(signal, -1.0, 32767 / 32768) * 32768).astype(np.int16)
+
+
+class PassthroughBackend:
+    """
+    不做回声消除的基线.
+    """
+
+    def process(self, capture: np.ndarray, reference: np.ndarray) -> np.ndarray:
+        return capture
+
+
+class ProcessorBackend:
+    """
+    通过 AECProcessor 运行指定后端（参考信号直接送入，不打开任何设备）.
+    """
+
+    def __init__(self, backend: str, options: Dict[str, Any]):
+        from app.service.audio_codecs.aec_processor import AECProcessor
+
+        self.processor = AECProcessor(backend=backend, options=options)
+
+    async def open(self):
+        processor = self.processor
+        if processor.backend == "webrtc":
+            # 仅初始化APM，参考信号由基准写入，不打开 BlackHole
+            await processor._initialize_apm()
+            processor._is_initialized = True
+        else:
+            await processor.initialize()
+        if not processor.needs_processing:
+            raise RuntimeError(f"后端 {processor.backend} 在当前平台不做处理")
+
+    def process(self, capture: np.ndarray, reference: np.ndarray) -> np.ndarray:
+        processor = self.processor
+        if processor.uses_render_reference:
+            processor.push_render(reference, SAMPLE_RATE)
+        else:
+            processor._reference_buffer.write(reference)
+        return processor.process_audio(capture)
+
+    def status(self) -> Dict[str, Any]:
+        return self.processor.get_status()
+
+    async def close(self):
+        await self.processor.close()
+
+
+def _parse_value(text: str):
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+def parse_backend_spec(spec: str) -> Tuple[str, Dict[str, Any]]:
+    """
+    解析 "name[KEY=VALUE,...]" 形式的后端描述，点号键展开为嵌套字典.
+    """
+    match = re.fullmatch(r"([^\[\]]+)(?:\[(.*)\])?", spec.strip())
+    if not match:
+        raise ValueError(f"无法解析后端描述: {spec}")
+    name, overrides = match.group(1), match.group(2)
+    options: Dict[str, Any] = {}
+    for item in filter(None, (overrides or "").split(",")):
+        key, _, value = item.partition("=")
+        target = options
+        *parents, leaf = key.strip().split(".")
+        for parent in parents:
+            target = target.setdefault(parent, {})
+        target[leaf] = _parse_value(value.strip())
+    return name, options
+
+
+def _merge_nested(options: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    嵌套覆盖项与当前配置合并（AECProcessor 只做浅层覆盖）.
+    """
+    from app.common.config_manager import ConfigManager
+
+    base = ConfigManager.get_instance().get_config("AEC_OPTIONS", {}) or {}
+    merged = {}
+    for key, value in options.items():
+        if isinstance(value, dict) and isinstance(base.get(key), dict):
+            merged[key] = {**base[key], **value}
+        else:
+            merged[key] = value
+    return merged
+
+
+async def create_backend(spec: str):
+    name, options = parse_backend_spec(spec)
+    if name == "none":
+        return PassthroughBackend()
+    if ":" in name:
+        module_name, attr = name.split(":", 1)
+        factory = getattr(importlib.import_module(module_name), attr)
+        return factory(SAMPLE_RATE, **options)
+
+    backend = ProcessorBackend(name, _merge_nested(options))
+    await backend.open()
+    return backend
+
+
+def _ratio_db(numerator: float, denominator: float) -> Optional[float]:
+    if numerator <= 0 or denominator <= 0:
+        return None
+    return round(10 * np.log10(numerator / denominator), 2)
+
+
+def score(
+    signals: Dict[str, np.ndarray], output: np.ndarray, warmup_s: float
+) -> Dict[str, Any]:
+    """
+    计算 ERLE、残留回声、双讲与近端单讲失真.
+    """
+    warmup = np.arange(len(output)) < int(warmup_s * SAMPLE_RATE)
+    far_only = signals["far_only"]
+    echo = signals["echo"]
+    target = signals["near"] + signals["noise"]
+
+    def energy(signal, mask):
+        return float(np.sum(signal[mask] ** 2))
+
+    # 残留回声 = 输出 - （近端 + 噪声），避免噪声底限制 ERLE
+    residual_echo = output - target
+    steady = far_only & ~warmup
+    steady_samples = int(np.count_nonzero(steady))
+    residual = energy(residual_echo, steady) / steady_samples if steady_samples else 0.0
+
+    double_talk = signals["double_talk"]
+    near_only = signals["near_only"]
+    return {
+        "erle_db": _ratio_db(energy(echo, steady), energy(residual_echo, steady)),
+        "erle_warmup_db": _ratio_db(
+            energy(echo, far_only & warmup), energy(residual_echo, far_only & warmup)
+        ),
+        "residual_echo_dbfs": round(10 * np.log10(residual), 2) if residual > 0 else None,
+        "double_talk_sdr_db": _ratio_db(
+            energy(target, double_talk), energy(output - target, double_talk)
+        ),
+        "near_only_sdr_db": _ratio_db(
+            energy(target, near_only), energy(output - target, near_only)
+        ),
+    }
+
+
+async def run_scene(
+    scene: EchoScene, spec: str, args, signals: Dict[str, np.ndarray]
+) -> Dict[str, Any]:
+    frame = SAMPLE_RATE * args.frame_duration // 1000
+    capture = to_int16(signals["capture"])
+    reference = to_int16(signals["far"])
+    frames = len(capture) // frame
+    output = np.zeros(frames * frame, dtype=np.int16)
+
+    backend = await create_backend(spec)
+    durations = np.zeros(frames)
+    try:
+        for i in range(frames):
+            start, end = i * frame, (i + 1) * frame
+            began = time.perf_counter()
+            processed = backend.process(capture[start:end], reference[start:end])
+            durations[i] = time.perf_counter() - began
+            # 部分后端返回内部缓冲视图，立即拷贝
+            output[start:end] = processed
+        status = backend.status() if hasattr(backend, "status") else {}
+    finally:
+        if hasattr(backend, "close"):
+            await backend.close()
+
+    trimmed = {key: value[: len(output)] for key, value in signals.items()}
+    audio_seconds = len(output) / SAMPLE_RATE
+    result = {
+        "scene": scene.name,
+        "backend": spec,
+        **score(trimmed, output.astype(np.float64) / 32768.0, args.warmup),
+        "cpu_ms_per_s": round(float(durations.sum()) * 1000 / audio_seconds, 3),
+        "frame_p99_ms": round(float(np.percentile(durations, 99)) * 1000, 4),
+        "status": {
+            key: value
+            for key, value in status.items()
+            if isinstance(value, (int, float, str, bool)) or value is None
+        },
+    }
+    return result
+
+
+TABLE_COLUMNS = (
+    ("scene", 18),
+    ("backend", 28),
+    ("erle_db", 9),
+    ("erle_warmup_db", 15),
+    ("residual_echo_dbfs", 19),
+    ("double_talk_sdr_db", 19),
+    ("near_only_sdr_db", 17),
+    ("cpu_ms_per_s", 13),
+    ("frame_p99_ms", 13),
+)
+
+
+def format_table(results: List[Dict[str, Any]]) -> str:
+    def cell(value, width):
+        text = "-" if value is None else str(value)
+        return text[:width].ljust(width)
+
+    lines = [" ".join(cell(name, width) for name, width in TABLE_COLUMNS)]
+    lines.append(" ".join("-" * width for _, width in TABLE_COLUMNS))
+    for result in results:
+        lines.append(
+            " ".join(cell(result.get(name), width) for name, width in TABLE_COLUMNS)
+        )
+    return "\n".join(lines)
+
+
+def load_scenes(path: Optional[str]) -> List[EchoScene]:
+    if not path:
+        return list(DEFAULT_SCENES)
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    scenes = []
+    for item in data:
+        item = dict(item)
+        for key in ("double_talk", "near_only"):
+            item[key] = [tuple(window) for window in item.get(key, [])]
+        scenes.append(EchoScene(**item))
+    return scenes
+
+
+async def run_benchmarks(args) -> Dict[str, Any]:
+    scenes = load_scenes(args.scenes)
+    if args.only:
+        scenes = [scene for scene in scenes if scene.name in args.only]
+
+    results = []
+    for index, scene in enumerate(scenes):
+        signals = build_scene(scene, args.near, args.far, args.seed + index * 10)
+        for spec in args.backends:
+            try:
+                result = await run_scene(scene, spec, args, signals)
+            except Exception as e:
+                print(f"[{scene.name}] 后端 {spec} 运行失败: {e}", file=sys.stderr)
+                continue
+            results.append(result)
+
+    return {
+        "benchmark": "aec_quality",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "numpy": np.__version__,
+        "sample_rate": SAMPLE_RATE,
+        "frame_duration_ms": args.frame_duration,
+        "warmup_s": args.warmup,
+        "near_file": args.near,
+        "far_file": args.far,
+        "scenes": [asdict(scene) for scene in scenes],
+        "results": results,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="AEC 质量与开销基准")
+    parser.add_argument("--near", type=str, default=None, help="近端语音 WAV")
+    parser.add_argument("--far", type=str, default=None, help="远端（TTS）WAV")
+    parser.add_argument(
+        "--backends",
+        nargs="+",
+        default=["none", "pbfdaf"],
+        help="待比较的后端描述（见模块说明）",
+    )
+    parser.add_argument(
+        "--scenes", type=str, default=None, help="场景 JSON 文件（EchoScene 字段列表）"
+    )
+    parser.add_argument("--only", nargs="+", default=None, help="只运行指定名称的场景")
+    parser.add_argument(
+        "--frame-duration", type=int, default=20, help="处理帧长（毫秒，10的倍数）"
+    )
+    parser.add_argument(
+        "--warmup", type=float, default=3.0, help="收敛期（秒），不计入稳态指标"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="合成信号随机种子")
+    parser.add_argument("--output", type=str, default=None, help="JSON 结果文件路径")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    report = asyncio.run(run_benchmarks(args))
+    print(format_table(report["results"]))
+
+    if args.output:
+        output = Path(args.output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(
+            json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8"
+        )
+        print(f"结果已写入: {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,330 @@
+# coding:utf-8
+"""
+音频管线微基准.
+
+以配置的帧长（20/60ms）和多种设备采样率（16/24/44.1/48kHz）驱动 AudioCodec 的
+实时入口：录音回调、编码线程处理、write_audio、播放回调（直通/重采样）以及
+AECProcessor.process_audio，输出每次调用耗时的 p50/p99/max、tracemalloc 统计的
+单次调用内存分配以及各级缓冲的丢帧计数，结果写入 JSON 便于版本间对比。
+
+用法（在项目根目录）:
+    python -m benchmarks.audio_pipeline --frames 500 --output bench/audio_pipeline.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+# 基准不打开真实声卡
+os.environ.setdefault("XIAOZHI_AUDIO_BACKEND", "null")
+
+from app.common.constants import AudioConfig  # noqa: E402
+
+DEFAULT_FRAME_DURATIONS = (20, 60)
+DEFAULT_DEVICE_RATES = (16000, 24000, 44100, 48000)
+
+
+class _TimeInfo:
+    __slots__ = ("currentTime", "inputBufferAdcTime", "outputBufferDacTime")
+
+    def __init__(self):
+        self.currentTime = 0.0
+        self.inputBufferAdcTime = 0.0
+        self.outputBufferDacTime = 0.0
+
+
+def configure_frame_duration(frame_duration: int):
+    """
+    按帧长重算 AudioConfig 的帧大小（AudioCodec 在运行时读取这些值）.
+    """
+    AudioConfig.FRAME_DURATION = frame_duration
+    AudioConfig.INPUT_FRAME_SIZE = AudioConfig.INPUT_SAMPLE_RATE * frame_duration // 1000
+    AudioConfig.OUTPUT_FRAME_SIZE = (
+        AudioConfig.OUTPUT_SAMPLE_RATE * frame_duration // 1000
+    )
+
+
+def synthetic_pcm(sample_rate: int, samples: int, seed: int = 0) -> np.ndarray:
+    """
+    语音频段的多音+噪声合成信号（int16）.
+    """
+    rng = np.random.default_rng(seed)
+    t = np.arange(samples) / sample_rate
+    signal = (
+        0.3 * np.sin(2 * np.pi * 220 * t)
+        + 0.2 * np.sin(2 * np.pi * 770 * t)
+        + 0.05 * rng.standard_normal(samples)
+    )
+    return (np.clip(signal, -1, 1) * 20000).astype(np.int16)
+
+
+def summarize(durations_ms: List[float]) -> Dict[str, float]:
+    values = np.asarray(durations_ms, dtype=np.float64)
+    if not len(values):
+        return {"calls": 0}
+    return {
+        "calls": int(len(values)),
+        "p50_ms": round(float(np.percentile(values, 50)), 4),
+        "p99_ms": round(float(np.percentile(values, 99)), 4),
+        "max_ms": round(float(values.max()), 4),
+        "mean_ms": round(float(values.mean()), 4),
+    }
+
+
+class EntryRecorder:
+    """
+    记录一个入口的调用耗时与内存分配.
+    """
+
+    def __init__(self, trace_alloc: bool):
+        self.trace_alloc = trace_alloc
+        self.durations_ms: List[float] = []
+        self.peak_bytes: List[int] = []
+        self.retained_bytes = 0
+
+    def call(self, func: Callable, *args):
+        if self.trace_alloc:
+            current_before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+
+        start = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - start
+
+        if self.trace_alloc:
+            current_after, peak = tracemalloc.get_traced_memory()
+            self.peak_bytes.append(peak - current_before)
+            self.retained_bytes += current_after - current_before
+
+        self.durations_ms.append(elapsed * 1000)
+        return result
+
+    def report(self) -> Dict[str, Any]:
+        report = summarize(self.durations_ms)
+        if self.trace_alloc and self.peak_bytes:
+            peaks = np.asarray(self.peak_bytes)
+            report.update(
+                {
+                    "alloc_peak_bytes_p50": int(np.percentile(peaks, 50)),
+                    "alloc_peak_bytes_max": int(peaks.max()),
+                    "retained_bytes_per_call": round(
+                        self.retained_bytes / len(self.peak_bytes), 1
+                    ),
+                }
+            )
+        return report
+
+
+async def run_scenario(
+    frame_duration: int, device_rate: int, frames: int, trace_alloc: bool
+) -> Dict[str, Any]:
+    """
+    运行单个场景（帧长 x 设备采样率）.
+    """
+    import opuslib
+
+    from app.service.audio_codecs.aec_processor import AECProcessor
+    from app.service.audio_codecs.audio_codec import AudioCodec
+    from app.service.audio_codecs.encoder_worker import AudioEncoderWorker
+
+    configure_frame_duration(frame_duration)
+
+    codec = AudioCodec()
+    codec.device_input_sample_rate = device_rate
+    codec.device_output_sample_rate = device_rate
+    codec._device_input_frame_size = device_rate * frame_duration // 1000
+    await codec._create_resamplers()
+
+    # 编码线程不启动，由基准在当前线程同步驱动，单独计时
+    worker = AudioEncoderWorker(
+        codec._device_input_frame_size,
+        AudioConfig.INPUT_FRAME_SIZE,
+        codec._preprocess_input,
+    )
+    codec._encoder_worker = worker
+    codec.opus_encoder = codec._create_opus_encoder(codec.get_encoder_profile())
+    worker.set_encoder(codec.opus_encoder, codec.get_encoder_profile())
+    encoded_packets = []
+    worker.set_callback(encoded_packets.append)
+    codec.opus_decoder = opuslib.Decoder(
+        AudioConfig.OUTPUT_SAMPLE_RATE, AudioConfig.CHANNELS
+    )
+
+    # 下行：预先编码合成的服务端音频
+    downlink_encoder = opuslib.Encoder(
+        AudioConfig.OUTPUT_SAMPLE_RATE, AudioConfig.CHANNELS, opuslib.APPLICATION_AUDIO
+    )
+    downlink_pcm = synthetic_pcm(
+        AudioConfig.OUTPUT_SAMPLE_RATE, AudioConfig.OUTPUT_FRAME_SIZE * frames, seed=1
+    )
+    packets = [
+        downlink_encoder.encode(
+            downlink_pcm[i : i + AudioConfig.OUTPUT_FRAME_SIZE].tobytes(),
+            AudioConfig.OUTPUT_FRAME_SIZE,
+        )
+        for i in range(0, len(downlink_pcm), AudioConfig.OUTPUT_FRAME_SIZE)
+    ]
+
+    block = codec._device_input_frame_size
+    uplink_pcm = synthetic_pcm(device_rate, block * frames, seed=2).reshape(-1, 1)
+    output_block = np.zeros((block, AudioConfig.CHANNELS), dtype=np.int16)
+    time_info = _TimeInfo()
+
+    aec = AECProcessor()
+    try:
+        await aec.initialize()
+    except Exception:
+        pass
+    aec_frame = synthetic_pcm(AudioConfig.INPUT_SAMPLE_RATE, AudioConfig.INPUT_FRAME_SIZE)
+
+    input_cb = EntryRecorder(trace_alloc)
+    encode_path = EntryRecorder(trace_alloc)
+    write_audio = EntryRecorder(trace_alloc)
+    output_cb = EntryRecorder(trace_alloc)
+    aec_process = EntryRecorder(trace_alloc)
+
+    work_buffer = worker._work_buffer
+    for i in range(frames):
+        indata = uplink_pcm[i * block : (i + 1) * block]
+        input_cb.call(codec._input_callback, indata, block, time_info, None)
+
+        # 编码线程的一次出队+处理
+        count, captured_at = worker._queue.get_into(work_buffer)
+        if count:
+            encode_path.call(
+                worker._process_block, work_buffer[:count], captured_at
+            )
+
+        start = time.perf_counter()
+        await codec.write_audio(packets[i])
+        write_audio.durations_ms.append((time.perf_counter() - start) * 1000)
+
+        output_cb.call(codec._output_callback, output_block, block, time_info, None)
+        aec_process.call(aec.process_audio, aec_frame)
+
+    playback_stats = codec.get_playback_stats()
+    encoder_stats = worker.get_stats()
+    result = {
+        "frame_duration_ms": frame_duration,
+        "device_sample_rate": device_rate,
+        "input_resample": codec.input_resampler is not None,
+        "output_resample": codec.output_resampler is not None,
+        "frames": frames,
+        "entries": {
+            "input_callback": input_cb.report(),
+            "encode_path": encode_path.report(),
+            "write_audio": write_audio.report(),
+            "output_callback": output_cb.report(),
+            "aec_process_audio": aec_process.report(),
+        },
+        "drops": {
+            "input_queue_dropped": encoder_stats["dropped_blocks"],
+            "input_queue_rejected": encoder_stats["rejected_blocks"],
+            "encode_errors": encoder_stats["encode_errors"],
+            "encoded_packets": len(encoded_packets),
+            "jitter_underruns": playback_stats["underruns"],
+            "jitter_late": playback_stats["late_packets"],
+            "jitter_overflow_dropped": playback_stats["overflow_dropped"],
+            "decode_errors": playback_stats["decode_errors"],
+            "output_ring_dropped": codec._output_buffer.dropped
+            + (
+                codec._resample_output_buffer.dropped
+                if codec._resample_output_buffer is not None
+                else 0
+            ),
+        },
+    }
+
+    codec._encoder_worker = None
+    await codec.close()
+    await aec.close()
+    return result
+
+
+async def run_benchmarks(args) -> Dict[str, Any]:
+    if args.trace_alloc:
+        tracemalloc.start()
+
+    scenarios = []
+    for frame_duration in args.frame_durations:
+        for device_rate in args.device_rates:
+            result = await run_scenario(
+                frame_duration, device_rate, args.frames, args.trace_alloc
+            )
+            scenarios.append(result)
+            entries = result["entries"]
+            print(
+                f"{frame_duration:>3}ms @ {device_rate:>5}Hz  "
+                + "  ".join(
+                    f"{name}: p50={stats.get('p50_ms')} p99={stats.get('p99_ms')}"
+                    for name, stats in entries.items()
+                )
+            )
+
+    if args.trace_alloc:
+        tracemalloc.stop()
+
+    return {
+        "benchmark": "audio_pipeline",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "numpy": np.__version__,
+        "output_sample_rate": AudioConfig.OUTPUT_SAMPLE_RATE,
+        "trace_alloc": args.trace_alloc,
+        "scenarios": scenarios,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="音频管线微基准")
+    parser.add_argument("--frames", type=int, default=500, help="每个场景的帧数")
+    parser.add_argument(
+        "--frame-durations",
+        type=int,
+        nargs="+",
+        default=list(DEFAULT_FRAME_DURATIONS),
+        help="帧长（毫秒）",
+    )
+    parser.add_argument(
+        "--device-rates",
+        type=int,
+        nargs="+",
+        default=list(DEFAULT_DEVICE_RATES),
+        help="设备采样率（Hz）",
+    )
+    parser.add_argument(
+        "--no-trace-alloc",
+        dest="trace_alloc",
+        action="store_false",
+        help="关闭 tracemalloc（其开销会抬高耗时）",
+    )
+    parser.add_argument("--output", type=str, default=None, help="JSON 结果文件路径")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    report = asyncio.run(run_benchmarks(args))
+
+    if args.output:
+        output = Path(args.output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(
+            json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8"
+        )
+        print(f"结果已写入: {output}")
+    else:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
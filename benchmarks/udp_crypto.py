@@ -0,0 +1,196 @@
+# coding:utf-8
+"""
+MQTT/UDP 音频包 AES-CTR 加解密基准.
+
+对比两种实现的单核吞吐（包/秒）：
+- legacy：原 MqttProtocol 的做法，每包十六进制切片拼 nonce、bytes.fromhex 解析
+  密钥与 nonce、新建 AES 算法对象并拼接 nonce 与密文
+- fast：UdpAudioCrypto，会话级密钥/算法对象，struct 原地写 nonce，
+  update_into 直接写入复用缓冲，以 memoryview 返回
+
+发送与接收分别计时（CPU 时间，单线程即单核），并校验两种实现生成的包逐字节一致。
+
+用法（在项目根目录）:
+    python -m benchmarks.udp_crypto --packets 50000 --sizes 80 240 1000 \\
+        --output bench/udp_crypto.json
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+import cryptography
+from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+
+from app.service.protocols.udp_audio_crypto import UdpAudioCrypto
+
+# 典型 Opus 包：20ms@24kbps ≈ 60B，60ms ≈ 180-240B
+DEFAULT_SIZES = (80, 240, 1000)
+
+
+class LegacyUdpCrypto:
+    """
+    原实现的逐包加解密路径（作为基线）.
+    """
+
+    def __init__(self, key_hex: str, nonce_hex: str):
+        self.aes_key = key_hex
+        self.aes_nonce = nonce_hex
+
+    @staticmethod
+    def _encrypt(key, nonce, plaintext):
+        cipher = Cipher(
+            algorithms.AES(key), modes.CTR(nonce), backend=default_backend()
+        )
+        encryptor = cipher.encryptor()
+        return encryptor.update(plaintext) + encryptor.finalize()
+
+    @staticmethod
+    def _decrypt(key, nonce, ciphertext):
+        cipher = Cipher(
+            algorithms.AES(key), modes.CTR(nonce), backend=default_backend()
+        )
+        decryptor = cipher.decryptor()
+        return decryptor.update(ciphertext) + decryptor.finalize()
+
+    def encrypt_packet(self, audio_data: bytes, sequence: int) -> bytes:
+        new_nonce = (
+            self.aes_nonce[:4]
+            + format(len(audio_data), "04x")
+            + self.aes_nonce[8:24]
+            + format(sequence, "08x")
+        )
+        encrypted = self._encrypt(
+            bytes.fromhex(self.aes_key), bytes.fromhex(new_nonce), bytes(audio_data)
+        )
+        return bytes.fromhex(new_nonce) + encrypted
+
+    def decrypt_packet(self, data: bytes) -> bytes:
+        return self._decrypt(bytes.fromhex(self.aes_key), data[:16], data[16:])
+
+
+def measure(func: Callable[[int], Any], packets: int) -> Dict[str, float]:
+    """
+    调用 func(i) packets 次，返回单核吞吐与单包耗时.
+    """
+    # 预热
+    for i in range(min(1000, packets)):
+        func(i)
+
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    for i in range(packets):
+        func(i)
+    cpu = time.process_time() - cpu_start
+    wall = time.perf_counter() - wall_start
+
+    return {
+        "packets_per_sec_per_core": round(packets / cpu, 1) if cpu > 0 else None,
+        "us_per_packet": round(cpu / packets * 1e6, 3),
+        "wall_s": round(wall, 3),
+    }
+
+
+def run_size(size: int, packets: int, key_hex: str, nonce_hex: str) -> Dict[str, Any]:
+    payload = os.urandom(size)
+    legacy = LegacyUdpCrypto(key_hex, nonce_hex)
+    fast = UdpAudioCrypto(key_hex, nonce_hex)
+
+    # 正确性：同一序列号下两种实现的包逐字节一致，且可互相解密
+    for sequence in (1, 0xFFFFFFFF):
+        expected = legacy.encrypt_packet(payload, sequence)
+        packet = bytes(fast.encrypt_packet(payload, sequence))
+        if packet != expected:
+            raise AssertionError(f"{size}B: 快速路径生成的包与原实现不一致")
+        if fast.decrypt_packet(expected) != payload:
+            raise AssertionError(f"{size}B: 快速路径解密结果不一致")
+
+    legacy_packet = legacy.encrypt_packet(payload, 1)
+    results = {
+        "payload_bytes": size,
+        "encrypt": {
+            "legacy": measure(lambda i: legacy.encrypt_packet(payload, i), packets),
+            "fast": measure(lambda i: fast.encrypt_packet(payload, i), packets),
+        },
+        "decrypt": {
+            "legacy": measure(lambda i: legacy.decrypt_packet(legacy_packet), packets),
+            "fast": measure(lambda i: fast.decrypt_packet(legacy_packet), packets),
+        },
+    }
+    for direction in ("encrypt", "decrypt"):
+        stats = results[direction]
+        stats["speedup"] = round(
+            stats["fast"]["packets_per_sec_per_core"]
+            / stats["legacy"]["packets_per_sec_per_core"],
+            2,
+        )
+    return results
+
+
+def format_table(rows: List[Dict[str, Any]]) -> str:
+    header = (
+        f"{'负载':>6}  {'方向':<8}{'legacy 包/秒':>14}{'fast 包/秒':>14}"
+        f"{'legacy us':>11}{'fast us':>9}{'加速':>7}"
+    )
+    lines = [header, "-" * len(header)]
+    for row in rows:
+        for direction in ("encrypt", "decrypt"):
+            stats = row[direction]
+            lines.append(
+                f"{row['payload_bytes']:>5}B  {direction:<8}"
+                f"{stats['legacy']['packets_per_sec_per_core']:>14,.0f}"
+                f"{stats['fast']['packets_per_sec_per_core']:>14,.0f}"
+                f"{stats['legacy']['us_per_packet']:>11.2f}"
+                f"{stats['fast']['us_per_packet']:>9.2f}"
+                f"{stats['speedup']:>6.2f}x"
+            )
+    return "\n".join(lines)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="MQTT/UDP 音频包 AES-CTR 基准")
+    parser.add_argument("--packets", type=int, default=50000, help="每项计时的包数")
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=list(DEFAULT_SIZES),
+        help="音频负载字节数",
+    )
+    parser.add_argument("--output", type=str, default=None, help="JSON 结果文件路径")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    key_hex = os.urandom(16).hex()
+    nonce_hex = "01000000" + os.urandom(8).hex() + "00000000"
+
+    rows = [run_size(size, args.packets, key_hex, nonce_hex) for size in args.sizes]
+    print(format_table(rows))
+
+    report = {
+        "benchmark": "udp_crypto",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cryptography": cryptography.__version__,
+        "packets": args.packets,
+        "results": rows,
+    }
+    if args.output:
+        output = Path(args.output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(
+            json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8"
+        )
+        print(f"结果已写入: {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,521 @@
+# coding:utf-8
+"""
+唤醒词离线评测与实时率基准.
+
+把带标注的 WAV 语料按采集帧长逐帧送入 Sherpa-ONNX KeywordSpotter，送帧与解码方式
+与 WakeWordDetector 一致（int16 -> float32 后 accept_waveform，is_ready 时循环
+decode_stream，检出后 reset_stream；可选经过 KWSPreGate 静音前置门限），统计：
+
+- 实时率：处理耗时 / 音频时长（rtf 为墙钟时间，cpu_rtf 为进程CPU时间，含ONNX线程）
+- 检出延迟：检出时已送入的音频位置相对唤醒词结束点的时长（算法延迟，不含调度）
+- 漏检率：正样本中未检出的比例
+- 误唤醒：负样本（背景音）中每小时误检次数，按检测器的1.5秒冷却时间去重
+
+语料：
+    --positive  正样本 WAV（文件或目录），每个文件包含一次唤醒词，前后补静音后独立评测
+    --negative  负样本 WAV（文件或目录），可为数小时的背景录音，分块流式读取与重采样
+    --labels    可选 JSON {"文件名": 唤醒词结束时间(秒)}，缺省时取能量最后高于峰值-30dB处
+
+参数网格（未列出的参数取 WAKE_WORD_OPTIONS 当前配置）:
+    --grid KEYWORDS_THRESHOLD=0.1,0.2,0.3 KEYWORDS_SCORE=1.0,1.8 \\
+           MAX_ACTIVE_PATHS=2,4 NUM_THREADS=1,2 PRE_GATE=0,1
+
+每组参数在独立进程中加载模型并跑完整语料，进程数默认为 CPU 核数 / 最大 NUM_THREADS，
+避免 ONNX 线程超额订阅影响实时率。
+
+用法（在项目根目录）:
+    python -m benchmarks.wake_word_eval --positive corpus/pos --negative corpus/neg \\
+        --grid KEYWORDS_THRESHOLD=0.15,0.2,0.25 NUM_THREADS=1,2 \\
+        --output bench/wake_word_eval.json
+"""
+import argparse
+import itertools
+import json
+import math
+import os
+import platform
+import sys
+import time
+import wave
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+READ_BLOCK_S = 10
+LEAD_SILENCE_S = 0.5
+TAIL_SILENCE_S = 1.5
+# 与 WakeWordDetector.detection_cooldown 一致
+DETECTION_COOLDOWN_S = 1.5
+
+SWEEP_KEYS = (
+    "KEYWORDS_THRESHOLD",
+    "KEYWORDS_SCORE",
+    "MAX_ACTIVE_PATHS",
+    "NUM_THREADS",
+    "NUM_TRAILING_BLANKS",
+    "PRE_GATE",
+)
+
+
+@dataclass
+class EvalCorpus:
+    """
+    评测语料：正样本为 (路径, 唤醒词结束时间秒)，负样本只记录路径.
+    """
+
+    model_dir: str
+    frame_duration_ms: int = 20
+    positives: List[Tuple[str, float]] = field(default_factory=list)
+    negatives: List[str] = field(default_factory=list)
+    pre_gate_options: Dict[str, Any] = field(default_factory=dict)
+
+
+def collect_wavs(paths: Optional[Iterable[str]]) -> List[Path]:
+    files: List[Path] = []
+    for item in paths or []:
+        path = Path(item)
+        if path.is_dir():
+            files.extend(sorted(path.rglob("*.wav")))
+        elif path.exists():
+            files.append(path)
+        else:
+            print(f"语料不存在，已跳过: {path}", file=sys.stderr)
+    return files
+
+
+def iter_wav_blocks(path, block_s: int = READ_BLOCK_S) -> Iterator[np.ndarray]:
+    """
+    分块读取 WAV 第一声道（int16），非16kHz时流式重采样，长录音不整体载入内存.
+    """
+    with wave.open(str(path), "rb") as wav:
+        if wav.getsampwidth() != 2:
+            raise ValueError(f"仅支持16位PCM WAV: {path}")
+        channels = wav.getnchannels()
+        rate = wav.getframerate()
+
+        resampler = None
+        if rate != SAMPLE_RATE:
+            import soxr
+
+            resampler = soxr.ResampleStream(
+                rate, SAMPLE_RATE, 1, dtype="int16", quality="HQ"
+            )
+
+        block = rate * block_s
+        while True:
+            raw = wav.readframes(block)
+            data = np.frombuffer(raw, dtype=np.int16).reshape(-1, channels)[:, 0]
+            last = len(data) < block
+            if resampler is not None:
+                data = resampler.resample_chunk(np.ascontiguousarray(data), last=last)
+            if len(data):
+                yield np.ascontiguousarray(data)
+            if last:
+                break
+
+
+def read_wav_int16(path) -> np.ndarray:
+    blocks = list(iter_wav_blocks(path))
+    return np.concatenate(blocks) if blocks else np.zeros(0, dtype=np.int16)
+
+
+def iter_frames(blocks: Iterable[np.ndarray], frame_size: int) -> Iterator[np.ndarray]:
+    """
+    把任意长度的块切成固定帧长（末尾不足一帧的部分丢弃）.
+    """
+    carry = np.zeros(0, dtype=np.int16)
+    for block in blocks:
+        if len(carry):
+            block = np.concatenate([carry, block])
+        usable = len(block) - len(block) % frame_size
+        for start in range(0, usable, frame_size):
+            yield block[start : start + frame_size]
+        carry = block[usable:]
+
+
+def estimate_keyword_end(samples: np.ndarray) -> float:
+    """
+    按20ms能量估计语音结束点（秒）：最后一帧电平不低于峰值-30dB处.
+    """
+    frame = SAMPLE_RATE // 50
+    count = len(samples) // frame
+    if count == 0:
+        return len(samples) / SAMPLE_RATE
+    frames = samples[: count * frame].astype(np.float64).reshape(count, frame)
+    levels = 10 * np.log10(np.mean(frames * frames, axis=1) + 1e-10)
+    active = np.nonzero(levels >= levels.max() - 30.0)[0]
+    return (int(active[-1]) + 1) * frame / SAMPLE_RATE
+
+
+def load_labels(path: Optional[str]) -> Dict[str, float]:
+    if not path:
+        return {}
+    return {
+        str(key): float(value)
+        for key, value in json.loads(Path(path).read_text(encoding="utf-8")).items()
+    }
+
+
+def _parse_value(text: str):
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+def expand_grid(base: Dict[str, Any], specs: Optional[List[str]]) -> List[Dict[str, Any]]:
+    """
+    解析 "KEY=v1,v2" 列表并与基础配置做笛卡尔积.
+    """
+    axes: List[Tuple[str, List[Any]]] = []
+    for spec in specs or []:
+        key, _, values = spec.partition("=")
+        key = key.strip().upper()
+        if key not in SWEEP_KEYS:
+            raise ValueError(f"不支持的扫描参数: {key}（可选: {', '.join(SWEEP_KEYS)}）")
+        axes.append((key, [_parse_value(v.strip()) for v in values.split(",") if v.strip()]))
+
+    grid = []
+    for combination in itertools.product(*(values for _, values in axes)):
+        params = dict(base)
+        params.update(zip((key for key, _ in axes), combination))
+        grid.append(params)
+    return grid
+
+
+class StreamingSpotter:
+    """
+    按 WakeWordDetector 的方式送帧与解码（可选静音前置门限）.
+    """
+
+    def __init__(self, spotter, pre_gate=None):
+        self.spotter = spotter
+        self.pre_gate = pre_gate
+        self.stream = spotter.create_stream()
+        self._waveform = np.zeros(0, dtype=np.float32)
+        self.decode_calls = 0
+
+    def _accept(self, samples: np.ndarray):
+        count = len(samples)
+        if len(self._waveform) < count:
+            self._waveform = np.zeros(count, dtype=np.float32)
+        waveform = self._waveform[:count]
+        np.multiply(samples, 1.0 / 32768.0, out=waveform, casting="unsafe")
+        self.stream.accept_waveform(sample_rate=SAMPLE_RATE, waveform=waveform)
+
+    def feed(self, frame: np.ndarray) -> Optional[str]:
+        """
+        送入一帧，检出唤醒词时返回结果文本.
+        """
+        if self.pre_gate is None:
+            self._accept(frame)
+        elif self.pre_gate.process(frame, self._accept):
+            self.spotter.reset_stream(self.stream)
+
+        while self.spotter.is_ready(self.stream):
+            self.spotter.decode_stream(self.stream)
+            self.decode_calls += 1
+            result = self.spotter.get_result(self.stream)
+            if result:
+                self.spotter.reset_stream(self.stream)
+                return result
+        return None
+
+
+def _percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    return round(float(np.percentile(values, q)), 1)
+
+
+def evaluate_config(params: Dict[str, Any], corpus: EvalCorpus) -> Dict[str, Any]:
+    """
+    工作进程：加载一组参数的模型并跑完整语料.
+    """
+    from app.service.audio_processing.kws_pre_gate import KWSPreGate
+    from app.service.audio_processing.wake_word_detect import create_keyword_spotter
+
+    started = time.perf_counter()
+    spotter = create_keyword_spotter(
+        Path(corpus.model_dir),
+        sample_rate=SAMPLE_RATE,
+        num_threads=int(params["NUM_THREADS"]),
+        provider=params.get("PROVIDER", "cpu"),
+        max_active_paths=int(params["MAX_ACTIVE_PATHS"]),
+        keywords_score=float(params["KEYWORDS_SCORE"]),
+        keywords_threshold=float(params["KEYWORDS_THRESHOLD"]),
+        num_trailing_blanks=int(params["NUM_TRAILING_BLANKS"]),
+    )
+    load_time_ms = (time.perf_counter() - started) * 1000
+
+    frame_size = SAMPLE_RATE * corpus.frame_duration_ms // 1000
+    options = corpus.pre_gate_options
+
+    def make_runner() -> StreamingSpotter:
+        gate = None
+        if params.get("PRE_GATE"):
+            gate = KWSPreGate(
+                sample_rate=SAMPLE_RATE,
+                margin_db=options.get("MARGIN_DB", 9.0),
+                min_level_dbfs=options.get("MIN_LEVEL_DBFS", -60.0),
+                lookback_ms=options.get("LOOKBACK_MS", 500),
+                hangover_ms=options.get("HANGOVER_MS", 1000),
+                use_vad=options.get("USE_VAD", False),
+                vad_aggressiveness=options.get("VAD_AGGRESSIVENESS", 2),
+            )
+        return StreamingSpotter(spotter, gate)
+
+    audio_samples = 0
+    decode_calls = 0
+    gate_frames = 0
+    gate_skipped = 0
+    wall = 0.0
+    cpu = 0.0
+
+    # 正样本：每条独立评测，记录首次检出相对唤醒词结束点的延迟
+    latencies: List[float] = []
+    misses: List[str] = []
+    lead = np.zeros(int(LEAD_SILENCE_S * SAMPLE_RATE), dtype=np.int16)
+    tail = np.zeros(int(TAIL_SILENCE_S * SAMPLE_RATE), dtype=np.int16)
+    for path, keyword_end in corpus.positives:
+        clip = np.concatenate([lead, read_wav_int16(path), tail])
+        runner = make_runner()
+        fed = 0
+        detected = False
+        wall_mark, cpu_mark = time.perf_counter(), time.process_time()
+        for frame in iter_frames([clip], frame_size):
+            fed += len(frame)
+            if runner.feed(frame):
+                latencies.append((fed / SAMPLE_RATE - LEAD_SILENCE_S - keyword_end) * 1000)
+                detected = True
+                break
+        wall += time.perf_counter() - wall_mark
+        cpu += time.process_time() - cpu_mark
+        audio_samples += fed
+        decode_calls += runner.decode_calls
+        if runner.pre_gate is not None:
+            gate_frames += runner.pre_gate.frames_total
+            gate_skipped += runner.pre_gate.frames_gated
+        if not detected:
+            misses.append(Path(path).name)
+
+    # 负样本：连续流式送入，冷却时间内的重复检出只计一次
+    false_accepts = 0
+    false_accept_texts: Dict[str, int] = {}
+    negative_samples = 0
+    for path in corpus.negatives:
+        runner = make_runner()
+        last_detection = -math.inf
+        wall_mark, cpu_mark = time.perf_counter(), time.process_time()
+        for frame in iter_frames(iter_wav_blocks(path), frame_size):
+            negative_samples += len(frame)
+            result = runner.feed(frame)
+            if result:
+                now = negative_samples / SAMPLE_RATE
+                if now - last_detection >= DETECTION_COOLDOWN_S:
+                    false_accepts += 1
+                    false_accept_texts[result] = false_accept_texts.get(result, 0) + 1
+                last_detection = now
+        wall += time.perf_counter() - wall_mark
+        cpu += time.process_time() - cpu_mark
+        decode_calls += runner.decode_calls
+        if runner.pre_gate is not None:
+            gate_frames += runner.pre_gate.frames_total
+            gate_skipped += runner.pre_gate.frames_gated
+
+    audio_samples += negative_samples
+    audio_s = audio_samples / SAMPLE_RATE
+    negative_hours = negative_samples / SAMPLE_RATE / 3600
+    positives = len(corpus.positives)
+
+    return {
+        "params": params,
+        "threshold": params["KEYWORDS_THRESHOLD"],
+        "score": params["KEYWORDS_SCORE"],
+        "paths": params["MAX_ACTIVE_PATHS"],
+        "threads": params["NUM_THREADS"],
+        "gate": bool(params.get("PRE_GATE")),
+        "positives": positives,
+        "detected": positives - len(misses),
+        "miss_rate": round(len(misses) / positives, 4) if positives else None,
+        "missed_files": misses,
+        "latency_p50_ms": _percentile(latencies, 50),
+        "latency_p90_ms": _percentile(latencies, 90),
+        "latency_max_ms": round(max(latencies), 1) if latencies else None,
+        "negative_hours": round(negative_hours, 3),
+        "false_accepts": false_accepts,
+        "fa_per_hour": round(false_accepts / negative_hours, 3)
+        if negative_hours
+        else None,
+        "false_accept_texts": false_accept_texts,
+        "audio_s": round(audio_s, 1),
+        "rtf": round(wall / audio_s, 4) if audio_s else None,
+        "cpu_rtf": round(cpu / audio_s, 4) if audio_s else None,
+        "decode_calls": decode_calls,
+        "gate_skip_ratio": round(gate_skipped / gate_frames, 3) if gate_frames else None,
+        "load_time_ms": round(load_time_ms, 1),
+    }
+
+
+TABLE_COLUMNS = (
+    ("threshold", 10),
+    ("score", 6),
+    ("paths", 6),
+    ("threads", 8),
+    ("gate", 6),
+    ("miss_rate", 10),
+    ("fa_per_hour", 12),
+    ("latency_p50_ms", 15),
+    ("latency_p90_ms", 15),
+    ("rtf", 8),
+    ("cpu_rtf", 8),
+    ("gate_skip_ratio", 16),
+)
+
+
+def format_table(results: List[Dict[str, Any]]) -> str:
+    def cell(value, width):
+        text = "-" if value is None else str(value)
+        return text[:width].ljust(width)
+
+    lines = [" ".join(cell(name, width) for name, width in TABLE_COLUMNS)]
+    lines.append(" ".join("-" * width for _, width in TABLE_COLUMNS))
+    for result in results:
+        lines.append(
+            " ".join(cell(result.get(name), width) for name, width in TABLE_COLUMNS)
+        )
+    return "\n".join(lines)
+
+
+def base_params() -> Tuple[Dict[str, Any], Optional[str], Dict[str, Any]]:
+    """
+    从 WAKE_WORD_OPTIONS 读取基础参数、模型目录与前置门限配置.
+    """
+    from app.common.config_manager import ConfigManager
+    from app.common.path_manager import path_manager
+
+    config = ConfigManager.get_instance()
+    options = config.get_config("WAKE_WORD_OPTIONS", {}) or {}
+    gate_options = options.get("PRE_GATE", {}) or {}
+    params = {
+        "KEYWORDS_THRESHOLD": options.get("KEYWORDS_THRESHOLD", 0.2),
+        "KEYWORDS_SCORE": options.get("KEYWORDS_SCORE", 1.8),
+        "MAX_ACTIVE_PATHS": options.get("MAX_ACTIVE_PATHS", 2),
+        "NUM_THREADS": options.get("NUM_THREADS", 4),
+        "NUM_TRAILING_BLANKS": options.get("NUM_TRAILING_BLANKS", 1),
+        "PROVIDER": options.get("PROVIDER", "cpu"),
+        "PRE_GATE": bool(gate_options.get("ENABLED", True)),
+    }
+    model_path = options.get("MODEL_PATH", "models")
+    model_dir = path_manager.find_directory(model_path) or Path(model_path)
+    return params, str(model_dir), gate_options
+
+
+def build_corpus(args, model_dir: str, gate_options: Dict[str, Any]) -> EvalCorpus:
+    labels = load_labels(args.labels)
+    positives = []
+    for path in collect_wavs(args.positive):
+        keyword_end = labels.get(path.name, labels.get(str(path)))
+        if keyword_end is None:
+            keyword_end = estimate_keyword_end(read_wav_int16(path))
+        positives.append((str(path), float(keyword_end)))
+    return EvalCorpus(
+        model_dir=str(args.model_dir or model_dir),
+        frame_duration_ms=args.frame_duration,
+        positives=positives,
+        negatives=[str(path) for path in collect_wavs(args.negative)],
+        pre_gate_options=dict(gate_options),
+    )
+
+
+def run_sweep(args) -> Dict[str, Any]:
+    base, model_dir, gate_options = base_params()
+    corpus = build_corpus(args, model_dir, gate_options)
+    if not corpus.positives and not corpus.negatives:
+        raise SystemExit("未找到任何语料（--positive/--negative）")
+
+    grid = expand_grid(base, args.grid)
+    jobs = args.jobs or max(
+        1, (os.cpu_count() or 1) // max(int(p["NUM_THREADS"]) for p in grid)
+    )
+    print(
+        f"参数组合: {len(grid)}，并行进程: {jobs}，正样本: {len(corpus.positives)}，"
+        f"负样本文件: {len(corpus.negatives)}",
+        file=sys.stderr,
+    )
+
+    results = []
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = {pool.submit(evaluate_config, params, corpus): params for params in grid}
+        for future in as_completed(futures):
+            params = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"参数 {params} 评测失败: {e}", file=sys.stderr)
+                continue
+            results.append(result)
+            print(
+                f"完成 {len(results)}/{len(grid)}: 漏检率 {result['miss_rate']}, "
+                f"误唤醒/小时 {result['fa_per_hour']}, RTF {result['rtf']}",
+                file=sys.stderr,
+            )
+
+    # 误唤醒优先，其次漏检率
+    results.sort(
+        key=lambda r: (
+            r["fa_per_hour"] if r["fa_per_hour"] is not None else math.inf,
+            r["miss_rate"] if r["miss_rate"] is not None else math.inf,
+        )
+    )
+    return {
+        "benchmark": "wake_word_eval",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "jobs": jobs,
+        "corpus": asdict(corpus),
+        "results": results,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="唤醒词离线评测与实时率基准")
+    parser.add_argument("--positive", nargs="+", default=None, help="正样本 WAV 文件或目录")
+    parser.add_argument("--negative", nargs="+", default=None, help="负样本 WAV 文件或目录")
+    parser.add_argument("--labels", type=str, default=None, help="唤醒词结束时间 JSON")
+    parser.add_argument(
+        "--grid", nargs="+", default=None, help="参数网格，如 KEYWORDS_THRESHOLD=0.1,0.2"
+    )
+    parser.add_argument("--model-dir", type=str, default=None, help="模型目录（默认取配置）")
+    parser.add_argument(
+        "--frame-duration", type=int, default=20, help="送帧长度（毫秒，与采集帧长一致）"
+    )
+    parser.add_argument(
+        "--jobs", type=int, default=0, help="并行进程数（默认 CPU核数/最大NUM_THREADS）"
+    )
+    parser.add_argument("--output", type=str, default=None, help="JSON 结果文件路径")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    report = run_sweep(args)
+    print(format_table(report["results"]))
+
+    if args.output:
+        output = Path(args.output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(
+            json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8"
+        )
+        print(f"结果已写入: {output}")
+
+
+if __name__ == "__main__":
+    main()
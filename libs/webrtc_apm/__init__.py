@@ -9,7 +9,9 @@ import sys
 import os
 from pathlib import Path
 from enum import IntEnum
-from typing import Optional
+from typing import List, Optional
+
+import numpy as np
 
 # 平台特定的库加载
 def _get_library_path() -> str:
@@ -252,6 +254,33 @@ _lib.WebRTC_APM_ProcessStream.restype = ctypes.c_int
 _lib.WebRTC_APM_SetStreamDelayMs.argtypes = [ctypes.c_void_p, ctypes.c_int]
 _lib.WebRTC_APM_SetStreamDelayMs.restype = None
 
+class ApmFrameBuffer:
+    """预分配的 int16 帧缓冲，供 APM 直接读写。
+
+    缓冲区按 chunk_size（通常为 10ms）切分，构造时为每段生成 C 指针，
+    处理时直接传给本地库，无需逐样本构造 ctypes 数组。
+    """
+
+    def __init__(self, chunk_size: int, max_chunks: int):
+        """
+        Args:
+            chunk_size: 每段样本数（16kHz 10ms 为 160）
+            max_chunks: 最多容纳的段数
+        """
+        self.chunk_size = int(chunk_size)
+        self.max_chunks = int(max_chunks)
+        self.array = np.zeros(self.chunk_size * self.max_chunks, dtype=np.int16)
+
+        base = self.array.ctypes.data
+        step = self.chunk_size * self.array.itemsize
+        self.pointers: List[ctypes.POINTER(ctypes.c_short)] = [
+            ctypes.cast(base + i * step, ctypes.POINTER(ctypes.c_short))
+            for i in range(self.max_chunks)
+        ]
+        # 每个段数对应的连续视图，避免处理时切片产生新对象
+        self.views = [self.array[: n * self.chunk_size] for n in range(self.max_chunks + 1)]
+
+
 class WebRTCAudioProcessing:
     """WebRTC 音频处理的高级 Python 封装器。"""
     
@@ -260,6 +289,8 @@ class WebRTCAudioProcessing:
         self._handle = _lib.WebRTC_APM_Create()
         if not self._handle:
             raise RuntimeError("Failed to create WebRTC APM instance")
+        # 预先包装句柄，逐帧调用时免去参数转换
+        self._handle_ref = ctypes.c_void_p(self._handle)
     
     def __del__(self):
         """清理资源。"""
@@ -330,6 +361,39 @@ class WebRTCAudioProcessing:
             self._handle, src, src_config, dest_config, dest
         )
     
+    def process_frames(self, capture: ApmFrameBuffer, reference: ApmFrameBuffer,
+                       num_chunks: int, capture_config: int, render_config: int,
+                       render_scratch: ApmFrameBuffer) -> int:
+        """原地处理多个 10ms 帧：每段先送入参考信号，再处理采集信号。
+
+        Args:
+            capture: 采集缓冲，处理结果原地写回
+            reference: 参考（播放）信号缓冲
+            num_chunks: 段数（如 60ms 帧为 6）
+            capture_config: 采集流配置句柄（传入 ctypes.c_void_p 可免去逐次转换）
+            render_config: 参考流配置句柄（同上）
+            render_scratch: 参考信号处理输出的暂存缓冲（至少 1 段）
+
+        Returns:
+            首个非零的采集处理状态码，全部成功返回 0
+        """
+        handle = self._handle_ref
+        process_reverse = _lib.WebRTC_APM_ProcessReverseStream
+        process = _lib.WebRTC_APM_ProcessStream
+        capture_pointers = capture.pointers
+        reference_pointers = reference.pointers
+        scratch = render_scratch.pointers[0]
+
+        status = 0
+        for i in range(num_chunks):
+            process_reverse(handle, reference_pointers[i], render_config,
+                            render_config, scratch)
+            result = process(handle, capture_pointers[i], capture_config,
+                             capture_config, capture_pointers[i])
+            if result != 0 and status == 0:
+                status = result
+        return status
+
     def set_stream_delay_ms(self, delay_ms: int) -> None:
         """设置流延迟（毫秒）。
         
@@ -418,6 +482,7 @@ def create_default_config() -> Config:
 
 __all__ = [
     'WebRTCAudioProcessing',
+    'ApmFrameBuffer',
     'Config',
     'create_default_config',
     'DownmixMethod',
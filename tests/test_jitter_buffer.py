@@ -0,0 +1,153 @@
+from app.service.audio_codecs.jitter_buffer import JitterBuffer
+
+
+def make_buffer(**kwargs):
+    # 起播深度为1：测试不依赖等待空闲超时
+    kwargs.setdefault("min_depth", 1)
+    kwargs.setdefault("start_depth", 1)
+    return JitterBuffer(60, **kwargs)
+
+
+def put_all(buffer, packets, sequenced):
+    return [
+        buffer.put(packet, index if sequenced else None) for index, packet in packets
+    ]
+
+
+def drain(buffer):
+    frames = []
+    while True:
+        action, packet = buffer.pop()
+        if action == JitterBuffer.WAIT:
+            return frames
+        frames.append((action, packet))
+
+
+def packets(first, last):
+    return [(index, f"p{index}".encode()) for index in range(first, last + 1)]
+
+
+def assert_no_concealment(buffer):
+    stats = buffer.get_stats()
+    assert stats["underruns"] == 0
+    assert stats["concealed_frames"] == 0
+    assert stats["lost_packets"] == 0
+    assert stats["late_packets"] == 0
+
+
+def check_sentence_gap(sequenced):
+    buffer = make_buffer()
+    assert all(put_all(buffer, packets(0, 4), sequenced))
+    assert [packet for _, packet in drain(buffer)] == [b"p0", b"p1", b"p2", b"p3", b"p4"]
+
+    # 句间停顿：缓冲排空期间多次取帧
+    for _ in range(5):
+        assert buffer.pop() == (JitterBuffer.WAIT, None)
+
+    assert put_all(buffer, packets(5, 8), sequenced) == [True] * 4
+    frames = drain(buffer)
+    assert frames == [(JitterBuffer.PACKET, packet) for _, packet in packets(5, 8)]
+    assert_no_concealment(buffer)
+
+
+def check_end_of_stream(sequenced):
+    buffer = make_buffer()
+    put_all(buffer, packets(0, 2), sequenced)
+    assert len(drain(buffer)) == 3
+
+    for _ in range(5):
+        assert buffer.pop() == (JitterBuffer.WAIT, None)
+    assert buffer.is_empty()
+    assert buffer.get_stats()["packets_played"] == 3
+    assert_no_concealment(buffer)
+
+
+def test_sentence_gap_sequenced():
+    check_sentence_gap(sequenced=True)
+
+
+def test_sentence_gap_unsequenced():
+    check_sentence_gap(sequenced=False)
+
+
+def test_end_of_stream_sequenced():
+    check_end_of_stream(sequenced=True)
+
+
+def test_end_of_stream_unsequenced():
+    check_end_of_stream(sequenced=False)
+
+
+def test_loss_recovered_with_fec():
+    buffer = make_buffer()
+    buffer.put(b"p0", 0)
+    buffer.put(b"p2", 2)
+
+    assert buffer.pop() == (JitterBuffer.PACKET, b"p0")
+    assert buffer.pop() == (JitterBuffer.FEC, b"p2")
+    assert buffer.pop() == (JitterBuffer.PACKET, b"p2")
+    stats = buffer.get_stats()
+    assert stats["lost_packets"] == 1
+    assert stats["fec_recovered"] == 1
+    assert stats["underruns"] == 0
+
+
+def test_loss_during_drain_counts_underrun():
+    buffer = make_buffer()
+    buffer.put(b"p0", 0)
+    assert buffer.pop() == (JitterBuffer.PACKET, b"p0")
+    assert buffer.pop() == (JitterBuffer.WAIT, None)
+
+    # 包1丢失，包3先于包2到达
+    buffer.put(b"p3", 3)
+    assert buffer.pop() == (JitterBuffer.PLC, None)
+    assert buffer.put(b"p2", 2)
+    assert buffer.pop() == (JitterBuffer.PACKET, b"p2")
+    assert buffer.pop() == (JitterBuffer.PACKET, b"p3")
+    stats = buffer.get_stats()
+    assert stats["underruns"] == 1
+    assert stats["lost_packets"] == 1
+
+
+def test_long_gap_skips_after_max_conceal():
+    buffer = make_buffer(max_conceal=2)
+    buffer.put(b"p0", 0)
+    buffer.put(b"p6", 6)
+
+    assert buffer.pop() == (JitterBuffer.PACKET, b"p0")
+    assert buffer.pop() == (JitterBuffer.PLC, None)
+    assert buffer.pop() == (JitterBuffer.PLC, None)
+    assert buffer.pop() == (JitterBuffer.PACKET, b"p6")
+    stats = buffer.get_stats()
+    assert stats["concealed_frames"] == 2
+    assert stats["lost_packets"] == 5
+
+
+def test_packet_behind_play_position_is_late():
+    buffer = make_buffer()
+    put_all(buffer, packets(0, 1), sequenced=True)
+    drain(buffer)
+
+    assert not buffer.put(b"p1", 1)
+    assert buffer.get_stats()["late_packets"] == 1
+
+
+def test_reordered_packets_before_start():
+    buffer = make_buffer(start_depth=2)
+    assert buffer.put(b"p3", 3)
+    assert buffer.put(b"p2", 2)
+
+    assert drain(buffer) == [
+        (JitterBuffer.PACKET, b"p2"),
+        (JitterBuffer.PACKET, b"p3"),
+    ]
+
+
+def test_sender_restart_resyncs():
+    buffer = make_buffer()
+    put_all(buffer, packets(100, 105), sequenced=True)
+    drain(buffer)
+
+    assert buffer.put(b"p1", 1)
+    assert buffer.pop() == (JitterBuffer.PACKET, b"p1")
+    assert buffer.get_stats()["resyncs"] == 1